@@ -2,6 +2,8 @@
 
 from .albums_adapter import AlbumsAdapter
 from .config_adapter import ConfigAdapter
+from .leases_adapter import LeasesAdapter
 from .photos_adapter import PhotosAdapter
 from .status_adapter import StatusAdapter
 from .users_adapter import UsersAdapter
+from .versions_adapter import VersionsAdapter
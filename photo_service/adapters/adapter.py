@@ -31,7 +31,7 @@ class Adapter(ABC):
     @abstractmethod
     async def update_photo(
         cls: Any, db: Any, c_id: str, photo: dict
-    ) -> str | None:  # pragma: no cover
+    ) -> dict | None:  # pragma: no cover
         """Update photo function."""
         raise NotImplementedError from None
 
@@ -39,6 +39,6 @@ class Adapter(ABC):
     @abstractmethod
     async def delete_photo(
         cls: Any, db: Any, c_id: str
-    ) -> str | None:  # pragma: no cover
-        """Get photo function."""
+    ) -> dict | None:  # pragma: no cover
+        """Delete photo function."""
         raise NotImplementedError from None
@@ -1,9 +1,13 @@
 """Module for sync adapter."""
 
+from collections.abc import AsyncIterator
 from typing import Any
 
 from .adapter import Adapter
 
+# documents are returned without the mongo _id
+ALBUM_PROJECTION = {"_id": 0}
+
 
 class AlbumsAdapter(Adapter):
     """Class representing an adapter for sync-ed albums."""
@@ -19,6 +23,12 @@ class AlbumsAdapter(Adapter):
         cursor = db.albums_collection.find()
         return await cursor.to_list(None)
 
+    @classmethod
+    async def iter_albums(cls: Any, db: Any) -> AsyncIterator[dict]:  # pragma: no cover
+        """Iterate over albums as they are read from the db."""
+        async for album in db.albums_collection.find({}, ALBUM_PROJECTION):
+            yield album
+
     @classmethod
     async def get_album_by_g_id(
         cls: Any, db: Any, g_id: str
@@ -34,13 +44,26 @@ class AlbumsAdapter(Adapter):
     @classmethod
     async def update_album(
         cls: Any, db: Any, c_id: str, album: dict
-    ) -> str | None:  # pragma: no cover
-        """Get album function."""
-        return await db.albums_collection.replace_one({"id": c_id}, album)
+    ) -> dict | None:  # pragma: no cover
+        """Replace album function, returning the old album or None if not found."""
+        return await db.albums_collection.find_one_and_replace(
+            {"id": c_id}, album, projection=ALBUM_PROJECTION
+        )
+
+    @classmethod
+    async def set_album_fields(
+        cls: Any, db: Any, c_id: str, fields: dict
+    ) -> dict | None:  # pragma: no cover
+        """Set some fields of an album, returning the old album or None if not found."""
+        return await db.albums_collection.find_one_and_update(
+            {"id": c_id}, {"$set": fields}, projection=ALBUM_PROJECTION
+        )
 
     @classmethod
     async def delete_album(
         cls: Any, db: Any, c_id: str
-    ) -> str | None:  # pragma: no cover
-        """Get album function."""
-        return await db.albums_collection.delete_one({"id": c_id})
+    ) -> dict | None:  # pragma: no cover
+        """Delete album function, returning the deleted album or None if not found."""
+        return await db.albums_collection.find_one_and_delete(
+            {"id": c_id}, projection=ALBUM_PROJECTION
+        )
@@ -1,9 +1,13 @@
 """Module for config adapter."""
 
+from collections.abc import AsyncIterator
 from typing import Any
 
 from .adapter import Adapter
 
+# documents are returned without the mongo _id
+CONFIG_PROJECTION = {"_id": 0}
+
 
 class ConfigAdapter(Adapter):
     """Class representing an adapter for photo configs."""
@@ -27,6 +31,15 @@ class ConfigAdapter(Adapter):
         cursor = db.configs_collection.find({"event_id": event_id})
         return await cursor.to_list(None)
 
+    @classmethod
+    async def iter_configs(
+        cls: Any, db: Any, event_id: str | None = None
+    ) -> AsyncIterator[dict]:  # pragma: no cover
+        """Iterate over configs as they are read from the db."""
+        query = {"event_id": event_id} if event_id else {}
+        async for config in db.configs_collection.find(query, CONFIG_PROJECTION):
+            yield config
+
     @classmethod
     async def get_config_by_key(
         cls: Any, db: Any, event_id: str, key: str
@@ -42,15 +55,27 @@ class ConfigAdapter(Adapter):
         return await db.configs_collection.find_one({"id": c_id})
 
     @classmethod
-    async def update_config(
-        cls: Any, db: Any, c_id: str, config: dict
-    ) -> str | None:  # pragma: no cover
-        """Get config function."""
-        return await db.configs_collection.replace_one({"id": c_id}, config)
+    async def update_config_by_key(
+        cls: Any, db: Any, event_id: str, key: str, config: dict
+    ) -> dict | None:  # pragma: no cover
+        """Update config by key function, keeping the id of the stored config.
+
+        Returns:
+            dict | None: The old config, or None if not found.
+
+        """
+        fields = {k: v for k, v in config.items() if k != "id"}
+        return await db.configs_collection.find_one_and_update(
+            {"event_id": event_id, "key": key},
+            {"$set": fields},
+            projection=CONFIG_PROJECTION,
+        )
 
     @classmethod
     async def delete_config(
         cls: Any, db: Any, c_id: str
-    ) -> str | None:  # pragma: no cover
-        """Get config function."""
-        return await db.configs_collection.delete_one({"id": c_id})
+    ) -> dict | None:  # pragma: no cover
+        """Delete config function, returning the deleted config or None if not found."""
+        return await db.configs_collection.find_one_and_delete(
+            {"id": c_id}, projection=CONFIG_PROJECTION
+        )
@@ -0,0 +1,43 @@
+"""Module for leases adapter."""
+
+from datetime import datetime
+from typing import Any
+
+from pymongo.errors import DuplicateKeyError
+
+
+class LeasesAdapter:
+    """Class representing an adapter for leases of background jobs."""
+
+    @classmethod
+    async def acquire_lease(
+        cls: Any, db: Any, name: str, holder: str, now: datetime, expires_at: datetime
+    ) -> bool:  # pragma: no cover
+        """Take or renew a lease, if it is free, expired or held by holder.
+
+        The lease is stored with its name as _id, so only one of many
+        workers taking the same free lease succeeds in inserting it.
+
+        Returns:
+            bool: True if holder holds the lease until expires_at.
+
+        """
+        try:
+            await db.leases_collection.update_one(
+                {
+                    "_id": name,
+                    "$or": [{"holder": holder}, {"expires_at": {"$lte": now}}],
+                },
+                {"$set": {"holder": holder, "expires_at": expires_at}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @classmethod
+    async def release_lease(
+        cls: Any, db: Any, name: str, holder: str
+    ) -> None:  # pragma: no cover
+        """Release a lease, if held by holder."""
+        await db.leases_collection.delete_one({"_id": name, "holder": holder})
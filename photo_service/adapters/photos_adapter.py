@@ -1,9 +1,144 @@
 """Module for photo adapter."""
 
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
 from typing import Any
 
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from photo_service.utils.url_utils import url_hash
+
 from .adapter import Adapter
 
+# photo listings are ordered by creation_time, with id as tiebreaker
+PHOTO_SORT = [("creation_time", 1), ("id", 1)]
+# time of the last write, set on every photo written, for change polling
+MODIFIED_FIELD = "modified_at"
+# hash of the normalized g_base_url, for lookups on a small index
+G_BASE_URL_HASH_FIELD = "g_base_url_hash"
+# time g_base_url was written, base urls from google expire
+G_BASE_URL_TIME_FIELD = "g_base_url_at"
+# documents are returned without the mongo _id and the fields kept by the adapter
+PHOTO_PROJECTION = {
+    "_id": 0,
+    MODIFIED_FIELD: 0,
+    G_BASE_URL_HASH_FIELD: 0,
+    G_BASE_URL_TIME_FIELD: 0,
+}
+# the changes to photos pushed to watchers
+# updates without a new modified_at, e.g. renewed base urls, are left out
+WATCH_PIPELINE = [
+    {
+        "$match": {
+            "$or": [
+                {"operationType": {"$in": ["insert", "replace"]}},
+                {
+                    "operationType": "update",
+                    f"updateDescription.updatedFields.{MODIFIED_FIELD}": {
+                        "$exists": True
+                    },
+                },
+            ]
+        }
+    }
+]
+# starred photos first, then newest first
+STARRED_FIRST_SORT = [("starred", -1), ("creation_time", -1), ("id", -1)]
+
+
+def _stamp(fields: dict, modified_at: datetime) -> dict:
+    """Add the time of the write, and the hash and time of g_base_url if written."""
+    fields = {**fields, MODIFIED_FIELD: modified_at}
+    if "g_base_url" in fields:
+        fields.update(_g_base_url_fields(fields["g_base_url"], modified_at))
+    return fields
+
+
+def _g_base_url_fields(g_base_url: str | None, written_at: datetime) -> dict:
+    """Build g_base_url with its hash and the time it was written.
+
+    The time is set also when g_base_url is written as None, so that the
+    refresh does not pick a photo without url again until it is stale.
+    """
+    return {
+        "g_base_url": g_base_url,
+        G_BASE_URL_HASH_FIELD: url_hash(g_base_url) if g_base_url else None,
+        G_BASE_URL_TIME_FIELD: written_at,
+    }
+
+
+def _photos_filter(filters: dict) -> dict:
+    """Build the query filter for a photo listing.
+
+    Supported filters are event_id, race_id, raceclass, starred, bibs,
+    matching photos with any of the bibs in biblist, and clubs, matching
+    photos with any of the clubs in clublist.
+    """
+    query: dict = {}
+    if filters.get("race_id"):
+        query["race_id"] = filters["race_id"]
+    else:
+        query["event_id"] = filters.get("event_id")
+        if filters.get("raceclass"):
+            query["raceclass"] = filters["raceclass"]
+    if filters.get("bibs"):
+        bibs = filters["bibs"]
+        query["biblist"] = bibs[0] if len(bibs) == 1 else {"$in": bibs}
+    if filters.get("clubs"):
+        clubs = filters["clubs"]
+        query["clublist"] = clubs[0] if len(clubs) == 1 else {"$in": clubs}
+    if filters.get("starred"):
+        query["starred"] = True
+    return query
+
+
+def _g_base_url_filter(g_base_urls: list[str], *, unhashed: bool = False) -> dict:
+    """Build the filter matching photos by the hashes of the base urls.
+
+    With unhashed, photos with a base url written before it was hashed are
+    also matched on the url itself, until hash_g_base_urls has hashed them.
+    """
+    hashed = {G_BASE_URL_HASH_FIELD: {"$in": [url_hash(u) for u in g_base_urls]}}
+    if not unhashed:
+        return hashed
+    return {"$or": [hashed, {"g_base_url": {"$in": g_base_urls}}]}
+
+
+def _photo_ids_by_g_base_url(g_base_urls: list[str], photos: list[dict]) -> dict:
+    """Map the photos found by _g_base_url_filter to the base urls they match.
+
+    Base urls normalized to the same hash all get the id of the photo.
+    """
+    by_hash: dict[str, list[str]] = {}
+    for g_base_url in g_base_urls:
+        by_hash.setdefault(url_hash(g_base_url), []).append(g_base_url)
+    found = {}
+    for photo in photos:
+        # photos written before base urls were hashed are hashed here
+        photo_hash = photo.get(G_BASE_URL_HASH_FIELD) or url_hash(photo["g_base_url"])
+        for g_base_url in by_hash.get(photo_hash, []):
+            found[g_base_url] = photo["id"]
+    return found
+
+
+def _keyset_filter(after: tuple) -> dict:
+    """Build the filter selecting photos positioned after (creation_time, id)."""
+    creation_time, c_id = after
+    if creation_time is None:
+        return {
+            "$or": [
+                {"creation_time": {"$ne": None}},
+                {"creation_time": None, "id": {"$gt": c_id}},
+            ]
+        }
+    return {
+        "$or": [
+            {"creation_time": {"$gt": creation_time}},
+            {"creation_time": creation_time, "id": {"$gt": c_id}},
+        ]
+    }
+
 
 class PhotosAdapter(Adapter):
     """Class representing an adapter for photos."""
@@ -11,7 +146,29 @@ class PhotosAdapter(Adapter):
     @classmethod
     async def create_photo(cls: Any, db: Any, photo: dict) -> str:  # pragma: no cover
         """Create photo function."""
-        return await db.photos_collection.insert_one(photo)
+        return await db.photos_collection.insert_one(_stamp(photo, datetime.now(UTC)))
+
+    @classmethod
+    async def create_photos(
+        cls: Any, db: Any, photos: list[dict]
+    ) -> dict[int, str]:  # pragma: no cover
+        """Create photos with one unordered insert_many.
+
+        Returns:
+            dict[int, str]: Error messages of the photos not inserted, by index.
+
+        """
+        modified_at = datetime.now(UTC)
+        try:
+            await db.photos_collection.insert_many(
+                [_stamp(photo, modified_at) for photo in photos], ordered=False
+            )
+        except BulkWriteError as e:
+            return {
+                error["index"]: error.get("errmsg", "Insert failed.")
+                for error in e.details.get("writeErrors", [])
+            }
+        return {}
 
     @classmethod
     async def get_all_photos(
@@ -20,15 +177,17 @@ class PhotosAdapter(Adapter):
         """Get all photos function."""
         cursor = db.photos_collection.find(
             {"event_id": event_id}
-        ).sort("time", -1)
+        ).sort(PHOTO_SORT)
         return await cursor.to_list(None)
 
     @classmethod
     async def get_photo_by_g_base_url(
-        cls: Any, db: Any, g_base_url: str
+        cls: Any, db: Any, g_base_url: str, *, unhashed: bool = False
     ) -> dict:  # pragma: no cover
-        """Get photo function."""
-        return await db.photos_collection.find_one({"g_base_url": g_base_url})
+        """Get photo function, by the hash of the normalized base url."""
+        return await db.photos_collection.find_one(
+            _g_base_url_filter([g_base_url], unhashed=unhashed), PHOTO_PROJECTION
+        )
 
     @classmethod
     async def get_photo_by_g_id(
@@ -37,6 +196,89 @@ class PhotosAdapter(Adapter):
         """Get photo function."""
         return await db.photos_collection.find_one({"g_id": g_id})
 
+    @classmethod
+    async def get_photo_ids_by(
+        cls: Any, db: Any, field: str, values: list[str]
+    ) -> dict[str, str]:  # pragma: no cover
+        """Get the ids of the photos with the given values of field, in one query.
+
+        Returns:
+            dict[str, str]: The photo id by value, for the values found.
+
+        """
+        cursor = db.photos_collection.find(
+            {field: {"$in": values}}, {"_id": 0, "id": 1, field: 1}
+        )
+        return {photo[field]: photo["id"] async for photo in cursor}
+
+    @classmethod
+    async def get_photo_ids_by_g_base_urls(
+        cls: Any, db: Any, g_base_urls: list[str], *, unhashed: bool = False
+    ) -> dict[str, str]:  # pragma: no cover
+        """Get the ids of the photos with the given base urls, in one query.
+
+        Returns:
+            dict[str, str]: The photo id by base url, for the base urls found.
+
+        """
+        cursor = db.photos_collection.find(
+            _g_base_url_filter(g_base_urls, unhashed=unhashed),
+            {"_id": 0, "id": 1, "g_base_url": 1, G_BASE_URL_HASH_FIELD: 1},
+        )
+        return _photo_ids_by_g_base_url(g_base_urls, await cursor.to_list(None))
+
+    @classmethod
+    async def get_photos_without_g_base_url_hash(
+        cls: Any, db: Any, limit: int
+    ) -> list[dict]:  # pragma: no cover
+        """Get photos with a g_base_url written before it was hashed."""
+        cursor = db.photos_collection.find(
+            {G_BASE_URL_HASH_FIELD: None, "g_base_url": {"$type": "string"}},
+            {"_id": 0, "id": 1, "g_base_url": 1},
+        ).limit(limit)
+        return await cursor.to_list(None)
+
+    @classmethod
+    async def set_g_base_url_hashes(
+        cls: Any, db: Any, photos: list[dict]
+    ) -> int:  # pragma: no cover
+        """Set the hash of g_base_url on photos, returning the modified count."""
+        result = await db.photos_collection.bulk_write(
+            [
+                UpdateOne(
+                    {"id": photo["id"], "g_base_url": photo["g_base_url"]},
+                    {"$set": {G_BASE_URL_HASH_FIELD: url_hash(photo["g_base_url"])}},
+                )
+                for photo in photos
+            ],
+            ordered=False,
+        )
+        return result.modified_count
+
+    @classmethod
+    async def drop_g_base_url_index(cls: Any, db: Any) -> None:  # pragma: no cover
+        """Drop the index on the full g_base_url, not needed once all are hashed."""
+        if "g_base_url_1" in await db.photos_collection.index_information():
+            await db.photos_collection.drop_index("g_base_url_1")
+
+    @classmethod
+    async def get_photos_with_stale_g_base_url(
+        cls: Any, db: Any, before: datetime, limit: int
+    ) -> list[dict]:  # pragma: no cover
+        """Get photos from google with g_base_url not written since before, oldest first."""
+        cursor = (
+            db.photos_collection.find(
+                {
+                    "g_id": {"$type": "string"},
+                    G_BASE_URL_TIME_FIELD: {"$not": {"$gte": before}},
+                },
+                {"_id": 0, "id": 1, "g_id": 1, "g_base_url": 1, "event_id": 1},
+            )
+            .sort(G_BASE_URL_TIME_FIELD, 1)
+            .limit(limit)
+        )
+        return await cursor.to_list(None)
+
     @classmethod
     async def get_photo_by_id(cls: Any, db: Any, c_id: str) -> dict:  # pragma: no cover
         """Get photo function."""
@@ -49,7 +291,7 @@ class PhotosAdapter(Adapter):
         """Get all photos by race_id function."""
         cursor = db.photos_collection.find(
             {"race_id": race_id}
-        ).sort("time", -1)
+        ).sort(PHOTO_SORT)
         return await cursor.to_list(None)
 
     @classmethod
@@ -59,7 +301,7 @@ class PhotosAdapter(Adapter):
         """Get all photos by raceclass function."""
         cursor = db.photos_collection.find(
             {"raceclass": raceclass, "event_id": event_id}
-        ).sort("time", -1)
+        ).sort(PHOTO_SORT)
         return await cursor.to_list(None)
 
     @classmethod
@@ -69,7 +311,7 @@ class PhotosAdapter(Adapter):
         """Get all photos by raceclass function."""
         cursor = db.photos_collection.find(
             {"starred": True, "raceclass": raceclass, "event_id": event_id}
-        ).sort("time", -1)
+        ).sort(PHOTO_SORT)
         return await cursor.to_list(None)
 
     @classmethod
@@ -79,19 +321,158 @@ class PhotosAdapter(Adapter):
         """Get all photos by raceclass function."""
         cursor = db.photos_collection.find(
             {"starred": True, "event_id": event_id}
-        ).sort("time", -1)
+        ).sort(PHOTO_SORT)
+        return await cursor.to_list(None)
+
+    @classmethod
+    async def iter_photos(
+        cls: Any, db: Any, filters: dict
+    ) -> AsyncIterator[dict]:  # pragma: no cover
+        """Iterate over photos as they are read from the db."""
+        cursor = db.photos_collection.find(
+            _photos_filter(filters), PHOTO_PROJECTION
+        ).sort(PHOTO_SORT)
+        async for photo in cursor:
+            yield photo
+
+    @classmethod
+    async def get_photos_page(
+        cls: Any, db: Any, filters: dict, page_size: int, after: tuple | None = None
+    ) -> list:  # pragma: no cover
+        """Get one page of photos, positioned after the (creation_time, id) key."""
+        query = _photos_filter(filters)
+        if after:
+            query = {"$and": [query, _keyset_filter(after)]}
+        cursor = db.photos_collection.find(query).sort(PHOTO_SORT).limit(page_size)
+        return await cursor.to_list(None)
+
+    @classmethod
+    async def get_photos_starred_first(
+        cls: Any, db: Any, filters: dict, limit: int
+    ) -> list:  # pragma: no cover
+        """Get at most limit photos, starred photos first, then newest first."""
+        cursor = (
+            db.photos_collection.find(_photos_filter(filters))
+            .sort(STARRED_FIRST_SORT)
+            .limit(limit)
+        )
+        return await cursor.to_list(None)
+
+    @classmethod
+    async def get_club_counts(
+        cls: Any, db: Any, event_id: str
+    ) -> list[dict]:  # pragma: no cover
+        """Count the photos of every club of an event, in one aggregation."""
+        cursor = db.photos_collection.aggregate(
+            [
+                {"$match": {"event_id": event_id}},
+                {"$unwind": "$clublist"},
+                {"$group": {"_id": "$clublist", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$project": {"_id": 0, "club": "$_id", "count": 1}},
+            ]
+        )
+        return await cursor.to_list(None)
+
+    @classmethod
+    async def get_photos_by_ids(
+        cls: Any, db: Any, ids: list[str]
+    ) -> list[dict]:  # pragma: no cover
+        """Get the photos with the given ids, in one query."""
+        cursor = db.photos_collection.find({"id": {"$in": ids}}, PHOTO_PROJECTION)
         return await cursor.to_list(None)
 
+    @classmethod
+    async def get_existing_g_ids(
+        cls: Any, db: Any, g_ids: list[str]
+    ) -> set[str]:  # pragma: no cover
+        """Get which of the given google ids are stored, in one query."""
+        cursor = db.photos_collection.find(
+            {"g_id": {"$in": g_ids}}, {"_id": 0, "g_id": 1}
+        )
+        return {photo["g_id"] async for photo in cursor}
+
+    @classmethod
+    async def watch_photos(
+        cls: Any, db: Any, resume_after: dict | None = None
+    ) -> AsyncIterator[dict]:  # pragma: no cover
+        """Iterate over change events of created and updated photos.
+
+        Raises:
+            OperationFailure: change streams are not supported by the server
+
+        """
+        async with db.photos_collection.watch(
+            WATCH_PIPELINE, full_document="updateLookup", resume_after=resume_after
+        ) as stream:
+            async for change in stream:
+                yield change
+
+    @classmethod
+    async def get_photos_modified_since(
+        cls: Any, db: Any, since: datetime
+    ) -> list[dict]:  # pragma: no cover
+        """Get photos written at or after since, with the time of the write."""
+        cursor = db.photos_collection.find(
+            {MODIFIED_FIELD: {"$gte": since}}, {"_id": 0}
+        ).sort(MODIFIED_FIELD, 1)
+        return await cursor.to_list(None)
+
+    @classmethod
+    async def update_photos(
+        cls: Any, db: Any, patches: list[tuple[str, dict]]
+    ) -> dict:  # pragma: no cover
+        """Set fields on many photos with one unordered bulk_write.
+
+        Returns:
+            dict: The matched and modified counts.
+
+        """
+        modified_at = datetime.now(UTC)
+        result = await db.photos_collection.bulk_write(
+            [
+                UpdateOne({"id": c_id}, {"$set": _stamp(fields, modified_at)})
+                for c_id, fields in patches
+            ],
+            ordered=False,
+        )
+        return {"matched": result.matched_count, "modified": result.modified_count}
+
+    @classmethod
+    async def set_g_base_urls(
+        cls: Any, db: Any, g_base_urls: list[tuple[str, str | None]]
+    ) -> None:  # pragma: no cover
+        """Set renewed base urls with one unordered bulk_write.
+
+        modified_at is not changed, so that watchers do not send the photos
+        again for a new url of the same media item.
+        """
+        written_at = datetime.now(UTC)
+        await db.photos_collection.bulk_write(
+            [
+                UpdateOne(
+                    {"id": c_id}, {"$set": _g_base_url_fields(g_base_url, written_at)}
+                )
+                for c_id, g_base_url in g_base_urls
+            ],
+            ordered=False,
+        )
+
     @classmethod
     async def update_photo(
         cls: Any, db: Any, c_id: str, photo: dict
-    ) -> str | None:  # pragma: no cover
-        """Get photo function."""
-        return await db.photos_collection.replace_one({"id": c_id}, photo)
+    ) -> dict | None:  # pragma: no cover
+        """Replace photo function, returning the old photo or None if not found."""
+        photo = _stamp(photo, datetime.now(UTC))
+        return await db.photos_collection.find_one_and_replace(
+            {"id": c_id}, photo, projection=PHOTO_PROJECTION
+        )
 
     @classmethod
     async def delete_photo(
         cls: Any, db: Any, c_id: str
-    ) -> str | None:  # pragma: no cover
-        """Get photo function."""
-        return await db.photos_collection.delete_one({"id": c_id})
+    ) -> dict | None:  # pragma: no cover
+        """Delete photo function, returning the deleted photo or None if not found."""
+        return await db.photos_collection.find_one_and_delete(
+            {"id": c_id}, projection=PHOTO_PROJECTION
+        )
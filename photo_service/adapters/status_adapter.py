@@ -1,10 +1,22 @@
 """Module for status adapter."""
 
 import logging
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
 from typing import Any
 
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
 from .adapter import Adapter
 
+# time of the insert, as a date for the ttl index, not part of the model
+CREATED_FIELD = "created_at"
+# documents are returned without the mongo _id and the time of insert
+STATUS_PROJECTION = {"_id": 0, CREATED_FIELD: 0}
+# status are never updated, only inserts are watched
+WATCH_PIPELINE = [{"$match": {"operationType": "insert"}}]
+
 
 class StatusAdapter(Adapter):
     """Class representing an adapter for status messages."""
@@ -12,7 +24,31 @@ class StatusAdapter(Adapter):
     @classmethod
     async def create_status(cls: Any, db: Any, status: dict) -> str:  # pragma: no cover
         """Create status function."""
-        return await db.status_collection.insert_one(status)
+        return await db.status_collection.insert_one(
+            {**status, CREATED_FIELD: datetime.now(UTC)}
+        )
+
+    @classmethod
+    async def create_many_status(
+        cls: Any, db: Any, status: list[dict]
+    ) -> dict[int, str]:  # pragma: no cover
+        """Create status with one unordered insert_many.
+
+        Returns:
+            dict[int, str]: Error messages of the status not inserted, by index.
+
+        """
+        created_at = datetime.now(UTC)
+        try:
+            await db.status_collection.insert_many(
+                [{**s, CREATED_FIELD: created_at} for s in status], ordered=False
+            )
+        except BulkWriteError as e:
+            return {
+                error["index"]: error.get("errmsg", "Insert failed.")
+                for error in e.details.get("writeErrors", [])
+            }
+        return {}
 
     @classmethod
     async def get_status_by_id(cls: Any, db: Any, c_id: str) -> dict:  # pragma: no cover
@@ -49,6 +85,96 @@ class StatusAdapter(Adapter):
             logging.exception(err_msg)
         return []
 
+    @classmethod
+    async def iter_status(
+        cls: Any, db: Any, event_id: str, count: int, status_type: str | None = None
+    ) -> AsyncIterator[dict]:  # pragma: no cover
+        """Iterate over the latest status as they are read from the db."""
+        query = {"event_id": event_id}
+        if status_type:
+            query["type"] = status_type
+        cursor = (
+            db.status_collection.find(query, STATUS_PROJECTION)
+            .sort("time", -1)
+            .limit(count)
+        )
+        async for status in cursor:
+            yield status
+
+    @classmethod
+    async def watch_status(
+        cls: Any, db: Any, resume_after: dict | None = None
+    ) -> AsyncIterator[dict]:  # pragma: no cover
+        """Iterate over change events of created status.
+
+        Raises:
+            OperationFailure: change streams are not supported by the server
+
+        """
+        async with db.status_collection.watch(
+            WATCH_PIPELINE, resume_after=resume_after
+        ) as stream:
+            async for change in stream:
+                yield change
+
+    @classmethod
+    async def get_status_created_since(
+        cls: Any, db: Any, since: datetime
+    ) -> list[dict]:  # pragma: no cover
+        """Get status created at or after since, with the mongo _id.
+
+        The time of creation is read from the _id, which is created by the driver.
+        """
+        cursor = db.status_collection.find(
+            {"_id": {"$gte": ObjectId.from_datetime(since)}}
+        ).sort("_id", 1)
+        return await cursor.to_list(None)
+
+    @classmethod
+    async def get_status_groups_larger_than(
+        cls: Any, db: Any, count: int
+    ) -> list[dict]:  # pragma: no cover
+        """Get the (event_id, type) of status groups with more than count status."""
+        cursor = db.status_collection.aggregate(
+            [
+                {
+                    "$group": {
+                        "_id": {"event_id": "$event_id", "type": "$type"},
+                        "count": {"$sum": 1},
+                    }
+                },
+                {"$match": {"count": {"$gt": count}}},
+            ]
+        )
+        return [group["_id"] async for group in cursor]
+
+    @classmethod
+    async def delete_status_older_than_latest(
+        cls: Any, db: Any, event_id: str, status_type: str, count: int
+    ) -> int:  # pragma: no cover
+        """Delete status of an event and type older than the latest count.
+
+        Status with the same time as the oldest one kept are kept as well.
+
+        Returns:
+            int: The number of deleted status.
+
+        """
+        query = {"event_id": event_id, "type": status_type}
+        cursor = (
+            db.status_collection.find(query, {"time": 1})
+            .sort("time", -1)
+            .skip(count - 1)
+            .limit(1)
+        )
+        oldest_kept = await cursor.to_list(None)
+        if not oldest_kept:
+            return 0
+        result = await db.status_collection.delete_many(
+            {**query, "time": {"$lt": oldest_kept[0]["time"]}}
+        )
+        return result.deleted_count
+
     @classmethod
     async def delete_status(
         cls: Any, db: Any, c_id: str
@@ -1,32 +1,77 @@
 """Module for users adapter."""
 
+import hashlib
+import logging
 import os
+import time
 from http import HTTPStatus
 from typing import Any
 
-from aiohttp import ClientSession
+import jwt
 from aiohttp.web import (
     HTTPForbidden,
     HTTPInternalServerError,
     HTTPUnauthorized,
 )
 
+from photo_service.utils.http_utils import client_session
+from photo_service.utils.jwt_utils import authorize_token_locally
+from photo_service.utils.ttl_cache import TTLCache
+
 USERS_HOST_SERVER = os.getenv("USERS_HOST_SERVER", "localhost")
 USERS_HOST_PORT = os.getenv("USERS_HOST_PORT", "8086")
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+AUTH_LOCAL_VERIFY = os.getenv("AUTH_LOCAL_VERIFY", "false").lower() in ["true", "1"]
+
+
+def _token_expires_in(token: str) -> float | None:
+    """Return seconds until the exp claim of the token, None if it has no exp."""
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+    except jwt.InvalidTokenError:
+        return None
+    exp = claims.get("exp")
+    if exp is None:
+        return None
+    return float(exp) - time.time()
 
 
 class UsersAdapter:
     """Class representing an adapter for events."""
 
+    # positive authorization decisions, keyed by token hash and roles
+    authorization_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+
+    @classmethod
+    def _cache_key(cls: Any, token: str, roles: list) -> str:
+        """Create the cache key for a (token, roles) decision."""
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        return f"{token_hash}:{','.join(sorted(roles))}"
+
     @classmethod
     async def authorize(cls: Any, token: str | None, roles: list) -> None:
-        """Try to authorize."""
+        """Try to authorize.
+
+        With AUTH_LOCAL_VERIFY the token is verified locally first, and the
+        users service is only asked if the token cannot be decided locally.
+        """
+        if AUTH_LOCAL_VERIFY and authorize_token_locally(token, roles):
+            return
+        cache_key = cls._cache_key(token, roles) if token else None
+        if cache_key and cls.authorization_cache.get(cache_key):
+            return
+
         url = f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize"
         body = {"token": token, "roles": roles}
 
-        async with ClientSession() as session, session.post(url, json=body) as response:
+        async with (
+            client_session() as session,
+            session.post(url, json=body) as response,
+        ):
             if response.status == HTTPStatus.NO_CONTENT:
-                pass
+                if cache_key:
+                    cls._cache_authorization(cache_key, str(token))
             elif response.status == HTTPStatus.UNAUTHORIZED:
                 raise HTTPUnauthorized from None
             elif response.status == HTTPStatus.FORBIDDEN:
@@ -35,3 +80,15 @@ class UsersAdapter:
                 raise HTTPInternalServerError(
                     reason=f"Got unknown status from users service: {response.status}."
                 ) from None
+
+    @classmethod
+    def _cache_authorization(cls: Any, cache_key: str, token: str) -> None:
+        """Cache a positive decision, but never beyond the token exp claim."""
+        expires_in = _token_expires_in(token)
+        cls.authorization_cache.set(cache_key, value=True, ttl=expires_in)
+        logging.debug(f"Authorization cache: {cls.authorization_cache.stats()}")
+
+    @classmethod
+    def authorization_cache_stats(cls: Any) -> dict:
+        """Get hit and miss counters of the authorization cache."""
+        return cls.authorization_cache.stats()
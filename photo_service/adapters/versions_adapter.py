@@ -0,0 +1,40 @@
+"""Module for versions adapter."""
+
+from typing import Any
+
+from pymongo import UpdateOne
+
+
+class VersionsAdapter:
+    """Class representing an adapter for change counters."""
+
+    @classmethod
+    async def get_version(cls: Any, db: Any, scope: str) -> int:  # pragma: no cover
+        """Get the change counter of a scope, 0 if never changed."""
+        version = await db.versions_collection.find_one(
+            {"id": scope}, {"_id": 0, "version": 1}
+        )
+        return version["version"] if version else 0
+
+    @classmethod
+    async def get_versions(
+        cls: Any, db: Any, scopes: list[str]
+    ) -> dict[str, int]:  # pragma: no cover
+        """Get the change counters of many scopes in one query."""
+        cursor = db.versions_collection.find(
+            {"id": {"$in": scopes}}, {"_id": 0, "id": 1, "version": 1}
+        )
+        return {version["id"]: version["version"] async for version in cursor}
+
+    @classmethod
+    async def bump_versions(
+        cls: Any, db: Any, scopes: list[str]
+    ) -> None:  # pragma: no cover
+        """Increment the change counters of the scopes with one bulk write."""
+        await db.versions_collection.bulk_write(
+            [
+                UpdateOne({"id": scope}, {"$inc": {"version": 1}}, upsert=True)
+                for scope in scopes
+            ],
+            ordered=False,
+        )
@@ -1,8 +1,11 @@
 """Module for admin of photo service."""
 
+import asyncio
+import contextlib
 import logging
 import os
 from collections.abc import AsyncGenerator
+from functools import partial
 from typing import Any
 
 from aiohttp import web
@@ -11,17 +14,34 @@ from aiohttp_middlewares.cors import cors_middleware
 from aiohttp_middlewares.error import error_middleware
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
+from .commands.album_sync import sync_albums
+from .commands.background_jobs import run_background_jobs
+from .commands.config_cache_sync import sync_config_cache
+from .commands.g_base_url_refresh import hash_g_base_urls, refresh_g_base_urls
+from .commands.status_compaction import compact_status
+from .services import PhotosWatcher, StatusWatcher
+from .services.config_service import CONFIG_CACHE_SYNC_INTERVAL
+from .utils.db_utils import create_indexes
+from .utils.etag_utils import set_etag_header
+from .utils.http_utils import create_client_session, set_client_session
 from .views import (
     AlbumsView,
     AlbumView,
     ConfigsView,
     ConfigView,
+    EventVersionView,
     GooglePhotosView,
+    PhotosBatchView,
+    PhotosClubsView,
+    PhotosLookupView,
+    PhotosStreamView,
     PhotosView,
     PhotoView,
     Ping,
     Ready,
+    StatusBatchView,
     StatusView,
+    StatusWebSocketView,
     UnitTestView,
 )
 
@@ -31,6 +51,65 @@ DB_PORT = int(os.getenv("DB_PORT", "27017"))
 DB_NAME = os.getenv("DB_NAME", "test")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
+DB_CREATE_INDEXES = os.getenv("DB_CREATE_INDEXES", "true").lower() in ["true", "1"]
+STATUS_KEEP_LAST = int(os.getenv("STATUS_KEEP_LAST", "0"))
+STATUS_COMPACTION_INTERVAL = float(os.getenv("STATUS_COMPACTION_INTERVAL", "3600"))
+ALBUM_SYNC_INTERVAL = float(os.getenv("ALBUM_SYNC_INTERVAL", "0"))
+JOBS_LEASE_DURATION = float(os.getenv("JOBS_LEASE_DURATION", "30"))
+G_BASE_URL_REFRESH_INTERVAL = float(os.getenv("G_BASE_URL_REFRESH_INTERVAL", "0"))
+G_BASE_URL_REFRESH_BATCH = int(os.getenv("G_BASE_URL_REFRESH_BATCH", "500"))
+
+
+async def config_cache_context(app: Application) -> AsyncGenerator[None]:
+    """Drop cached configs changed by other workers, if enabled."""
+    task = None
+    if CONFIG_CACHE_SYNC_INTERVAL > 0:
+        task = asyncio.create_task(
+            sync_config_cache(app["db"], CONFIG_CACHE_SYNC_INTERVAL)
+        )
+
+    yield
+
+    if task:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+async def background_jobs_context(app: Application) -> AsyncGenerator[None]:
+    """Run the enabled background jobs, in the one worker holding the jobs lease.
+
+    The indexes are created by the holder first, if enabled, so that the
+    status collection is not converted to capped by one worker while
+    another is creating its indexes or compacting it.
+    """
+    db = app["db"]
+    setup = partial(create_indexes, db) if DB_CREATE_INDEXES else None
+    jobs = [partial(hash_g_base_urls, db, G_BASE_URL_REFRESH_BATCH)]
+    if STATUS_KEEP_LAST > 0:
+        jobs.append(
+            partial(compact_status, db, STATUS_KEEP_LAST, STATUS_COMPACTION_INTERVAL)
+        )
+    if ALBUM_SYNC_INTERVAL > 0:
+        jobs.append(partial(sync_albums, db, ALBUM_SYNC_INTERVAL))
+    if G_BASE_URL_REFRESH_INTERVAL > 0:
+        jobs.append(
+            partial(
+                refresh_g_base_urls,
+                db,
+                G_BASE_URL_REFRESH_INTERVAL,
+                G_BASE_URL_REFRESH_BATCH,
+            )
+        )
+    task = asyncio.create_task(
+        run_background_jobs(db, jobs, JOBS_LEASE_DURATION, setup)
+    )
+
+    yield
+
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
 
 
 async def create_app() -> web.Application:
@@ -45,6 +124,9 @@ async def create_app() -> web.Application:
     logging.basicConfig(level=LOGGING_LEVEL)
     logging.getLogger("chardet.charsetprober").setLevel(LOGGING_LEVEL)
 
+    # Set the etag of conditional get requests on the response:
+    app.on_response_prepare.append(set_etag_header)
+
     # Set up routes:
     app.add_routes(
         [
@@ -52,13 +134,20 @@ async def create_app() -> web.Application:
             web.view("/albums/{albumId}", AlbumView),
             web.view("/configs", ConfigsView),
             web.view("/config", ConfigView),
+            web.view("/events/{eventId}/version", EventVersionView),
             web.view("/g_photos", GooglePhotosView),
             web.view("/g_photos/{albumId}", GooglePhotosView),
             web.view("/ping", Ping),
             web.view("/ready", Ready),
             web.view("/photos", PhotosView),
+            web.view("/photos:batch", PhotosBatchView),
+            web.view("/photos:lookup", PhotosLookupView),
+            web.view("/photos/clubs", PhotosClubsView),
+            web.view("/photos/stream", PhotosStreamView),
             web.view("/photos/{photoId}", PhotoView),
             web.view("/status", StatusView),
+            web.view("/status:batch", StatusBatchView),
+            web.view("/status/ws", StatusWebSocketView),
             web.view("/unit_test", UnitTestView),
         ]
     )
@@ -76,6 +165,40 @@ async def create_app() -> web.Application:
 
         client.close()
 
+    async def http_client_context(app: Application) -> AsyncGenerator[None]:
+        # Set up the client session shared by all outbound requests:
+        session = create_client_session()
+        app["client_session"] = session
+        set_client_session(session)
+
+        yield
+
+        set_client_session(None)
+        await session.close()
+
+    async def photos_watcher_context(app: Application) -> AsyncGenerator[None]:
+        # One watcher of photo writes per worker, shared by all streams:
+        watcher = PhotosWatcher(app["db"])
+        app["photos_watcher"] = watcher
+
+        yield
+
+        await watcher.stop()
+
+    async def status_watcher_context(app: Application) -> AsyncGenerator[None]:
+        # One watcher of created status per worker, shared by all websockets:
+        watcher = StatusWatcher(app["db"])
+        app["status_watcher"] = watcher
+
+        yield
+
+        await watcher.stop()
+
     app.cleanup_ctx.append(mongo_context)
+    app.cleanup_ctx.append(http_client_context)
+    app.cleanup_ctx.append(config_cache_context)
+    app.cleanup_ctx.append(background_jobs_context)
+    app.cleanup_ctx.append(photos_watcher_context)
+    app.cleanup_ctx.append(status_watcher_context)
 
     return app
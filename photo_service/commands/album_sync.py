@@ -0,0 +1,20 @@
+"""Module for the album sync command."""
+
+import asyncio
+import logging
+from typing import Any
+
+from photo_service.services import AlbumSyncService, GooglePhotosService
+
+
+async def sync_albums(db: Any, interval: float) -> None:
+    """Sync albums with sync_on from google photos, every interval seconds."""
+    while True:
+        try:
+            token = await GooglePhotosService.get_access_token()
+            results = await AlbumSyncService.sync_albums(db, token)
+        except Exception:
+            logging.exception("Error occurred while syncing albums")
+        else:
+            logging.debug(f"Synced {len(results)} albums")
+        await asyncio.sleep(interval)
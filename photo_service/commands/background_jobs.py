@@ -0,0 +1,81 @@
+"""Module for the background jobs command."""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from photo_service.services import LeaseService
+
+# the lease of the worker running the background jobs
+JOBS_LEASE = "background_jobs"
+
+
+async def run_background_jobs(
+    db: Any,
+    jobs: list[Callable[[], Awaitable[None]]],
+    lease_duration: float,
+    setup: Callable[[], Awaitable[None]] | None = None,
+) -> None:
+    """Run the jobs in the one worker holding the jobs lease, until cancelled.
+
+    Every worker tries to take the lease every third of its duration. The
+    holder runs setup, if any, then the jobs, and renews the lease. If a
+    renewal fails, the jobs are cancelled and the worker goes back to trying
+    to take the lease. A lease not renewed, e.g. by a worker that died, is
+    taken by another worker after lease_duration seconds.
+    """
+    while True:
+        if await _renew(db, lease_duration):
+            logging.info("Took the jobs lease, running the background jobs")
+            try:
+                await _run_while_leased(db, jobs, lease_duration, setup)
+            except asyncio.CancelledError:
+                # the jobs are stopped, let another worker take over at once
+                with contextlib.suppress(Exception):
+                    await LeaseService.release(db, JOBS_LEASE)
+                raise
+            logging.warning("Lost the jobs lease, stopped the background jobs")
+        await asyncio.sleep(lease_duration / 3)
+
+
+async def _renew(db: Any, lease_duration: float) -> bool:
+    """Take or renew the jobs lease, False if held by another worker or failed."""
+    try:
+        return await LeaseService.acquire(db, JOBS_LEASE, lease_duration)
+    except Exception:
+        logging.exception("Error occurred while taking the jobs lease")
+        return False
+
+
+async def _run_while_leased(
+    db: Any,
+    jobs: list[Callable[[], Awaitable[None]]],
+    lease_duration: float,
+    setup: Callable[[], Awaitable[None]] | None,
+) -> None:
+    """Run setup and the jobs until the lease is lost, renewing it."""
+    task = asyncio.create_task(_run_jobs(jobs, setup))
+    try:
+        while True:
+            await asyncio.sleep(lease_duration / 3)
+            if not await _renew(db, lease_duration):
+                return
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+async def _run_jobs(
+    jobs: list[Callable[[], Awaitable[None]]],
+    setup: Callable[[], Awaitable[None]] | None,
+) -> None:
+    """Run setup to completion, then the jobs concurrently."""
+    if setup:
+        try:
+            await setup()
+        except Exception:
+            logging.exception("Error occurred while setting up the background jobs")
+    await asyncio.gather(*(job() for job in jobs), return_exceptions=True)
@@ -0,0 +1,20 @@
+"""Module for the config cache sync command."""
+
+import asyncio
+import logging
+from typing import Any
+
+from photo_service.services import ConfigService
+
+
+async def sync_config_cache(db: Any, interval: float) -> None:
+    """Drop cached configs changed by other workers, every interval seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await ConfigService.sync_config_cache(db)
+        except Exception:
+            logging.exception("Error occurred while syncing the config cache")
+            continue
+        if removed:
+            logging.debug(f"Removed {removed} changed configs from the cache")
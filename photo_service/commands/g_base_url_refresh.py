@@ -0,0 +1,39 @@
+"""Module for the g_base_url refresh command."""
+
+import asyncio
+import logging
+from typing import Any
+
+from photo_service.services import GooglePhotosService, PhotosService
+
+
+async def hash_g_base_urls(db: Any, limit: int, retry_interval: float = 60) -> None:
+    """Hash the base urls written before they were hashed, limit at a time.
+
+    Returns when no base url is left to hash. Until then, photos not hashed
+    are looked up by the g_base_url index.
+    """
+    while True:
+        try:
+            hashed = await PhotosService.hash_g_base_urls(db, limit)
+        except Exception:
+            logging.exception("Error occurred while hashing base urls")
+            await asyncio.sleep(retry_interval)
+            continue
+        if not hashed:
+            return
+        logging.info(f"Hashed {hashed} base urls")
+
+
+async def refresh_g_base_urls(db: Any, interval: float, limit: int) -> None:
+    """Renew up to limit base urls of photos, every interval seconds."""
+    while True:
+        try:
+            token = await GooglePhotosService.get_access_token()
+            refreshed = await PhotosService.refresh_g_base_urls(db, token, limit)
+        except Exception:
+            logging.exception("Error occurred while refreshing base urls")
+        else:
+            if refreshed:
+                logging.info(f"Renewed {refreshed} base urls")
+        await asyncio.sleep(interval)
@@ -0,0 +1,20 @@
+"""Module for the status compaction command."""
+
+import asyncio
+import logging
+from typing import Any
+
+from photo_service.services import StatusService
+
+
+async def compact_status(db: Any, keep_last: int, interval: float) -> None:
+    """Keep the latest keep_last status per event and type, every interval seconds."""
+    while True:
+        try:
+            deleted = await StatusService.compact_status(db, keep_last)
+        except Exception:
+            logging.exception("Error occurred while compacting status")
+        else:
+            if deleted:
+                logging.info(f"Deleted {deleted} old status")
+        await asyncio.sleep(interval)
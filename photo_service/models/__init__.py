@@ -2,6 +2,13 @@
 
 from .album_model import Album
 from .changelog import Changelog
+from .codec import (
+    ALBUM_CODEC,
+    CONFIG_CODEC,
+    PHOTO_CODEC,
+    STATUS_CODEC,
+    DataclassCodec,
+)
 from .config_model import Config
 from .photo_model import Photo
 from .status_model import Status
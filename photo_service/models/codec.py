@@ -0,0 +1,157 @@
+"""Fast codec module for the model data classes.
+
+The dataclasses_json mixin inspects type hints and field overrides for
+every document it decodes or encodes. The codecs in this module do that
+inspection once per class, and generate plain python functions doing the
+same conversions as from_dict and to_dict:
+
+- missing fields get the field default, a missing mandatory field
+  raises KeyError
+- values of int, float, str and bool fields, also inside lists, are
+  converted to the field type if they are of another type
+- nested data classes are decoded and encoded with their own codec
+- field level encoder and decoder overrides are applied
+- unknown keys, like the mongo _id, are ignored
+
+Unlike to_dict, encode does not copy nested dicts and lists. The result
+is meant to be serialized right away.
+"""
+
+import dataclasses
+import types
+from collections.abc import Callable
+from typing import Any, Union, get_args, get_origin, get_type_hints
+
+from .album_model import Album
+from .changelog import Changelog
+from .config_model import Config
+from .photo_model import Photo
+from .status_model import Status
+
+PRIMITIVE_TYPES = (int, float, str, bool)
+
+
+def _unwrap_optional(field_type: Any) -> Any:
+    """Return T for Optional[T], the field type otherwise."""
+    if get_origin(field_type) in (Union, types.UnionType):
+        args = [arg for arg in get_args(field_type) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return field_type
+
+
+class DataclassCodec[T]:
+    """Class representing a generated decoder and encoder for a data class."""
+
+    def __init__(self, cls: type[T]) -> None:
+        """Generate the decoder and encoder for cls."""
+        self.cls = cls
+        self.decode: Callable[[dict], T] = self._compile_decoder()
+        self.encode: Callable[[T], dict] = self._compile_encoder()
+
+    def _compile_decoder(self) -> Callable[[dict], T]:
+        """Generate the function decoding a dict into an instance."""
+        cls = self.cls
+        hints = get_type_hints(cls)
+        namespace: dict[str, Any] = {"_cls": cls, "_new": object.__new__}
+        lines = ["def decode(kvs):"]
+        names = []
+        for i, field in enumerate(dataclasses.fields(cls)):
+            name = f"f{i}"
+            names.append((field.name, name))
+            if field.default is not dataclasses.MISSING:
+                namespace[f"_default{i}"] = field.default
+                lines.append(f"    v = kvs.get({field.name!r}, _default{i})")
+            elif field.default_factory is not dataclasses.MISSING:
+                namespace[f"_factory{i}"] = field.default_factory
+                lines.append(
+                    f"    v = kvs[{field.name!r}] if {field.name!r} in kvs"
+                    f" else _factory{i}()"
+                )
+            else:
+                lines.append(f"    v = kvs[{field.name!r}]")
+            expression = self._decode_expression(i, field, hints[field.name], namespace)
+            lines.append(f"    {name} = None if v is None else {expression}")
+        if hasattr(cls, "__post_init__"):
+            arguments = ", ".join(f"{field}={name}" for field, name in names)
+            lines.append(f"    return _cls({arguments})")
+        else:
+            # plain data classes: skip __init__, and set the attributes directly
+            items = ", ".join(f"{field!r}: {name}" for field, name in names)
+            lines.append("    obj = _new(_cls)")
+            lines.append(f"    obj.__dict__.update({{{items}}})")
+            lines.append("    return obj")
+        exec("\n".join(lines), namespace)  # noqa: S102
+        return namespace["decode"]
+
+    @staticmethod
+    def _decode_expression(
+        i: int, field: dataclasses.Field, field_type: Any, namespace: dict
+    ) -> str:
+        """Return the expression decoding the value v of one field."""
+        decoder = field.metadata.get("dataclasses_json", {}).get("decoder")
+        field_type = _unwrap_optional(field_type)
+        if decoder is not None:
+            namespace[f"_type{i}"] = field_type
+            namespace[f"_decoder{i}"] = decoder
+            return f"(v if type(v) is _type{i} else _decoder{i}(v))"
+        if field_type in PRIMITIVE_TYPES:
+            namespace[f"_type{i}"] = field_type
+            return f"(v if isinstance(v, _type{i}) else _type{i}(v))"
+        if dataclasses.is_dataclass(field_type):
+            namespace[f"_codec{i}"] = DataclassCodec(field_type).decode
+            return f"_codec{i}(v)"
+        origin = get_origin(field_type)
+        if field_type is dict or origin is dict:
+            return "dict(v)"
+        if field_type is list or origin is list:
+            item_type = (get_args(field_type) or (Any,))[0]
+            return DataclassCodec._decode_list_expression(i, item_type, namespace)
+        return "v"
+
+    @staticmethod
+    def _decode_list_expression(i: int, item_type: Any, namespace: dict) -> str:
+        """Return the expression decoding the list value v of one field."""
+        if item_type in PRIMITIVE_TYPES:
+            namespace[f"_type{i}"] = item_type
+            return f"[x if isinstance(x, _type{i}) else _type{i}(x) for x in v]"
+        if dataclasses.is_dataclass(item_type):
+            namespace[f"_codec{i}"] = DataclassCodec(item_type).decode
+            return f"[_codec{i}(x) for x in v]"
+        return "list(v)"
+
+    def _compile_encoder(self) -> Callable[[T], dict]:
+        """Generate the function encoding an instance into a dict."""
+        cls = self.cls
+        hints = get_type_hints(cls)
+        namespace: dict[str, Any] = {}
+        items = []
+        for i, field in enumerate(dataclasses.fields(cls)):
+            value = f"obj.{field.name}"
+            encoder = field.metadata.get("dataclasses_json", {}).get("encoder")
+            field_type = _unwrap_optional(hints[field.name])
+            item_type = (get_args(field_type) or (Any,))[0]
+            if encoder is not None:
+                namespace[f"_encoder{i}"] = encoder
+                expression = f"_encoder{i}({value})"
+            elif dataclasses.is_dataclass(field_type):
+                namespace[f"_codec{i}"] = DataclassCodec(field_type).encode
+                expression = f"(None if {value} is None else _codec{i}({value}))"
+            elif get_origin(field_type) is list and dataclasses.is_dataclass(item_type):
+                namespace[f"_codec{i}"] = DataclassCodec(item_type).encode
+                expression = (
+                    f"(None if {value} is None else [_codec{i}(x) for x in {value}])"
+                )
+            else:
+                expression = value
+            items.append(f"{field.name!r}: {expression}")
+        source = f"def encode(obj):\n    return {{{', '.join(items)}}}"
+        exec(source, namespace)  # noqa: S102
+        return namespace["encode"]
+
+
+ALBUM_CODEC = DataclassCodec(Album)
+CHANGELOG_CODEC = DataclassCodec(Changelog)
+CONFIG_CODEC = DataclassCodec(Config)
+PHOTO_CODEC = DataclassCodec(Photo)
+STATUS_CODEC = DataclassCodec(Status)
@@ -1,10 +1,21 @@
 """Package for all services."""
 
+from .album_sync_service import AlbumSyncService
 from .albums_service import AlbumNotFoundError, AlbumsService
 from .config_service import ConfigNotFoundError, ConfigService
 from .exceptions import (
     IllegalValueError,
 )
 from .google_photos_service import GooglePhotosService
+from .lease_service import LeaseService
 from .photos_service import PhotoNotFoundError, PhotosService
+from .photos_watcher import PhotosWatcher
 from .status_service import StatusNotFoundError, StatusService
+from .status_watcher import StatusWatcher
+from .versions_service import (
+    ALBUMS_SCOPE,
+    CONFIGS_SCOPE,
+    GLOBAL_SCOPE,
+    VersionsService,
+)
+from .watcher import Subscription, Watcher
@@ -0,0 +1,137 @@
+"""Module for the album sync service."""
+
+import asyncio
+import logging
+import os
+from datetime import UTC, datetime
+from typing import Any, ClassVar
+
+from photo_service.adapters import AlbumsAdapter, PhotosAdapter
+from photo_service.models import Album
+
+from .albums_service import AlbumsService
+from .google_photos_service import GOOGLE_PHOTO_PAGE_SIZE, GooglePhotosService
+from .photos_service import PhotosService
+from .versions_service import ALBUMS_SCOPE, VersionsService
+
+# albums synced at the same time
+ALBUM_SYNC_CONCURRENCY = int(os.getenv("ALBUM_SYNC_CONCURRENCY", "2"))
+
+
+def media_item_to_photo(album: Album, media_item: dict) -> dict:
+    """Create the body of a new photo from a media item of the album."""
+    return {
+        "name": media_item.get("filename"),
+        "event_id": album.event_id,
+        "creation_time": media_item.get("mediaMetadata", {}).get("creationTime"),
+        "is_photo_finish": album.is_photo_finish,
+        "is_start_registration": album.is_start_registration,
+        "g_id": media_item["id"],
+        "g_product_url": media_item.get("productUrl"),
+        "g_base_url": media_item.get("baseUrl"),
+    }
+
+
+class AlbumSyncService:
+    """Class representing a service syncing albums from google photos.
+
+    The sync job runs in the one worker holding the jobs lease, see
+    run_background_jobs. Within that worker an album is synced by one task
+    at a time.
+    """
+
+    # albums being synced by this worker
+    albums_syncing: ClassVar[set[str]] = set()
+
+    @classmethod
+    async def sync_albums(cls: Any, db: Any, token: str) -> list[dict]:
+        """Sync all albums with sync_on, at most ALBUM_SYNC_CONCURRENCY at a time.
+
+        Args:
+            db (Any): the db
+            token (str): a google photos access token
+
+        Returns:
+            list[dict]: The result of every synced album, see sync_album.
+
+        """
+        albums = [
+            album async for album in AlbumsService.iter_albums(db) if album.sync_on
+        ]
+        semaphore = asyncio.Semaphore(ALBUM_SYNC_CONCURRENCY)
+
+        async def sync(album: Album) -> dict:
+            async with semaphore:
+                try:
+                    return await cls.sync_album(db, token, album)
+                except Exception as e:
+                    logging.exception(f"Error occurred while syncing album {album.id}")
+                    return {"id": album.id, "error": str(e)}
+
+        return await asyncio.gather(*(sync(album) for album in albums))
+
+    @classmethod
+    async def sync_album(cls: Any, db: Any, token: str, album: Album) -> dict:
+        """Create photos for the new media items of an album.
+
+        Media items are read page by page. Per page, the stored google ids
+        are read with one query, and the new media items are inserted with
+        one batch insert. Then last_sync_time and cover_photo_url of the
+        album are set.
+
+        Args:
+            db (Any): the db
+            token (str): a google photos access token
+            album (Album): the album to sync
+
+        Returns:
+            dict: The id of the album with the number of created and failed
+                photos, or skipped if the album is being synced already.
+
+        """
+        if album.g_id in cls.albums_syncing:
+            return {"id": album.id, "skipped": True}
+        cls.albums_syncing.add(album.g_id)
+        try:
+            created = failed = 0
+            page: list[dict] = []
+            async for media_item in GooglePhotosService.iter_media_items(
+                token, album.g_id, GOOGLE_PHOTO_PAGE_SIZE
+            ):
+                page.append(media_item)
+                if len(page) == GOOGLE_PHOTO_PAGE_SIZE:
+                    items = await cls._create_new_photos(db, album, page)
+                    created, failed, page = created + items[0], failed + items[1], []
+            if page:
+                items = await cls._create_new_photos(db, album, page)
+                created, failed = created + items[0], failed + items[1]
+
+            g_album = await GooglePhotosService.get_album(token, album.g_id)
+            fields = {"last_sync_time": datetime.now(UTC).isoformat(timespec="seconds")}
+            if g_album.get("coverPhotoBaseUrl"):
+                fields["cover_photo_url"] = g_album["coverPhotoBaseUrl"]
+            if await AlbumsAdapter.set_album_fields(db, str(album.id), fields):
+                await VersionsService.bump(db, [album.event_id], ALBUMS_SCOPE)
+        finally:
+            cls.albums_syncing.discard(album.g_id)
+        logging.info(f"Synced album {album.id}: {created} created, {failed} failed")
+        return {"id": album.id, "created": created, "failed": failed}
+
+    @classmethod
+    async def _create_new_photos(
+        cls: Any, db: Any, album: Album, media_items: list[dict]
+    ) -> tuple[int, int]:
+        """Create photos of the media items not stored, returning created and failed."""
+        existing = await PhotosAdapter.get_existing_g_ids(
+            db, [media_item["id"] for media_item in media_items]
+        )
+        new_photos = [
+            media_item_to_photo(album, media_item)
+            for media_item in media_items
+            if media_item["id"] not in existing
+        ]
+        if not new_photos:
+            return 0, 0
+        items = await PhotosService.create_photos(db, new_photos)
+        created = sum(1 for item in items if "id" in item)
+        return created, len(items) - created
@@ -2,12 +2,16 @@
 
 import logging
 import uuid
+from collections.abc import AsyncIterator
 from typing import Any
 
+from pymongo.errors import DuplicateKeyError
+
 from photo_service.adapters import AlbumsAdapter
-from photo_service.models import Album
+from photo_service.models import ALBUM_CODEC, Album
 
 from .exceptions import IllegalValueError
+from .versions_service import ALBUMS_SCOPE, VersionsService
 
 
 def create_id() -> str:  # pragma: no cover
@@ -31,7 +35,19 @@ class AlbumsService:
     async def get_all_albums(cls: Any, db: Any) -> list[Album]:
         """Get all albums function."""
         _albums = await AlbumsAdapter.get_all_albums(db)
-        return [Album.from_dict(e) for e in _albums]
+        return [ALBUM_CODEC.decode(e) for e in _albums]
+
+    @classmethod
+    async def iter_albums(cls: Any, db: Any) -> AsyncIterator[Album]:
+        """Iterate over all albums."""
+        async for album in AlbumsAdapter.iter_albums(db):
+            yield ALBUM_CODEC.decode(album)
+
+    @classmethod
+    async def iter_albums_raw(cls: Any, db: Any) -> AsyncIterator[dict]:
+        """Iterate over all albums as stored, without converting them to Album."""
+        async for album in AlbumsAdapter.iter_albums(db):
+            yield album
 
     @classmethod
     async def create_album(cls: Any, db: Any, album: Album) -> str | None:
@@ -57,9 +73,14 @@ class AlbumsService:
         album.id = a_id
         # insert new album
         new_album = album.to_dict()
-        result = await AlbumsAdapter.create_album(db, new_album)
+        try:
+            result = await AlbumsAdapter.create_album(db, new_album)
+        except DuplicateKeyError as e:
+            err_msg = f"Album with g_id {album.g_id} already exists."
+            raise IllegalValueError(err_msg) from e
         logging.debug(f"inserted album with id: {a_id}")
         if result:
+            await VersionsService.bump(db, [album.event_id], ALBUMS_SCOPE)
             return a_id
         return None
 
@@ -69,7 +90,7 @@ class AlbumsService:
         album = await AlbumsAdapter.get_album_by_g_id(db, g_id)
         # return the document if found:
         if album:
-            return Album.from_dict(album)
+            return ALBUM_CODEC.decode(album)
         err_msg = f"Album with id {g_id} not found"
         raise AlbumNotFoundError(err_msg) from None
 
@@ -79,32 +100,38 @@ class AlbumsService:
         album = await AlbumsAdapter.get_album_by_id(db, a_id)
         # return the document if found:
         if album:
-            return Album.from_dict(album)
+            return ALBUM_CODEC.decode(album)
         err_msg = f"Album with id {a_id} not found"
         raise AlbumNotFoundError(err_msg) from None
 
     @classmethod
-    async def update_album(cls: Any, db: Any, a_id: str, album: Album) -> str | None:
-        """Get album function."""
-        # get old document
-        old_album = await AlbumsAdapter.get_album_by_id(db, a_id)
-        # update the album if found:
-        if old_album:
-            if album.id != old_album["id"]:
-                err_msg = "Cannot change id for album."
-                raise IllegalValueError(err_msg) from None
-            new_album = album.to_dict()
-            return await AlbumsAdapter.update_album(db, a_id, new_album)
+    async def update_album(cls: Any, db: Any, a_id: str, album: Album) -> dict | None:
+        """Update album function, checking and replacing in one operation."""
         err_msg = f"Album with id {a_id} not found"
+        if album.id != a_id:
+            # a missing album is reported before an illegal id
+            if not await AlbumsAdapter.get_album_by_id(db, a_id):
+                raise AlbumNotFoundError(err_msg) from None
+            id_err_msg = "Cannot change id for album."
+            raise IllegalValueError(id_err_msg) from None
+        try:
+            old_album = await AlbumsAdapter.update_album(db, a_id, album.to_dict())
+        except DuplicateKeyError as e:
+            g_id_err_msg = f"Album with g_id {album.g_id} already exists."
+            raise IllegalValueError(g_id_err_msg) from e
+        if old_album:
+            await VersionsService.bump(
+                db, [old_album.get("event_id"), album.event_id], ALBUMS_SCOPE
+            )
+            return old_album
         raise AlbumNotFoundError(err_msg) from None
 
     @classmethod
-    async def delete_album(cls: Any, db: Any, a_id: str) -> str | None:
-        """Get album function."""
-        # get old document
-        album = await AlbumsAdapter.get_album_by_id(db, a_id)
-        # delete the document if found:
+    async def delete_album(cls: Any, db: Any, a_id: str) -> dict | None:
+        """Delete album function, checking and deleting in one operation."""
+        album = await AlbumsAdapter.delete_album(db, a_id)
         if album:
-            return await AlbumsAdapter.delete_album(db, a_id)
+            await VersionsService.bump(db, [album.get("event_id")], ALBUMS_SCOPE)
+            return album
         err_msg = f"Album with id {a_id} not found"
         raise AlbumNotFoundError(err_msg) from None
@@ -1,13 +1,25 @@
 """Module for config service."""
 
 import logging
+import os
 import uuid
+from collections.abc import AsyncIterator
 from typing import Any
 
+from pymongo.errors import DuplicateKeyError
+
 from photo_service.adapters import ConfigAdapter
-from photo_service.models import Config
+from photo_service.models import CONFIG_CODEC, Config
+from photo_service.utils.ttl_cache import TTLCache
 
 from .exceptions import IllegalValueError
+from .versions_service import CONFIGS_SCOPE, VersionsService
+
+CONFIG_CACHE_TTL = float(os.getenv("CONFIG_CACHE_TTL", "30"))
+CONFIG_CACHE_SIZE = int(os.getenv("CONFIG_CACHE_SIZE", "1024"))
+# without the sync, a config changed by another worker would be served
+# until it expires, so the cache is only used with the sync enabled
+CONFIG_CACHE_SYNC_INTERVAL = float(os.getenv("CONFIG_CACHE_SYNC_INTERVAL", "2"))
 
 
 def create_id() -> str:  # pragma: no cover
@@ -25,7 +37,46 @@ class ConfigNotFoundError(Exception):
 
 
 class ConfigService:
-    """Class representing a service for config."""
+    """Class representing a service for config.
+
+    Configs read by key are cached per worker, together with the version of
+    CONFIGS_SCOPE they were read at. Writes in this worker invalidate the
+    cache directly, writes in other workers are picked up by
+    sync_config_cache every CONFIG_CACHE_SYNC_INTERVAL seconds. Only config
+    writes bump CONFIGS_SCOPE, so the photos and status written to a busy
+    event do not invalidate its configs. Nothing is cached if the sync is
+    disabled.
+    """
+
+    # (event_id, key) -> (CONFIGS_SCOPE version, stored config)
+    config_cache = TTLCache(
+        CONFIG_CACHE_SIZE, CONFIG_CACHE_TTL if CONFIG_CACHE_SYNC_INTERVAL > 0 else 0
+    )
+
+    @classmethod
+    def invalidate_config(cls: Any, event_id: str | None, key: str | None) -> None:
+        """Remove a config from the cache."""
+        cls.config_cache.delete((event_id, key))
+
+    @classmethod
+    async def sync_config_cache(cls: Any, db: Any) -> int:
+        """Remove cached configs if any config was written since they were cached.
+
+        Returns:
+            int: The number of configs removed.
+
+        """
+        keys = cls.config_cache.keys()
+        if not keys:
+            return 0
+        version = await VersionsService.get_scope_version(db, CONFIGS_SCOPE)
+        removed = 0
+        for key in keys:
+            entry = cls.config_cache.peek(key)
+            if entry and entry[0] < version:
+                cls.config_cache.delete(key)
+                removed += 1
+        return removed
 
     @classmethod
     async def get_all_configs(
@@ -36,7 +87,23 @@ class ConfigService:
             _config = await ConfigAdapter.get_all_configs_by_event(db, event_id)
         else:
             _config = await ConfigAdapter.get_all_configs(db)
-        return [Config.from_dict(e) for e in _config]
+        return [CONFIG_CODEC.decode(e) for e in _config]
+
+    @classmethod
+    async def iter_configs(
+        cls: Any, db: Any, event_id: str | None = None
+    ) -> AsyncIterator[Config]:
+        """Iterate over all config, or all config of one event."""
+        async for config in ConfigAdapter.iter_configs(db, event_id):
+            yield CONFIG_CODEC.decode(config)
+
+    @classmethod
+    async def iter_configs_raw(
+        cls: Any, db: Any, event_id: str | None = None
+    ) -> AsyncIterator[dict]:
+        """Iterate over config as stored, without converting them to Config."""
+        async for config in ConfigAdapter.iter_configs(db, event_id):
+            yield config
 
     @classmethod
     async def create_config(cls: Any, db: Any, config: Config) -> str | None:
@@ -57,23 +124,29 @@ class ConfigService:
         if config.id:
             err_msg = "Cannot create config with input id."
             raise IllegalValueError(err_msg) from None
+        exists_msg = (
+            f"Config with key {config.key} already exists on event {config.event_id}"
+        )
         old_config = await ConfigAdapter.get_config_by_key(
             db, config.event_id, config.key
         )
         if old_config:
-            err_msg = (
-                f"Config with key {config.key} already exists on event {config.event_id}"
-            )
-            raise IllegalValueError(err_msg) from None
+            raise IllegalValueError(exists_msg) from None
 
         # create id
         c_id = create_id()
         config.id = c_id
         # insert new config
         new_config = config.to_dict()
-        result = await ConfigAdapter.create_config(db, new_config)
+        try:
+            result = await ConfigAdapter.create_config(db, new_config)
+        except DuplicateKeyError as e:
+            # created by a concurrent request since the check above
+            raise IllegalValueError(exists_msg) from e
         logging.debug(f"inserted config with id: {c_id}")
         if result:
+            cls.invalidate_config(config.event_id, config.key)
+            await VersionsService.bump(db, [config.event_id], CONFIGS_SCOPE)
             return c_id
         return None
 
@@ -83,42 +156,47 @@ class ConfigService:
         config = await ConfigAdapter.get_config_by_id(db, c_id)
         # return the document if found:
         if config:
-            return Config.from_dict(config)
+            return CONFIG_CODEC.decode(config)
         err_msg = f"Config with id {c_id} not found"
         raise ConfigNotFoundError(err_msg) from None
 
     @classmethod
     async def get_config_by_key(cls: Any, db: Any, event_id: str, key: str) -> Config:
-        """Get config function."""
+        """Get config function, served from the cache when possible."""
+        cached = cls.config_cache.get((event_id, key))
+        if cached:
+            return CONFIG_CODEC.decode(cached[1])
+        # read the version first, a write after it makes the entry stale
+        version = await VersionsService.get_scope_version(db, CONFIGS_SCOPE)
         config = await ConfigAdapter.get_config_by_key(db, event_id, key)
         # return the document if found:
         if config:
-            return Config.from_dict(config)
+            cls.config_cache.set((event_id, key), (version, config))
+            return CONFIG_CODEC.decode(config)
         err_msg = f"Config with key {key} not found on event {event_id}"
         raise ConfigNotFoundError(err_msg) from None
 
     @classmethod
-    async def update_config(cls: Any, db: Any, config: Config) -> str | None:
-        """Get config function."""
-        # get old document
-        old_config = await ConfigAdapter.get_config_by_key(
-            db, config.event_id, config.key
+    async def update_config(cls: Any, db: Any, config: Config) -> dict | None:
+        """Update config function, checking and updating in one operation."""
+        old_config = await ConfigAdapter.update_config_by_key(
+            db, config.event_id, config.key, config.to_dict()
         )
-        # update the config if found:
         if old_config:
             config.id = old_config["id"]
-            body = config.to_dict()
-            return await ConfigAdapter.update_config(db, old_config["id"], body)
+            cls.invalidate_config(config.event_id, config.key)
+            await VersionsService.bump(db, [config.event_id], CONFIGS_SCOPE)
+            return old_config
         err_msg = f"Config with key {config.key} not found on event {config.event_id}"
         raise ConfigNotFoundError(err_msg) from None
 
     @classmethod
-    async def delete_config(cls: Any, db: Any, c_id: str) -> str | None:
-        """Get config function."""
-        # get old document
-        config = await ConfigAdapter.get_config_by_id(db, c_id)
-        # delete the document if found:
+    async def delete_config(cls: Any, db: Any, c_id: str) -> dict | None:
+        """Delete config function, checking and deleting in one operation."""
+        config = await ConfigAdapter.delete_config(db, c_id)
         if config:
-            return await ConfigAdapter.delete_config(db, c_id)
+            cls.invalidate_config(config.get("event_id"), config.get("key"))
+            await VersionsService.bump(db, [config.get("event_id")], CONFIGS_SCOPE)
+            return config
         err_msg = f"Config with id {c_id} not found"
         raise ConfigNotFoundError(err_msg) from None
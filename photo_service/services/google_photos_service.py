@@ -1,13 +1,20 @@
 """Module for google photos adapter."""
 
+import asyncio
+import json
 import logging
 import os
+import time
+from collections.abc import AsyncIterator
 from http import HTTPStatus
+from pathlib import Path
 from typing import Any
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs, web
 from multidict import MultiDict
 
+from photo_service.utils.http_utils import client_session
+
 GOOGLE_PHOTO_SERVER = os.getenv(
     "GOOGLE_PHOTO_SERVER", "https://photoslibrary.googleapis.com/v1"
 )
@@ -17,14 +24,60 @@ GOOGLE_PHOTO_SCOPE = os.getenv(
 GOOGLE_PHOTO_CREDENTIALS_FILE = os.getenv(
     "GOOGLE_PHOTO_CREDENTIALS_FILE", "/home/heming/github/photo_api_credentials.json"
 )
+GOOGLE_TOKEN_URI = os.getenv("GOOGLE_TOKEN_URI", "https://oauth2.googleapis.com/token")
+# media items per mediaItems:batchGet, at most 50
+GOOGLE_PHOTO_BATCH_GET_SIZE = 50
+# media items per page of mediaItems:search, at most 100
+GOOGLE_PHOTO_PAGE_SIZE = int(os.getenv("GOOGLE_PHOTO_PAGE_SIZE", "100"))
 
 
 class GooglePhotosService:
     """Class representing google photos."""
 
+    # access token from the credentials file, and when it expires
+    _access_token: tuple[str, float] | None = None
+
     @classmethod
-    async def get_media_items(cls: Any, token: str, album_id: str | None) -> dict:
-        """Get all albums."""
+    async def get_access_token(cls: Any) -> str:
+        """Get an access token for the user of the credentials file.
+
+        The file holds authorized user credentials, with client_id,
+        client_secret and refresh_token. The token is refreshed a minute
+        before it expires.
+        """
+        if cls._access_token and cls._access_token[1] > time.monotonic():
+            return cls._access_token[0]
+        servicename = "get_access_token"
+        credentials = json.loads(
+            await asyncio.to_thread(Path(GOOGLE_PHOTO_CREDENTIALS_FILE).read_text)
+        )
+        request_body = {
+            "grant_type": "refresh_token",
+            "client_id": credentials["client_id"],
+            "client_secret": credentials["client_secret"],
+            "refresh_token": credentials["refresh_token"],
+        }
+        token_uri = credentials.get("token_uri", GOOGLE_TOKEN_URI)
+        async with client_session() as session:
+            async with session.post(token_uri, data=request_body) as resp:
+                logging.debug(f"{servicename} - got response {resp.status}")
+                body = await resp.json()
+                if resp.status != HTTPStatus.OK:
+                    logging.error(f"{servicename} failed - {resp.status} - {body}")
+                    raise web.HTTPBadRequest(reason=f"Error - {resp.status}: {body}.")
+        expires = time.monotonic() + float(body.get("expires_in", 3600)) - 60
+        cls._access_token = (body["access_token"], expires)
+        return body["access_token"]
+
+    @classmethod
+    async def get_media_items(
+        cls: Any,
+        token: str,
+        album_id: str | None,
+        page_size: int | None = None,
+        page_token: str | None = None,
+    ) -> dict:
+        """Get one page of media items, the first page without page_token."""
         album_items = {}
         servicename = "get_album_items"
         headers = MultiDict(
@@ -33,10 +86,14 @@ class GooglePhotosService:
                 (hdrs.AUTHORIZATION, f"Bearer {token}"),
             ]
         )
-        request_body = {}
+        request_body: dict = {}
         if album_id:
-            request_body = {"albumId": album_id}
-        async with ClientSession() as session:
+            request_body["albumId"] = album_id
+        if page_size:
+            request_body["pageSize"] = page_size
+        if page_token:
+            request_body["pageToken"] = page_token
+        async with client_session() as session:
             async with session.post(
                 f"{GOOGLE_PHOTO_SERVER}/mediaItems:search",
                 headers=headers,
@@ -51,6 +108,79 @@ class GooglePhotosService:
                     raise web.HTTPBadRequest(reason=f"Error - {resp.status}: {body}.")
         return album_items
 
+    @classmethod
+    async def iter_media_items(
+        cls: Any,
+        token: str,
+        album_id: str | None,
+        page_size: int = GOOGLE_PHOTO_PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        """Iterate over all media items, reading one page at a time."""
+        page_token = None
+        while True:
+            page = await cls.get_media_items(token, album_id, page_size, page_token)
+            for media_item in page.get("mediaItems", []):
+                yield media_item
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return
+
+    @classmethod
+    async def batch_get_media_items(cls: Any, token: str, ids: list[str]) -> list[dict]:
+        """Get up to GOOGLE_PHOTO_BATCH_GET_SIZE media items, skipping those not found."""
+        media_items = []
+        servicename = "batch_get_media_items"
+        headers = MultiDict(
+            [
+                (hdrs.CONTENT_TYPE, "application/json"),
+                (hdrs.AUTHORIZATION, f"Bearer {token}"),
+            ]
+        )
+        params = [("mediaItemIds", media_item_id) for media_item_id in ids]
+        async with client_session() as session:
+            async with session.get(
+                f"{GOOGLE_PHOTO_SERVER}/mediaItems:batchGet",
+                headers=headers,
+                params=params,
+            ) as resp:
+                logging.debug(f"{servicename} - got response {resp.status}")
+                if resp.status == HTTPStatus.OK:
+                    body = await resp.json()
+                    media_items = [
+                        result["mediaItem"]
+                        for result in body.get("mediaItemResults", [])
+                        if "mediaItem" in result
+                    ]
+                else:
+                    body = await resp.json()
+                    logging.error(f"{servicename} failed - {resp.status} - {body}")
+                    raise web.HTTPBadRequest(reason=f"Error - {resp.status}: {body}.")
+        return media_items
+
+    @classmethod
+    async def get_album(cls: Any, token: str, album_id: str) -> dict:
+        """Get one album."""
+        album = {}
+        servicename = "get_album"
+        headers = MultiDict(
+            [
+                (hdrs.CONTENT_TYPE, "application/json"),
+                (hdrs.AUTHORIZATION, f"Bearer {token}"),
+            ]
+        )
+        async with client_session() as session:
+            async with session.get(
+                f"{GOOGLE_PHOTO_SERVER}/albums/{album_id}", headers=headers
+            ) as resp:
+                logging.debug(f"{servicename} - got response {resp.status}")
+                if resp.status == HTTPStatus.OK:
+                    album = await resp.json()
+                else:
+                    body = await resp.json()
+                    logging.error(f"{servicename} failed - {resp.status} - {body}")
+                    raise web.HTTPBadRequest(reason=f"Error - {resp.status}: {body}.")
+        return album
+
     @classmethod
     async def get_albums(cls: Any, token: str) -> dict:
         """Get all albums."""
@@ -62,7 +192,7 @@ class GooglePhotosService:
                 (hdrs.AUTHORIZATION, f"Bearer {token}"),
             ]
         )
-        async with ClientSession() as session:
+        async with client_session() as session:
             async with session.get(
                 f"{GOOGLE_PHOTO_SERVER}/albums", headers=headers
             ) as resp:
@@ -0,0 +1,40 @@
+"""Module for lease service."""
+
+import os
+import socket
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from photo_service.adapters import LeasesAdapter
+
+
+def lease_holder() -> str:
+    """Identify the worker process holding leases, the same in every call."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseService:
+    """Class representing a service for leases.
+
+    A lease is held by one worker process at a time, until it expires. The
+    holder renews it before that, so it is only taken over by another
+    worker if the holder stops renewing it, e.g. because it died.
+    """
+
+    @classmethod
+    async def acquire(cls: Any, db: Any, name: str, duration: float) -> bool:
+        """Take or renew a lease for duration seconds.
+
+        Returns:
+            bool: True if this worker holds the lease, False if another does.
+
+        """
+        now = datetime.now(UTC)
+        return await LeasesAdapter.acquire_lease(
+            db, name, lease_holder(), now, now + timedelta(seconds=duration)
+        )
+
+    @classmethod
+    async def release(cls: Any, db: Any, name: str) -> None:
+        """Release a lease held by this worker, so another can take it at once."""
+        await LeasesAdapter.release_lease(db, name, lease_holder())
@@ -1,13 +1,32 @@
 """Module for photos service."""
 
+import hashlib
 import logging
+import os
 import uuid
+from collections.abc import AsyncIterator
+from dataclasses import fields as dataclass_fields
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
+import bson
+from pymongo.errors import DuplicateKeyError
+
 from photo_service.adapters import PhotosAdapter
-from photo_service.models import Photo
+from photo_service.models import PHOTO_CODEC, Photo
+from photo_service.utils.ttl_cache import TTLCache
 
 from .exceptions import IllegalValueError
+from .google_photos_service import GOOGLE_PHOTO_BATCH_GET_SIZE, GooglePhotosService
+from .versions_service import VersionsService
+
+PHOTO_BATCH_CHUNK_SIZE = int(os.getenv("PHOTO_BATCH_CHUNK_SIZE", "500"))
+# base urls from google expire after an hour, and are renewed before that
+G_BASE_URL_MAX_AGE = float(os.getenv("G_BASE_URL_MAX_AGE", "3000"))
+# seconds between checks for base urls written before they were hashed
+G_BASE_URL_HASH_CHECK_INTERVAL = 60
+# fields that can be set with a patch
+PATCHABLE_FIELDS = {f.name for f in dataclass_fields(Photo)} - {"id"}
 
 
 def create_id() -> str:  # pragma: no cover
@@ -25,13 +44,24 @@ class PhotoNotFoundError(Exception):
 
 
 class PhotosService:
-    """Class representing a service for photos."""
+    """Class representing a service for photos.
+
+    Photos are looked up by the hash of their base url. Until no base url
+    written before they were hashed is left, lookups also match the url
+    itself. Each worker checks for such base urls at most every
+    G_BASE_URL_HASH_CHECK_INTERVAL seconds, and stops once none are left.
+    """
+
+    # True once no base url is left to hash, new base urls are always hashed
+    g_base_urls_hashed = False
+    # "unhashed" -> if base urls were left to hash at the last check
+    g_base_url_hash_check = TTLCache(1, G_BASE_URL_HASH_CHECK_INTERVAL)
 
     @classmethod
     async def get_all_photos(cls: Any, db: Any, event_id: str) -> list[Photo]:
         """Get all photos function."""
         _photos = await PhotosAdapter.get_all_photos(db, event_id)
-        photos = [Photo.from_dict(e) for e in _photos]
+        photos = [PHOTO_CODEC.decode(e) for e in _photos]
         return sorted(
             photos,
             key=lambda k: (
@@ -44,7 +74,7 @@ class PhotosService:
     async def get_photos_by_race_id(cls: Any, db: Any, race_id: str) -> list[Photo]:
         """Get all photos for one race function."""
         _photos = await PhotosAdapter.get_photos_by_race_id(db, race_id)
-        photos = [Photo.from_dict(e) for e in _photos]
+        photos = [PHOTO_CODEC.decode(e) for e in _photos]
         return sorted(
             photos,
             key=lambda k: (
@@ -59,7 +89,7 @@ class PhotosService:
     ) -> list[Photo]:
         """Get all photos for one raceclass function."""
         _photos = await PhotosAdapter.get_photos_by_raceclass(db, event_id, raceclass)
-        photos = [Photo.from_dict(e) for e in _photos]
+        photos = [PHOTO_CODEC.decode(e) for e in _photos]
         return sorted(
             photos,
             key=lambda k: (
@@ -72,7 +102,7 @@ class PhotosService:
     async def get_photos_starred(cls: Any, db: Any, event_id: str) -> list[Photo]:
         """Get all photos by raceclass function."""
         _photos = await PhotosAdapter.get_photos_starred(db, event_id)
-        photos = [Photo.from_dict(e) for e in _photos]
+        photos = [PHOTO_CODEC.decode(e) for e in _photos]
         return sorted(
             photos,
             key=lambda k: (
@@ -89,7 +119,7 @@ class PhotosService:
         _photos = await PhotosAdapter.get_photos_starred_by_raceclass(
             db, event_id, raceclass
         )
-        photos = [Photo.from_dict(e) for e in _photos]
+        photos = [PHOTO_CODEC.decode(e) for e in _photos]
         return sorted(
             photos,
             key=lambda k: (
@@ -98,6 +128,78 @@ class PhotosService:
             ),
         )
 
+    @classmethod
+    async def iter_photos(cls: Any, db: Any, filters: dict) -> AsyncIterator[Photo]:
+        """Iterate over photos, ordered by creation_time and id."""
+        async for photo in PhotosAdapter.iter_photos(db, filters):
+            yield PHOTO_CODEC.decode(photo)
+
+    @classmethod
+    async def iter_photos_raw(cls: Any, db: Any, filters: dict) -> AsyncIterator[dict]:
+        """Iterate over photos as stored, without converting them to Photo."""
+        async for photo in PhotosAdapter.iter_photos(db, filters):
+            yield photo
+
+    @classmethod
+    async def get_photos_page(
+        cls: Any, db: Any, filters: dict, page_size: int, after: tuple | None = None
+    ) -> tuple[list[Photo], tuple | None]:
+        """Get one page of photos, ordered by creation_time and id.
+
+        Args:
+            db (Any): the db
+            filters (dict): event_id, race_id, raceclass, starred, bibs and clubs filters
+            page_size (int): max number of photos in the page
+            after (tuple | None): the (creation_time, id) of the last photo seen
+
+        Returns:
+            tuple: The photos in the page, and the position to continue after,
+                or None if this is the last page.
+
+        Raises:
+            IllegalValueError: page_size is not a positive number
+
+        """
+        if page_size < 1:
+            err_msg = f"Illegal page size {page_size}."
+            raise IllegalValueError(err_msg) from None
+        # fetch one extra photo to find out if there is a next page
+        _photos = await PhotosAdapter.get_photos_page(db, filters, page_size + 1, after)
+        photos = [PHOTO_CODEC.decode(e) for e in _photos[:page_size]]
+        next_after = None
+        if len(_photos) > page_size:
+            next_after = (photos[-1].creation_time, photos[-1].id)
+        return photos, next_after
+
+    @classmethod
+    async def get_photos_starred_first(
+        cls: Any, db: Any, filters: dict, limit: int
+    ) -> list[Photo]:
+        """Get at most limit photos, starred photos first, then newest first.
+
+        Args:
+            db (Any): the db
+            filters (dict): event_id, race_id, raceclass, starred, bibs and clubs filters
+            limit (int): max number of photos to return
+
+        Returns:
+            list[Photo]: The selected photos.
+
+        Raises:
+            IllegalValueError: limit is not a positive number
+
+        """
+        if limit < 1:
+            err_msg = f"Illegal limit {limit}."
+            raise IllegalValueError(err_msg) from None
+        _photos = await PhotosAdapter.get_photos_starred_first(db, filters, limit)
+        return [PHOTO_CODEC.decode(e) for e in _photos]
+
+    @classmethod
+    async def get_club_counts(cls: Any, db: Any, event_id: str) -> list[dict]:
+        """Get the number of photos of every club of an event, most photos first."""
+        return await PhotosAdapter.get_club_counts(db, event_id)
+
     @classmethod
     async def create_photo(cls: Any, db: Any, photo: Photo) -> str | None:
         """Create photo function.
@@ -122,64 +224,329 @@ class PhotosService:
         photo.id = c_id
         # insert new photo
         new_photo = photo.to_dict()
-        result = await PhotosAdapter.create_photo(db, new_photo)
+        try:
+            result = await PhotosAdapter.create_photo(db, new_photo)
+        except DuplicateKeyError as e:
+            err_msg = f"Photo with g_id {photo.g_id} already exists."
+            raise IllegalValueError(err_msg) from e
         logging.debug(f"inserted photo with id: {c_id}")
         if result:
+            await VersionsService.bump(db, [photo.event_id])
             return c_id
         return None
 
+    @classmethod
+    async def create_photos(cls: Any, db: Any, photos: list[dict]) -> list[dict]:
+        """Create many photos function.
+
+        All photos are validated first, and the valid ones are inserted with
+        unordered inserts of at most PHOTO_BATCH_CHUNK_SIZE photos.
+
+        Args:
+            db (Any): the db
+            photos (list[dict]): the photos to be created
+
+        Returns:
+            list[dict]: Per photo, {"id": <id>} if created,
+                {"error": <reason>} otherwise.
+
+        """
+        results: list[dict] = []
+        valid: list[tuple[int, dict]] = []
+        for i, body in enumerate(photos):
+            try:
+                photo = PHOTO_CODEC.decode(body)
+            except KeyError as e:
+                results.append({"error": f"Mandatory property {e.args[0]} is missing."})
+                continue
+            except (TypeError, ValueError, AttributeError) as e:
+                results.append({"error": f"Illegal photo: {e}"})
+                continue
+            if photo.id:
+                results.append({"error": "Cannot create photo with input id."})
+                continue
+            photo.id = create_id()
+            results.append({"id": photo.id})
+            valid.append((i, PHOTO_CODEC.encode(photo)))
+
+        # only the events of inserted photos are changed
+        event_ids = set()
+        inserted = 0
+        for start in range(0, len(valid), PHOTO_BATCH_CHUNK_SIZE):
+            chunk = valid[start : start + PHOTO_BATCH_CHUNK_SIZE]
+            errors = await PhotosAdapter.create_photos(db, [p for _, p in chunk])
+            for index, reason in errors.items():
+                results[chunk[index][0]] = {"error": reason}
+            for index, (_, photo) in enumerate(chunk):
+                if index not in errors:
+                    event_ids.add(photo.get("event_id"))
+                    inserted += 1
+        if inserted:
+            await VersionsService.bump(db, event_ids)
+        logging.debug(f"inserted {inserted} photos in batch")
+        return results
+
     @classmethod
     async def get_photo_by_g_id(cls: Any, db: Any, g_id: str) -> Photo:
         """Get photo function."""
         photo = await PhotosAdapter.get_photo_by_g_id(db, g_id)
         # return the document if found:
         if photo:
-            return Photo.from_dict(photo)
+            return PHOTO_CODEC.decode(photo)
         err_msg = f"Photo with id {g_id} not found."
         raise PhotoNotFoundError(err_msg) from None
 
     @classmethod
     async def get_photo_by_g_base_url(cls: Any, db: Any, g_base_url: str) -> Photo:
         """Get photo function."""
-        photo = await PhotosAdapter.get_photo_by_g_base_url(db, g_base_url)
+        unhashed = await cls.has_unhashed_g_base_urls(db)
+        photo = await PhotosAdapter.get_photo_by_g_base_url(
+            db, g_base_url, unhashed=unhashed
+        )
         # return the document if found:
         if photo:
-            return Photo.from_dict(photo)
+            return PHOTO_CODEC.decode(photo)
         informasjon = f"Photo with g_base_url {g_base_url} not found"
         raise PhotoNotFoundError(informasjon) from None
 
+    @classmethod
+    async def has_unhashed_g_base_urls(cls: Any, db: Any) -> bool:
+        """Check if base urls written before they were hashed may be left."""
+        if cls.g_base_urls_hashed:
+            return False
+        unhashed = cls.g_base_url_hash_check.get("unhashed")
+        if unhashed is None:
+            unhashed = bool(
+                await PhotosAdapter.get_photos_without_g_base_url_hash(db, 1)
+            )
+            cls.g_base_urls_hashed = not unhashed
+            cls.g_base_url_hash_check.set("unhashed", unhashed)
+        return unhashed
+
+    @classmethod
+    async def hash_g_base_urls(cls: Any, db: Any, limit: int) -> int:
+        """Hash up to limit base urls written before they were hashed.
+
+        When none are left, the index on the full base url, only used to
+        look up photos not hashed yet, is dropped.
+
+        Returns:
+            int: The number of hashed base urls.
+
+        """
+        photos = await PhotosAdapter.get_photos_without_g_base_url_hash(db, limit)
+        if not photos:
+            await PhotosAdapter.drop_g_base_url_index(db)
+            cls.g_base_urls_hashed = True
+            return 0
+        return await PhotosAdapter.set_g_base_url_hashes(db, photos)
+
+    @classmethod
+    async def refresh_g_base_urls(cls: Any, db: Any, token: str, limit: int) -> int:
+        """Renew up to limit base urls older than G_BASE_URL_MAX_AGE, oldest first.
+
+        The media items are read from google in batches. A photo with a
+        media item not found keeps its base url, None included, with the
+        time of the refresh, and is tried again when it is stale next time.
+        The renewed photos are not sent again to photo stream clients.
+
+        Args:
+            db (Any): the db
+            token (str): a google photos access token
+            limit (int): the max number of base urls to renew
+
+        Returns:
+            int: The number of renewed base urls.
+
+        """
+        before = datetime.now(UTC) - timedelta(seconds=G_BASE_URL_MAX_AGE)
+        photos = await PhotosAdapter.get_photos_with_stale_g_base_url(db, before, limit)
+        refreshed = 0
+        for start in range(0, len(photos), GOOGLE_PHOTO_BATCH_GET_SIZE):
+            chunk = photos[start : start + GOOGLE_PHOTO_BATCH_GET_SIZE]
+            media_items = await GooglePhotosService.batch_get_media_items(
+                token, [photo["g_id"] for photo in chunk]
+            )
+            base_urls = {m["id"]: m["baseUrl"] for m in media_items if m.get("baseUrl")}
+            g_base_urls = [
+                (p["id"], base_urls.get(p["g_id"], p.get("g_base_url"))) for p in chunk
+            ]
+            await PhotosAdapter.set_g_base_urls(db, g_base_urls)
+            refreshed += sum(1 for photo in chunk if photo["g_id"] in base_urls)
+        if refreshed:
+            await VersionsService.bump(db, {photo.get("event_id") for photo in photos})
+        logging.debug(f"Renewed {refreshed} of {len(photos)} stale base urls")
+        return refreshed
+
+    @classmethod
+    async def lookup_photos(
+        cls: Any, db: Any, g_ids: list[str], g_base_urls: list[str]
+    ) -> dict:
+        """Look up which photos exist, by google id and by base url.
+
+        Each list is looked up with one query, base urls by their hashes.
+
+        Args:
+            db (Any): the db
+            g_ids (list[str]): the google ids to look up
+            g_base_urls (list[str]): the google base urls to look up
+
+        Returns:
+            dict: For g_ids and g_base_urls, the photo id by value, with None
+                for the values not found.
+
+        Raises:
+            IllegalValueError: a list is not a list of strings
+
+        """
+        for name, values in [("g_ids", g_ids), ("g_base_urls", g_base_urls)]:
+            if not isinstance(values, list) or not all(
+                isinstance(v, str) for v in values
+            ):
+                err_msg = f"{name} must be a list of strings."
+                raise IllegalValueError(err_msg) from None
+        found_g_ids: dict = {}
+        found_g_base_urls: dict = {}
+        if g_ids:
+            found_g_ids = await PhotosAdapter.get_photo_ids_by(
+                db, "g_id", list(set(g_ids))
+            )
+        if g_base_urls:
+            unhashed = await cls.has_unhashed_g_base_urls(db)
+            found_g_base_urls = await PhotosAdapter.get_photo_ids_by_g_base_urls(
+                db, list(set(g_base_urls)), unhashed=unhashed
+            )
+        return {
+            "g_ids": {g_id: found_g_ids.get(g_id) for g_id in g_ids},
+            "g_base_urls": {url: found_g_base_urls.get(url) for url in g_base_urls},
+        }
+
+    @classmethod
+    async def patch_photos(cls: Any, db: Any, patches: list) -> dict:
+        """Set fields on many photos function.
+
+        The photos are read in one query to report matched and modified per
+        photo, and only the patches changing a photo are written, with one
+        bulk write. The totals are the counts of the write. A photo deleted
+        or updated between the read and the write is reported per photo as
+        it was read, and can make the per photo counts differ from the totals.
+
+        Args:
+            db (Any): the db
+            patches (list): {"id": <id>, "fields": {<field>: <value>}} per photo
+
+        Returns:
+            dict: The matched and modified counts of the write, and per patch
+                the id and matched and modified counts, or the id and an error.
+
+        """
+        items: list[dict] = []
+        valid: dict[str, tuple[int, dict]] = {}
+        for patch in patches:
+            c_id = patch.get("id") if isinstance(patch, dict) else None
+            try:
+                fields = cls._validate_patch(patch)
+            except IllegalValueError as e:
+                items.append({"id": c_id, "error": str(e)})
+                continue
+            if c_id in valid:
+                items.append({"id": c_id, "error": "Duplicate patch for photo."})
+                continue
+            valid[c_id] = (len(items), fields)
+            items.append({"id": c_id, "matched": 0, "modified": 0})
+
+        result = {"matched": 0, "modified": 0}
+        if not valid:
+            return {**result, "items": items}
+        _photos = await PhotosAdapter.get_photos_by_ids(db, list(valid))
+        updates = []
+        event_ids = set()
+        for photo in _photos:
+            index, fields = valid[photo["id"]]
+            items[index]["matched"] = 1
+            if any(photo.get(k) != v for k, v in fields.items()):
+                items[index]["modified"] = 1
+                updates.append((photo["id"], fields))
+                event_ids |= {photo.get("event_id"), fields.get("event_id")}
+        if updates:
+            result = await PhotosAdapter.update_photos(db, updates)
+            logging.debug(f"patched photos: {result}")
+            await VersionsService.bump(db, event_ids)
+        return {**result, "items": items}
+
+    @classmethod
+    def _validate_patch(cls: Any, patch: Any) -> dict:
+        """Validate one patch, returning the fields converted to stored types."""
+        if not isinstance(patch, dict) or not isinstance(patch.get("id"), str):
+            err_msg = "Patch must have an id."
+            raise IllegalValueError(err_msg) from None
+        fields = patch.get("fields")
+        if not isinstance(fields, dict) or not fields:
+            err_msg = "Patch must have fields to set."
+            raise IllegalValueError(err_msg) from None
+        unknown = set(fields) - PATCHABLE_FIELDS
+        if unknown:
+            err_msg = f"Cannot patch fields {sorted(unknown)}."
+            raise IllegalValueError(err_msg) from None
+        try:
+            photo = PHOTO_CODEC.decode({"name": "", **fields})
+        except (TypeError, ValueError) as e:
+            err_msg = f"Illegal field value: {e}"
+            raise IllegalValueError(err_msg) from e
+        encoded = PHOTO_CODEC.encode(photo)
+        return {k: encoded[k] for k in fields}
+
     @classmethod
     async def get_photo_by_id(cls: Any, db: Any, c_id: str) -> Photo:
         """Get photo function."""
         photo = await PhotosAdapter.get_photo_by_id(db, c_id)
         # return the document if found:
         if photo:
-            return Photo.from_dict(photo)
+            return PHOTO_CODEC.decode(photo)
         err_msg = f"Photo with id {c_id} not found."
         raise PhotoNotFoundError(err_msg) from None
 
     @classmethod
-    async def update_photo(cls: Any, db: Any, c_id: str, photo: Photo) -> str | None:
-        """Get photo function."""
-        # get old document
-        old_photo = await PhotosAdapter.get_photo_by_id(db, c_id)
-        # update the photo if found:
-        if old_photo:
-            if photo.id != old_photo["id"]:
-                err_msg = "Cannot change id for photo."
-                raise IllegalValueError(err_msg) from None
-            new_photo = photo.to_dict()
-            return await PhotosAdapter.update_photo(db, c_id, new_photo)
+    async def get_photo_with_version(cls: Any, db: Any, c_id: str) -> tuple[Photo, int]:
+        """Get photo function, with a version changed by every write of the photo.
+
+        The version is a hash of the stored document. Unlike the time of the
+        last write, it differs for two writes of different content in the
+        same millisecond.
+        """
+        photo = await PhotosAdapter.get_photo_by_id(db, c_id)
+        if not photo:
+            err_msg = f"Photo with id {c_id} not found."
+            raise PhotoNotFoundError(err_msg) from None
+        digest = hashlib.blake2b(bson.encode(photo), digest_size=8).digest()
+        return PHOTO_CODEC.decode(photo), int.from_bytes(digest)
+
+    @classmethod
+    async def update_photo(cls: Any, db: Any, c_id: str, photo: Photo) -> dict | None:
+        """Update photo function, checking and replacing in one operation."""
         err_msg = f"Photo with id {c_id} not found."
+        if photo.id != c_id:
+            # a missing photo is reported before an illegal id
+            if not await PhotosAdapter.get_photo_by_id(db, c_id):
+                raise PhotoNotFoundError(err_msg) from None
+            id_err_msg = "Cannot change id for photo."
+            raise IllegalValueError(id_err_msg) from None
+        try:
+            old_photo = await PhotosAdapter.update_photo(db, c_id, photo.to_dict())
+        except DuplicateKeyError as e:
+            g_id_err_msg = f"Photo with g_id {photo.g_id} already exists."
+            raise IllegalValueError(g_id_err_msg) from e
+        if old_photo:
+            await VersionsService.bump(db, [old_photo.get("event_id"), photo.event_id])
+            return old_photo
         raise PhotoNotFoundError(err_msg) from None
 
     @classmethod
-    async def delete_photo(cls: Any, db: Any, c_id: str) -> str | None:
-        """Get photo function."""
-        # get old document
-        photo = await PhotosAdapter.get_photo_by_id(db, c_id)
-        # delete the document if found:
+    async def delete_photo(cls: Any, db: Any, c_id: str) -> dict | None:
+        """Delete photo function, checking and deleting in one operation."""
+        photo = await PhotosAdapter.delete_photo(db, c_id)
         if photo:
-            return await PhotosAdapter.delete_photo(db, c_id)
+            await VersionsService.bump(db, [photo.get("event_id")])
+            return photo
         err_msg = f"Photo with id {c_id} not found."
         raise PhotoNotFoundError(err_msg) from None
@@ -0,0 +1,39 @@
+"""Module for the photos watcher."""
+
+import json
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+
+from photo_service.adapters import PhotosAdapter
+from photo_service.adapters.photos_adapter import MODIFIED_FIELD
+from photo_service.models import PHOTO_CODEC
+
+from .watcher import Watcher
+
+
+class PhotosWatcher(Watcher):
+    """Class representing the shared watcher of created and updated photos.
+
+    Without change streams, photos are polled by the time of the last write
+    stamped by the photos adapter.
+    """
+
+    def watch(self, resume_after: dict | None) -> AsyncIterator[dict]:
+        """Iterate over change events of created and updated photos."""
+        return PhotosAdapter.watch_photos(self.db, resume_after)
+
+    async def get_written_since(self, since: datetime) -> list[dict]:
+        """Get photos written at or after since."""
+        return await PhotosAdapter.get_photos_modified_since(self.db, since)
+
+    def written_at(self, document: dict) -> datetime:
+        """Get the time of the last write, the db returns naive datetimes in utc."""
+        return document[MODIFIED_FIELD].replace(tzinfo=UTC)
+
+    def serialize(self, document: dict) -> str:
+        """Serialize a photo the same way as the photo listings."""
+        return json.dumps(
+            PHOTO_CODEC.encode(PHOTO_CODEC.decode(document)),
+            default=str,
+            ensure_ascii=False,
+        )
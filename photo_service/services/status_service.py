@@ -2,12 +2,14 @@
 
 import logging
 import uuid
+from collections.abc import AsyncIterator
 from typing import Any
 
 from photo_service.adapters import StatusAdapter
-from photo_service.models import Status
+from photo_service.models import STATUS_CODEC, Status
 
 from .exceptions import IllegalValueError
+from .versions_service import VersionsService
 
 
 def create_id() -> str:  # pragma: no cover
@@ -54,16 +56,59 @@ class StatusService:
         result = await StatusAdapter.create_status(db, new_status)
         logging.debug(f"inserted status with id: {s_id}")
         if result:
+            await VersionsService.bump(db, [status.event_id])
             return s_id
         return None
 
+    @classmethod
+    async def create_many_status(cls: Any, db: Any, status: list[dict]) -> list[dict]:
+        """Create many status function.
+
+        All status are validated first, and the valid ones are inserted with
+        one unordered insert.
+
+        Args:
+            db (Any): the db
+            status (list[dict]): the status to be created
+
+        Returns:
+            list[dict]: Per status, {"id": <id>} if created,
+                {"error": <reason>} otherwise.
+
+        """
+        results: list[dict] = []
+        valid: list[tuple[int, dict]] = []
+        for i, body in enumerate(status):
+            try:
+                new_status = Status.from_dict(body)
+            except KeyError as e:
+                results.append({"error": f"Mandatory property {e.args[0]} is missing."})
+                continue
+            except (TypeError, ValueError, AttributeError) as e:
+                results.append({"error": f"Illegal status: {e}"})
+                continue
+            if new_status.id:
+                results.append({"error": "Cannot create status with input id."})
+                continue
+            new_status.id = create_id()
+            results.append({"id": new_status.id})
+            valid.append((i, new_status.to_dict()))
+
+        if valid:
+            errors = await StatusAdapter.create_many_status(db, [s for _, s in valid])
+            for index, reason in errors.items():
+                results[valid[index][0]] = {"error": reason}
+            await VersionsService.bump(db, {s.get("event_id") for _, s in valid})
+        logging.debug(f"inserted {len(valid)} status in batch")
+        return results
+
     @classmethod
     async def get_all_status(
         cls: Any, db: Any, event_id: str, count: int
     ) -> list[Status]:
         """Get all status function."""
         _status = await StatusAdapter.get_all_status(db, event_id, count)
-        return [Status.from_dict(e) for e in _status]
+        return [STATUS_CODEC.decode(e) for e in _status]
 
     @classmethod
     async def get_all_status_by_type(
@@ -71,7 +116,49 @@ class StatusService:
     ) -> list[Status]:
         """Get status function."""
         _status = await StatusAdapter.get_all_status_by_type(db, event_id, status_type, count)
-        return [Status.from_dict(e) for e in _status]
+        return [STATUS_CODEC.decode(e) for e in _status]
+
+    @classmethod
+    async def iter_status(
+        cls: Any, db: Any, event_id: str, count: int, status_type: str | None = None
+    ) -> AsyncIterator[Status]:
+        """Iterate over the latest status, optionally of one type only."""
+        async for status in StatusAdapter.iter_status(db, event_id, count, status_type):
+            yield STATUS_CODEC.decode(status)
+
+    @classmethod
+    async def iter_status_raw(
+        cls: Any, db: Any, event_id: str, count: int, status_type: str | None = None
+    ) -> AsyncIterator[dict]:
+        """Iterate over the latest status as stored, without converting them."""
+        async for status in StatusAdapter.iter_status(db, event_id, count, status_type):
+            yield status
+
+    @classmethod
+    async def compact_status(cls: Any, db: Any, keep_last: int) -> int:
+        """Keep only the latest status of every event and type.
+
+        Args:
+            db (Any): the db
+            keep_last (int): the number of status to keep per event and type
+
+        Returns:
+            int: The number of deleted status.
+
+        """
+        deleted = 0
+        event_ids = set()
+        groups = await StatusAdapter.get_status_groups_larger_than(db, keep_last)
+        for group in groups:
+            result = await StatusAdapter.delete_status_older_than_latest(
+                db, group["event_id"], group["type"], keep_last
+            )
+            if result:
+                deleted += result
+                event_ids.add(group["event_id"])
+        if event_ids:
+            await VersionsService.bump(db, list(event_ids))
+        return deleted
 
     @classmethod
     async def delete_status(cls: Any, db: Any, c_id: str) -> str | None:
@@ -80,6 +167,8 @@ class StatusService:
         status = await StatusAdapter.get_status_by_id(db, c_id)
         # delete the document if found:
         if status:
-            return await StatusAdapter.delete_status(db, c_id)
+            result = await StatusAdapter.delete_status(db, c_id)
+            await VersionsService.bump(db, [status.get("event_id")])
+            return result
         err_msg = f"Status with id {c_id} not found"
         raise StatusNotFoundError(err_msg) from None
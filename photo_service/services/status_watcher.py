@@ -0,0 +1,37 @@
+"""Module for the status watcher."""
+
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from photo_service.adapters import StatusAdapter
+from photo_service.models import STATUS_CODEC
+
+from .watcher import Watcher
+
+
+class StatusWatcher(Watcher):
+    """Class representing the shared watcher of created status.
+
+    Without change streams, status are polled by the time in their mongo _id.
+    """
+
+    def watch(self, resume_after: dict | None) -> AsyncIterator[dict]:
+        """Iterate over change events of created status."""
+        return StatusAdapter.watch_status(self.db, resume_after)
+
+    async def get_written_since(self, since: datetime) -> list[dict]:
+        """Get status created at or after since."""
+        return await StatusAdapter.get_status_created_since(self.db, since)
+
+    def written_at(self, document: dict) -> datetime:
+        """Get the time of creation from the mongo _id."""
+        return document["_id"].generation_time
+
+    def serialize(self, document: dict) -> str:
+        """Serialize a status the same way as the status listings."""
+        return json.dumps(
+            STATUS_CODEC.encode(STATUS_CODEC.decode(document)),
+            default=str,
+            ensure_ascii=False,
+        )
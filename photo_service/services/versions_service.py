@@ -0,0 +1,51 @@
+"""Module for versions service."""
+
+from collections.abc import Iterable
+from typing import Any
+
+from photo_service.adapters import VersionsAdapter
+
+# the scope changed by every write, for resources not scoped to one event
+GLOBAL_SCOPE = "_all"
+# the scope changed by every write of an album, for the album listings
+ALBUMS_SCOPE = "_albums"
+# the scope changed by every write of a config, for the config cache
+CONFIGS_SCOPE = "_configs"
+
+
+class VersionsService:
+    """Class representing a service for change counters.
+
+    Every write bumps the counter of the events it touches and the global
+    counter, so a reader can tell if anything changed with one point read.
+    Writes of a collection read without event, or cached, also bump the
+    scope of the collection, e.g. ALBUMS_SCOPE or CONFIGS_SCOPE, so its
+    readers are not invalidated by writes to other collections.
+    """
+
+    @classmethod
+    async def get_version(cls: Any, db: Any, event_id: str | None = None) -> int:
+        """Get the change counter of an event, or the global one without event."""
+        return await VersionsAdapter.get_version(db, event_id or GLOBAL_SCOPE)
+
+    @classmethod
+    async def get_scope_version(cls: Any, db: Any, scope: str) -> int:
+        """Get the change counter of a scope other than an event, e.g. ALBUMS_SCOPE."""
+        return await VersionsAdapter.get_version(db, scope)
+
+    @classmethod
+    async def get_versions(
+        cls: Any, db: Any, event_ids: Iterable[str | None]
+    ) -> dict[str | None, int]:
+        """Get the change counters of many events, 0 for events never changed."""
+        scopes = {event_id: event_id or GLOBAL_SCOPE for event_id in event_ids}
+        versions = await VersionsAdapter.get_versions(db, sorted(set(scopes.values())))
+        return {event_id: versions.get(scope, 0) for event_id, scope in scopes.items()}
+
+    @classmethod
+    async def bump(
+        cls: Any, db: Any, event_ids: Iterable[str | None], *scopes: str
+    ) -> None:
+        """Bump the change counters of the events, the global counter and scopes."""
+        changed = {GLOBAL_SCOPE, *scopes} | {e for e in event_ids if e}
+        await VersionsAdapter.bump_versions(db, sorted(changed))
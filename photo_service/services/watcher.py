@@ -0,0 +1,189 @@
+"""Module for watchers of written documents."""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from pymongo.errors import OperationFailure
+
+WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", "2"))
+WATCH_QUEUE_SIZE = int(os.getenv("WATCH_QUEUE_SIZE", "100"))
+WATCH_SEND_TIMEOUT = float(os.getenv("WATCH_SEND_TIMEOUT", "5"))
+# polling looks back this far, for writes by workers with a clock behind ours
+POLL_OVERLAP = timedelta(seconds=5)
+# error code of a server without change streams, e.g. a standalone mongod
+CHANGE_STREAMS_NOT_SUPPORTED = 40573
+# error codes of a resume token no longer in the oplog
+CHANGE_STREAM_HISTORY_LOST = {280, 286}
+
+
+class Subscription:
+    """Class representing one client of a watcher."""
+
+    def __init__(self, filters: dict) -> None:
+        """Initialize the subscription, filters without value match all."""
+        self.filters = {k: v for k, v in filters.items() if v}
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=WATCH_QUEUE_SIZE)
+
+    def matches(self, document: dict) -> bool:
+        """Return true if the document has the values of all filters."""
+        return all(document.get(k) == v for k, v in self.filters.items())
+
+    async def get(self) -> str | None:
+        """Get the next document as json, None when the subscription is closed."""
+        return await self.queue.get()
+
+    def close(self) -> None:
+        """Close the subscription, dropping documents not yet delivered."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class Watcher(ABC):
+    """Class representing a shared watcher of writes to a collection.
+
+    One watcher per worker reads a change stream if the database is a
+    replica set, and polls for documents by time of write otherwise. Every
+    written document is serialized once, and put on the queue of each
+    matching subscription. The next document waits until there is room on
+    every queue, so a burst of writes is delivered at the pace of the
+    clients. A client without room for WATCH_SEND_TIMEOUT seconds is too
+    slow to keep up, and is disconnected.
+
+    The watcher is started by the first subscription, and stopped when the
+    last subscription is removed. Subclasses provide the change stream, the
+    polling query and the serialization.
+    """
+
+    def __init__(self, db: Any) -> None:
+        """Initialize the watcher, it is started by the first subscription."""
+        self.db = db
+        self.subscriptions: set[Subscription] = set()
+        self.polling = False
+        self._resume_token: dict | None = None
+        self._task: asyncio.Task | None = None
+
+    @abstractmethod
+    def watch(self, resume_after: dict | None) -> AsyncIterator[dict]:
+        """Iterate over change events of written documents."""
+        raise NotImplementedError from None
+
+    @abstractmethod
+    async def get_written_since(self, since: datetime) -> list[dict]:
+        """Get documents written at or after since."""
+        raise NotImplementedError from None
+
+    @abstractmethod
+    def written_at(self, document: dict) -> datetime:
+        """Get the time a polled document was written, in utc."""
+        raise NotImplementedError from None
+
+    def serialize(self, document: dict) -> str:
+        """Serialize a written document for the clients."""
+        return json.dumps(document, default=str, ensure_ascii=False)
+
+    def subscribe(self, filters: dict) -> Subscription:
+        """Subscribe to documents written with the values of filters."""
+        subscription = Subscription(filters)
+        self.subscriptions.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Unsubscribe, stopping the watcher after the last subscription."""
+        self.subscriptions.discard(subscription)
+        # drops what is queued, so that a publish waiting for room goes on
+        subscription.close()
+        if not self.subscriptions and self._task:
+            self._task.cancel()
+            self._task = None
+            # changes while nobody subscribes are not delivered later
+            self._resume_token = None
+
+    async def publish(self, document: dict) -> None:
+        """Put a written document on the queues of the matching subscriptions."""
+        subscriptions = [s for s in self.subscriptions if s.matches(document)]
+        if not subscriptions:
+            return
+        data = self.serialize(document)
+        full = []
+        for subscription in subscriptions:
+            try:
+                subscription.queue.put_nowait(data)
+            except asyncio.QueueFull:
+                full.append(subscription)
+        if full:
+            await asyncio.gather(*(self._send(s, data) for s in full))
+
+    async def _send(self, subscription: Subscription, data: str) -> None:
+        """Wait for room on a full queue, disconnecting a client too slow."""
+        try:
+            await asyncio.wait_for(subscription.queue.put(data), WATCH_SEND_TIMEOUT)
+        except TimeoutError:
+            logging.warning("Disconnecting a subscriber too slow to keep up")
+            self.unsubscribe(subscription)
+
+    async def stop(self) -> None:
+        """Stop the watcher, and close all subscriptions."""
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for subscription in list(self.subscriptions):
+            subscription.close()
+        self.subscriptions.clear()
+
+    async def _run(self) -> None:
+        """Watch until stopped, recovering from errors."""
+        while True:
+            try:
+                if self.polling:
+                    await self._poll()
+                else:
+                    await self._watch()
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAMS_NOT_SUPPORTED:
+                    logging.info(f"Change streams not available, polling: {e}")
+                    self.polling = True
+                    continue
+                if e.code in CHANGE_STREAM_HISTORY_LOST:
+                    logging.warning(f"Change stream history lost, restarting: {e}")
+                    self._resume_token = None
+                else:
+                    logging.exception("Error occurred while watching")
+                await asyncio.sleep(WATCH_POLL_INTERVAL)
+            except Exception:
+                logging.exception("Error occurred while watching")
+                await asyncio.sleep(WATCH_POLL_INTERVAL)
+
+    async def _watch(self) -> None:
+        """Publish documents from a change stream."""
+        async for change in self.watch(self._resume_token):
+            self._resume_token = change["_id"]
+            if change.get("fullDocument"):
+                await self.publish(change["fullDocument"])
+
+    async def _poll(self) -> None:
+        """Publish documents found by polling on the time of write."""
+        since = datetime.now(UTC)
+        published: set[tuple[str, datetime]] = set()
+        while True:
+            await asyncio.sleep(WATCH_POLL_INTERVAL)
+            documents = await self.get_written_since(since - POLL_OVERLAP)
+            for document in documents:
+                written_at = self.written_at(document)
+                if (document["id"], written_at) not in published:
+                    published.add((document["id"], written_at))
+                    await self.publish(document)
+                since = max(since, written_at)
+            # forget documents older than the overlap, they are not read again
+            published = {p for p in published if p[1] >= since - POLL_OVERLAP}
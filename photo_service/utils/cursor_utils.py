@@ -0,0 +1,39 @@
+"""Utilities module for opaque pagination cursors."""
+
+import base64
+import binascii
+import json
+
+
+class InvalidCursorError(Exception):
+    """Class representing custom exception for cursor decoding."""
+
+    def __init__(self, message: str) -> None:
+        """Initialize the error."""
+        # Call the base class constructor with the parameters it needs
+        super().__init__(message)
+
+
+def encode_cursor(position: tuple) -> str:
+    """Encode a keyset position as an opaque, url-safe cursor."""
+    raw = json.dumps(list(position), separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int = 2) -> tuple:
+    """Decode an opaque cursor back into a keyset position.
+
+    Raises:
+        InvalidCursorError: the cursor is not a valid cursor
+
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        err_msg = f"Invalid cursor {cursor}."
+        raise InvalidCursorError(err_msg) from e
+    if not isinstance(position, list) or len(position) != length:
+        err_msg = f"Invalid cursor {cursor}."
+        raise InvalidCursorError(err_msg) from None
+    return tuple(position)
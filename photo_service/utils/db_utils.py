@@ -1,7 +1,92 @@
 """Drop db and recreate indexes."""
 
+import logging
+import os
 from typing import Any
 
+from pymongo.errors import OperationFailure
+
+STATUS_CAPPED_SIZE = int(os.getenv("STATUS_CAPPED_SIZE", "0"))
+STATUS_TTL = int(os.getenv("STATUS_TTL", "0"))
+
+ASCENDING = 1
+DESCENDING = -1
+
+# photo listings are sorted on (creation_time, id), the starred-first
+# selection on (starred, creation_time, id) in reverse index order
+PHOTO_SORT_KEYS = [("creation_time", ASCENDING), ("id", ASCENDING)]
+
+# Index plan for the collections owned by photo-service.
+# Each entry is a list of (keys, options) matching the filters and sort
+# order used by the corresponding adapter.
+INDEX_PLAN: dict[str, list[tuple[list[tuple[str, int]], dict]]] = {
+    "photos_collection": [
+        ([("id", ASCENDING)], {"unique": True}),
+        (
+            [("g_id", ASCENDING)],
+            {
+                "unique": True,
+                "partialFilterExpression": {"g_id": {"$type": "string"}},
+            },
+        ),
+        ([("g_base_url_hash", ASCENDING)], {}),
+        ([("g_base_url_at", ASCENDING)], {}),
+        ([("modified_at", ASCENDING)], {}),
+        ([("event_id", ASCENDING), *PHOTO_SORT_KEYS], {}),
+        ([("race_id", ASCENDING), *PHOTO_SORT_KEYS], {}),
+        ([("race_id", ASCENDING), ("starred", ASCENDING), *PHOTO_SORT_KEYS], {}),
+        ([("event_id", ASCENDING), ("raceclass", ASCENDING), *PHOTO_SORT_KEYS], {}),
+        ([("event_id", ASCENDING), ("starred", ASCENDING), *PHOTO_SORT_KEYS], {}),
+        # multikey, for photos of bib numbers
+        ([("event_id", ASCENDING), ("biblist", ASCENDING), *PHOTO_SORT_KEYS], {}),
+        (
+            [
+                ("event_id", ASCENDING),
+                ("biblist", ASCENDING),
+                ("starred", ASCENDING),
+                *PHOTO_SORT_KEYS,
+            ],
+            {},
+        ),
+        # multikey, for photos of clubs
+        ([("event_id", ASCENDING), ("clublist", ASCENDING), *PHOTO_SORT_KEYS], {}),
+        (
+            [
+                ("event_id", ASCENDING),
+                ("clublist", ASCENDING),
+                ("starred", ASCENDING),
+                *PHOTO_SORT_KEYS,
+            ],
+            {},
+        ),
+        (
+            [
+                ("event_id", ASCENDING),
+                ("raceclass", ASCENDING),
+                ("starred", ASCENDING),
+                *PHOTO_SORT_KEYS,
+            ],
+            {},
+        ),
+    ],
+    "albums_collection": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("g_id", ASCENDING)], {"unique": True}),
+    ],
+    "configs_collection": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("event_id", ASCENDING), ("key", ASCENDING)], {"unique": True}),
+    ],
+    "status_collection": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("event_id", ASCENDING), ("time", DESCENDING)], {}),
+        ([("event_id", ASCENDING), ("type", ASCENDING), ("time", DESCENDING)], {}),
+    ],
+    "versions_collection": [
+        ([("id", ASCENDING)], {"unique": True}),
+    ],
+}
+
 
 async def drop_db_and_recreate_indexes(mongo: Any, db_name: str) -> None:
     """Drop db and recreate indexes."""
@@ -17,32 +102,59 @@ async def drop_db(mongo: Any, db_name: str) -> None:
 
 
 async def create_indexes(db: Any) -> None:
-    """Create indexes."""
-    # contestants_collection:
-    await db.contestants_collection.create_index(
-        [("event_id", 1), ("id", 1)], unique=True
-    )
-    await db.contestants_collection.create_index([("event_id", 1), ("bib", 1)])
-    await db.contestants_collection.create_index([("event_id", 1), ("minidrett_id", 1)])
-
-    # events_collection:
-    await db.events_collection.create_index([("id", 1)], unique=True)
-
-    # raceclasses_collection:
-    await db.raceclasses_collection.create_index(
-        [("event_id", 1), ("id", 1)], unique=True
-    )
-    await db.raceclasses_collection.create_index([("event_id", 1), ("name", 1)])
-
-    # raceclass_results_collection:
-    await db.raceclass_results_collection.create_index(
-        [("event_id", 1), ("id", 1)], unique=True
-    )
-    await db.raceclass_results_collection.create_index(
-        [("event_id", 1), ("raceclass", 1)]
-    )
-    # contestants_collection, text index:
-    await db.contestants_collection.create_index(
-        [("event_id", 1), ("first_name", "text"), ("last_name", "text")],
-        default_language="norwegian",
-    )
+    """Create indexes according to the index plan.
+
+    Creating an index that already exists with the same specification is a
+    no-op in MongoDB, so this is safe to run on every startup. An index that
+    cannot be built (e.g. duplicates violating a unique index) is logged and
+    skipped, so the remaining indexes are still created.
+    """
+    try:
+        await configure_status_retention(db)
+    except Exception:
+        logging.exception("Error configuring the retention of status_collection")
+    for collection_name, indexes in INDEX_PLAN.items():
+        collection = db[collection_name]
+        for keys, options in indexes:
+            try:
+                await collection.create_index(keys, **options)
+            except Exception:
+                err_msg = f"Error creating index {keys} on {collection_name}"
+                logging.exception(err_msg)
+
+
+async def configure_status_retention(db: Any) -> None:
+    """Bound the size of the status collection, if configured.
+
+    With STATUS_CAPPED_SIZE the collection is created capped, or converted
+    to a capped collection of that many bytes. Otherwise, with STATUS_TTL
+    status are expired that many seconds after their insert by a ttl index.
+    A ttl index is not allowed on a capped collection.
+    """
+    if STATUS_CAPPED_SIZE > 0:
+        if STATUS_TTL > 0:
+            logging.warning("STATUS_TTL is ignored with a capped status_collection")
+        if "status_collection" not in await db.list_collection_names():
+            await db.create_collection(
+                "status_collection", capped=True, size=STATUS_CAPPED_SIZE
+            )
+        elif not (await db.status_collection.options()).get("capped"):
+            await db.command(
+                "convertToCapped", "status_collection", size=STATUS_CAPPED_SIZE
+            )
+        return
+    if STATUS_TTL > 0:
+        try:
+            await db.status_collection.create_index(
+                [("created_at", ASCENDING)], expireAfterSeconds=STATUS_TTL
+            )
+        except OperationFailure:
+            # the index exists with another expiry, which is changed in place
+            await db.command(
+                "collMod",
+                "status_collection",
+                index={
+                    "keyPattern": {"created_at": ASCENDING},
+                    "expireAfterSeconds": STATUS_TTL,
+                },
+            )
@@ -0,0 +1,65 @@
+"""Utilities module for entity tags on list and item responses."""
+
+import hashlib
+from http import HTTPStatus
+
+from aiohttp import hdrs
+from aiohttp.web import Request, Response, StreamResponse
+
+# the change counter of the event behind a response
+EVENT_VERSION_HEADER = "X-Event-Version"
+
+
+def make_etag(request: Request, version: int) -> str:
+    """Make a strong entity tag from a change counter.
+
+    The tag is computed from the change counter of the data behind the
+    response, and the url and accepted representation, never from the body.
+    """
+    representation = f"{request.path_qs}|{request.headers.get(hdrs.ACCEPT, '')}"
+    digest = hashlib.blake2b(representation.encode(), digest_size=8).hexdigest()
+    return f'"{version}-{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Return true if the If-None-Match header of the request matches etag."""
+    if_none_match = request.headers.get(hdrs.IF_NONE_MATCH)
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def not_modified(
+    request: Request, version: int, event_id: str | None = None
+) -> Response | None:
+    """Remember the etag for the response, and return 304 if it matches.
+
+    Args:
+        request (Request): the request
+        version (int): the change counter of the data behind the response
+        event_id (str | None): the event, if the version is an event version
+
+    Returns:
+        Response | None: A 304 Not Modified response, or None if the client
+            does not have the current representation.
+
+    """
+    etag = make_etag(request, version)
+    request["etag"] = etag
+    if event_id:
+        request["event_version"] = version
+    if etag_matches(request, etag):
+        return Response(status=HTTPStatus.NOT_MODIFIED)
+    return None
+
+
+async def set_etag_header(request: Request, response: StreamResponse) -> None:
+    """Set the etag and event version remembered for the request."""
+    if response.status not in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED):
+        return
+    etag = request.get("etag")
+    if etag and hdrs.ETAG not in response.headers:
+        response.headers[hdrs.ETAG] = etag
+    if "event_version" in request:
+        response.headers[EVENT_VERSION_HEADER] = str(request["event_version"])
@@ -0,0 +1,53 @@
+"""Utilities module for outbound http requests."""
+
+import logging
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from aiohttp import AsyncResolver, ClientSession, ClientTimeout, TCPConnector
+
+HTTP_LIMIT = int(os.getenv("HTTP_LIMIT", "100"))
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "20"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+
+# the session shared by all outbound requests, set up by the app
+_client_session: ClientSession | None = None
+
+
+def create_client_session() -> ClientSession:
+    """Create a pooled client session with keep-alive and dns caching."""
+    connector = TCPConnector(
+        limit=HTTP_LIMIT,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        resolver=AsyncResolver(),
+    )
+    timeout = ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+    return ClientSession(connector=connector, timeout=timeout)
+
+
+def set_client_session(session: ClientSession | None) -> None:
+    """Set the session shared by all outbound requests."""
+    global _client_session  # noqa: PLW0603
+    _client_session = session
+
+
+@asynccontextmanager
+async def client_session() -> AsyncIterator[ClientSession]:
+    """Get the shared client session.
+
+    Outside a running app there is no shared session, and a short-lived
+    session is created instead.
+    """
+    if _client_session is not None and not _client_session.closed:
+        yield _client_session
+    else:
+        logging.debug("No shared client session, creating a new one.")
+        timeout = ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+        async with ClientSession(timeout=timeout) as session:
+            yield session
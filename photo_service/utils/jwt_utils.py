@@ -1,7 +1,14 @@
 """Utilities module for events resources."""
 
+import logging
+import os
 
-from aiohttp.web import Request
+import jwt
+from aiohttp.web import HTTPForbidden, HTTPUnauthorized, Request
+
+JWT_SECRET = os.getenv("JWT_SECRET")
+JWT_PUBLIC_KEY = os.getenv("JWT_PUBLIC_KEY")
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "RS256" if JWT_PUBLIC_KEY else "HS256")
 
 
 def extract_token_from_request(request: Request) -> str | None:
@@ -12,3 +19,42 @@ def extract_token_from_request(request: Request) -> str | None:
         jwt_token = str.replace(str(authorization), "Bearer ", "")
 
     return jwt_token
+
+
+def authorize_token_locally(token: str | None, roles: list) -> bool:
+    """Try to authorize a token without asking the users service.
+
+    The token is verified with JWT_PUBLIC_KEY, or else JWT_SECRET, and the
+    roles claim is matched against the roles allowed.
+
+    Args:
+        token (str | None): the bearer token
+        roles (list): the roles allowed, any one of them is sufficient
+
+    Returns:
+        bool: True if authorized, False if it cannot be decided locally.
+
+    Raises:
+        HTTPUnauthorized: missing or expired token
+        HTTPForbidden: none of the roles in the token are allowed
+
+    """
+    if not token:
+        raise HTTPUnauthorized from None
+    key = JWT_PUBLIC_KEY or JWT_SECRET
+    if not key:
+        return False
+    try:
+        claims = jwt.decode(token, key, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPUnauthorized from None
+    except jwt.InvalidTokenError as e:
+        # e.g. signed with another key, let the users service decide
+        logging.debug(f"Token not decided locally: {e}")
+        return False
+    token_roles = claims.get("roles")
+    if not isinstance(token_roles, list):
+        return False
+    if set(token_roles) & set(roles):
+        return True
+    raise HTTPForbidden from None
@@ -0,0 +1,147 @@
+"""Utilities module for streamed list responses."""
+
+import json
+import os
+from collections.abc import AsyncIterator
+
+from aiohttp import hdrs
+from aiohttp.web import (
+    HTTPRequestEntityTooLarge,
+    Request,
+    Response,
+    StreamResponse,
+)
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+# limits of the documents read from one batch request body
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "10000"))
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(16 * 1024 * 1024)))
+
+
+def wants_ndjson(request: Request) -> bool:
+    """Return true if the client accepts newline delimited json."""
+    return NDJSON_CONTENT_TYPE in request.headers.get(hdrs.ACCEPT, "")
+
+
+def wants_stream(request: Request) -> bool:
+    """Return true if the client asked for a streamed list response.
+
+    A list is streamed as newline delimited json if the client accepts
+    application/x-ndjson, or as a chunked json array if stream=true.
+    """
+    return wants_ndjson(request) or request.rel_url.query.get("stream") in [
+        "true",
+        "True",
+    ]
+
+
+def wants_raw(request: Request) -> bool:
+    """Return true if the client asked for documents as stored, with raw=true."""
+    return request.rel_url.query.get("raw") in ["true", "True"]
+
+
+def _dumps(document: dict) -> str:
+    """Serialize one document the same way as the list endpoints."""
+    return json.dumps(document, default=str, ensure_ascii=False)
+
+
+async def stream_documents(
+    request: Request, documents: AsyncIterator[dict]
+) -> StreamResponse:
+    """Write documents to the client as they are produced.
+
+    Args:
+        request (Request): the request to respond to
+        documents (AsyncIterator[dict]): the documents to write
+
+    Returns:
+        StreamResponse: The finished response.
+
+    """
+    ndjson = wants_ndjson(request)
+    response = StreamResponse(status=200)
+    response.content_type = NDJSON_CONTENT_TYPE if ndjson else "application/json"
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+
+    if ndjson:
+        async for document in documents:
+            await response.write(f"{_dumps(document)}\n".encode())
+    else:
+        separator = "["
+        async for document in documents:
+            await response.write(f"{separator}{_dumps(document)}".encode())
+            separator = ","
+        await response.write(b"[]" if separator == "[" else b"]")
+
+    await response.write_eof()
+    return response
+
+
+async def documents_response(
+    request: Request, documents: AsyncIterator[dict]
+) -> StreamResponse:
+    """Respond with documents, streamed if the client asked for it.
+
+    Args:
+        request (Request): the request to respond to
+        documents (AsyncIterator[dict]): the documents to respond with
+
+    Returns:
+        StreamResponse: The response.
+
+    """
+    if wants_stream(request):
+        return await stream_documents(request, documents)
+    _list = [document async for document in documents]
+    body = json.dumps(_list, default=str, ensure_ascii=False)
+    return Response(status=200, body=body, content_type="application/json")
+
+
+async def read_documents(request: Request) -> list:
+    """Read a list of documents from a json array or ndjson request body.
+
+    A json array is limited in size by client_max_size of the application.
+    Ndjson is read line by line, and limited to BATCH_MAX_BYTES. Both are
+    limited to BATCH_MAX_ITEMS documents.
+
+    Raises:
+        HTTPRequestEntityTooLarge: the body has too many bytes or documents
+        ValueError: the body is not a json array or ndjson
+
+    """
+    if request.content_type == NDJSON_CONTENT_TYPE:
+        return await _read_ndjson(request)
+    documents = await request.json()
+    if not isinstance(documents, list):
+        err_msg = "Expected a json array."
+        raise ValueError(err_msg)  # noqa: TRY004
+    if len(documents) > BATCH_MAX_ITEMS:
+        raise _too_many_documents(len(documents))
+    return documents
+
+
+async def _read_ndjson(request: Request) -> list:
+    """Read ndjson documents, stopping as soon as a limit is exceeded."""
+    if request.content_length and request.content_length > BATCH_MAX_BYTES:
+        raise HTTPRequestEntityTooLarge(BATCH_MAX_BYTES, request.content_length)
+    documents = []
+    size = 0
+    async for line in request.content:
+        size += len(line)
+        if size > BATCH_MAX_BYTES:
+            raise HTTPRequestEntityTooLarge(BATCH_MAX_BYTES, size)
+        if line.strip():
+            documents.append(json.loads(line))
+            if len(documents) > BATCH_MAX_ITEMS:
+                raise _too_many_documents(len(documents))
+    return documents
+
+
+def _too_many_documents(count: int) -> HTTPRequestEntityTooLarge:
+    """Create the error of a body with more than BATCH_MAX_ITEMS documents."""
+    return HTTPRequestEntityTooLarge(
+        BATCH_MAX_ITEMS,
+        count,
+        text=f"Maximum number of documents {BATCH_MAX_ITEMS} exceeded.",
+    )
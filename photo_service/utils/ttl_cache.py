@@ -0,0 +1,72 @@
+"""Utilities module for a bounded in-process cache with expiry."""
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class TTLCache:
+    """Class representing a bounded least recently used cache with expiry.
+
+    Entries expire ttl seconds after they were set, and the least recently
+    used entry is evicted when the cache is full. Hits and misses are
+    counted.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """Initialize the cache."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of entries, including expired ones."""
+        return len(self._entries)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Get the value for key, or default if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return default
+
+    def set(self, key: Any, value: Any, ttl: float | None = None) -> None:
+        """Set the value for key, expiring after ttl or the cache ttl seconds."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def peek(self, key: Any, default: Any = None) -> Any:
+        """Get the value for key without counting it or marking it as used."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return default
+
+    def keys(self) -> list:
+        """Return the keys of the entries, including expired ones."""
+        return list(self._entries)
+
+    def delete(self, key: Any) -> None:
+        """Delete the entry for key, if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Delete all entries."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return the hit and miss counters and the current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
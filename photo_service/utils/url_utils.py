@@ -0,0 +1,17 @@
+"""Utilities module for google photos urls."""
+
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a url, ignoring surrounding whitespace, the fragment and case of the host."""
+    parts = urlsplit(url.strip())
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, "")
+    )
+
+
+def url_hash(url: str) -> str:
+    """Return a fixed-size hash of the normalized url, 32 hex digits."""
+    return hashlib.blake2b(normalize_url(url).encode(), digest_size=16).hexdigest()
@@ -2,8 +2,16 @@
 
 from .albums import AlbumsView, AlbumView
 from .config import ConfigsView, ConfigView
+from .events import EventVersionView
 from .g_photos import GooglePhotosView
 from .liveness import Ping, Ready
-from .photos import PhotosView, PhotoView
-from .status import StatusView
+from .photos import (
+    PhotosBatchView,
+    PhotosClubsView,
+    PhotosLookupView,
+    PhotosStreamView,
+    PhotosView,
+    PhotoView,
+)
+from .status import StatusBatchView, StatusView, StatusWebSocketView
 from .unit_test import UnitTestView
@@ -10,19 +10,29 @@ from aiohttp.web import (
     HTTPNotFound,
     HTTPUnprocessableEntity,
     Response,
+    StreamResponse,
     View,
 )
 from dotenv import load_dotenv
 from multidict import MultiDict
 
 from photo_service.adapters import UsersAdapter
-from photo_service.models import Album
+from photo_service.models import ALBUM_CODEC, Album
 from photo_service.services import (
+    ALBUMS_SCOPE,
     AlbumNotFoundError,
     AlbumsService,
     IllegalValueError,
+    VersionsService,
 )
+from photo_service.utils.etag_utils import not_modified
 from photo_service.utils.jwt_utils import extract_token_from_request
+from photo_service.utils.stream_utils import (
+    documents_response,
+    stream_documents,
+    wants_raw,
+    wants_stream,
+)
 
 load_dotenv()
 HOST_SERVER = os.getenv("HOST_SERVER", "localhost")
@@ -33,16 +43,27 @@ BASE_URL = f"http://{HOST_SERVER}:{HOST_PORT}"
 class AlbumsView(View):
     """Class representing album resource."""
 
-    async def get(self) -> Response:
+    async def get(self) -> StreamResponse:
         """Get route function."""
         db = self.request.app["db"]
+        version = await VersionsService.get_scope_version(db, ALBUMS_SCOPE)
+        if response := not_modified(self.request, version):
+            return response
         if "gId" in self.request.rel_url.query:
             g_id = self.request.rel_url.query["gId"]
             album = await AlbumsService.get_album_by_g_id(db, g_id)
             body = album.to_json()
+        elif wants_raw(self.request):
+            albums_raw = AlbumsService.iter_albums_raw(db)
+            return await documents_response(self.request, albums_raw)
+        elif wants_stream(self.request):
+            albums_iter = AlbumsService.iter_albums(db)
+            return await stream_documents(
+                self.request, (ALBUM_CODEC.encode(_e) async for _e in albums_iter)
+            )
         else:
             albums = await AlbumsService.get_all_albums(db)
-            _list = [_e.to_dict() for _e in albums]
+            _list = [ALBUM_CODEC.encode(_e) for _e in albums]
             body = json.dumps(_list, default=str, ensure_ascii=False)
         return Response(status=200, body=body, content_type="application/json")
 
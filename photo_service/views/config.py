@@ -10,19 +10,28 @@ from aiohttp.web import (
     HTTPNotFound,
     HTTPUnprocessableEntity,
     Response,
+    StreamResponse,
     View,
 )
 from dotenv import load_dotenv
 from multidict import MultiDict
 
 from photo_service.adapters import UsersAdapter
-from photo_service.models import Config
+from photo_service.models import CONFIG_CODEC, Config
 from photo_service.services import (
     ConfigNotFoundError,
     ConfigService,
     IllegalValueError,
+    VersionsService,
 )
+from photo_service.utils.etag_utils import not_modified
 from photo_service.utils.jwt_utils import extract_token_from_request
+from photo_service.utils.stream_utils import (
+    documents_response,
+    stream_documents,
+    wants_raw,
+    wants_stream,
+)
 
 load_dotenv()
 HOST_SERVER = os.getenv("HOST_SERVER", "localhost")
@@ -124,15 +133,23 @@ class ConfigView(View):
 class ConfigsView(View):
     """Class representing configs resource."""
 
-    async def get(self) -> Response:
+    async def get(self) -> StreamResponse:
         """Get route function."""
         db = self.request.app["db"]
-        if "eventId" in self.request.rel_url.query:
-            event_id = self.request.rel_url.query["eventId"]
-            configs = await ConfigService.get_all_configs(db, event_id)
-        else:
-            configs = await ConfigService.get_all_configs(db, None)
-
-        _list = [_e.to_dict() for _e in configs]
+        event_id = self.request.rel_url.query.get("eventId")
+        version = await VersionsService.get_version(db, event_id)
+        if response := not_modified(self.request, version, event_id):
+            return response
+        if wants_raw(self.request):
+            configs_raw = ConfigService.iter_configs_raw(db, event_id)
+            return await documents_response(self.request, configs_raw)
+        if wants_stream(self.request):
+            configs_iter = ConfigService.iter_configs(db, event_id)
+            return await stream_documents(
+                self.request, (CONFIG_CODEC.encode(_e) async for _e in configs_iter)
+            )
+        configs = await ConfigService.get_all_configs(db, event_id)
+
+        _list = [CONFIG_CODEC.encode(_e) for _e in configs]
         body = json.dumps(_list, default=str, ensure_ascii=False)
         return Response(status=200, body=body, content_type="application/json")
@@ -0,0 +1,22 @@
+"""Resource module for event resources."""
+
+import json
+
+from aiohttp.web import Response, View
+
+from photo_service.services import VersionsService
+from photo_service.utils.etag_utils import not_modified
+
+
+class EventVersionView(View):
+    """Class representing the change counter of an event."""
+
+    async def get(self) -> Response:
+        """Get route function."""
+        db = self.request.app["db"]
+        event_id = self.request.match_info["eventId"]
+        version = await VersionsService.get_version(db, event_id)
+        if response := not_modified(self.request, version, event_id):
+            return response
+        body = json.dumps({"event_id": event_id, "version": version})
+        return Response(status=200, body=body, content_type="application/json")
@@ -2,23 +2,32 @@
 
 import json
 import logging
+from collections.abc import AsyncIterator
 
 from aiohttp.web import (
+    HTTPBadRequest,
     Response,
+    StreamResponse,
     View,
 )
 
 from photo_service.services import (
     GooglePhotosService,
 )
+from photo_service.services.google_photos_service import GOOGLE_PHOTO_PAGE_SIZE
 from photo_service.utils.jwt_utils import extract_token_from_request
+from photo_service.utils.stream_utils import stream_documents, wants_stream
 
 
 class GooglePhotosView(View):
     """Class representing photos resource."""
 
-    async def get(self) -> Response:
-        """Get route function."""
+    async def get(self) -> StreamResponse:
+        """Get route function.
+
+        Streamed, all media items are read page by page and written as they
+        are read. Otherwise the first page is returned as is.
+        """
         g_token = str(extract_token_from_request(self.request))
 
         try:
@@ -27,7 +36,32 @@ class GooglePhotosView(View):
         except Exception:
             album_id = None
 
+        if wants_stream(self.request):
+            try:
+                page_size = int(
+                    self.request.rel_url.query.get("pageSize", GOOGLE_PHOTO_PAGE_SIZE)
+                )
+            except ValueError as e:
+                raise HTTPBadRequest(
+                    reason="Query parameter pageSize must be an integer."
+                ) from e
+            media_items = GooglePhotosService.iter_media_items(
+                g_token, album_id, page_size
+            )
+            # read the first page before responding, so that errors get a status
+            first = await anext(media_items, None)
+            return await stream_documents(self.request, _chain(first, media_items))
+
         photos = await GooglePhotosService.get_media_items(g_token, album_id)
 
         body = json.dumps(photos, default=str, ensure_ascii=False)
         return Response(status=200, body=body, content_type="application/json")
+
+
+async def _chain(first: dict | None, rest: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    """Iterate over first, if any, and then the rest."""
+    if first is None:
+        return
+    yield first
+    async for item in rest:
+        yield item
@@ -1,45 +1,94 @@
 """Resource module for photos resources."""
 
+import asyncio
 import json
 import logging
 import os
+from typing import Any
 
 from aiohttp import hdrs
 from aiohttp.web import (
     HTTPBadRequest,
     HTTPNotFound,
     HTTPUnprocessableEntity,
+    Request,
     Response,
+    StreamResponse,
     View,
 )
 from dotenv import load_dotenv
 from multidict import MultiDict
 
 from photo_service.adapters import UsersAdapter
-from photo_service.models import Photo
+from photo_service.models import PHOTO_CODEC, Photo
 from photo_service.services import (
     IllegalValueError,
     PhotoNotFoundError,
     PhotosService,
+    VersionsService,
 )
+from photo_service.utils.cursor_utils import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+from photo_service.utils.etag_utils import not_modified
 from photo_service.utils.jwt_utils import extract_token_from_request
+from photo_service.utils.stream_utils import (
+    documents_response,
+    read_documents,
+    stream_documents,
+    wants_raw,
+    wants_stream,
+)
 
 load_dotenv()
 HOST_SERVER = os.getenv("HOST_SERVER", "localhost")
 HOST_PORT = os.getenv("HOST_PORT", "8080")
 BASE_URL = f"http://{HOST_SERVER}:{HOST_PORT}"
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+PHOTOS_STREAM_HEARTBEAT = float(os.getenv("PHOTOS_STREAM_HEARTBEAT", "15"))
+
+
+def get_photos_filters(request: Request, event_id: str) -> dict:
+    """Map the query parameters of a photo listing to service filters.
+
+    Bibs are given as repeated bib parameters, or comma separated, and
+    clubs as repeated club parameters.
+    """
+    query = request.rel_url.query
+    try:
+        bibs = [
+            int(bib)
+            for value in query.getall("bib", [])
+            for bib in value.split(",")
+            if bib.strip()
+        ]
+    except ValueError as e:
+        raise HTTPBadRequest(reason="Query parameter bib must be integers.") from e
+    return {
+        "event_id": event_id,
+        "race_id": query.get("raceId"),
+        "raceclass": query.get("raceclass"),
+        "starred": query.get("starred") in ["true", "True"],
+        "bibs": bibs,
+        "clubs": query.getall("club", []),
+    }
 
 
 class PhotosView(View):
     """Class representing photos resource."""
 
-    async def get(self) -> Response:
+    async def get(self) -> StreamResponse:
         """Get route function."""
         db = self.request.app["db"]
         if "eventId" in self.request.rel_url.query:
             event_id = self.request.rel_url.query["eventId"]
         else:
             event_id = ""
+        version = await VersionsService.get_version(db, event_id)
+        if response := not_modified(self.request, version, event_id):
+            return response
 
         if "gId" in self.request.rel_url.query:
             g_id = self.request.rel_url.query["gId"]
@@ -50,13 +99,24 @@ class PhotosView(View):
             photo = await PhotosService.get_photo_by_g_base_url(db, g_base_url)
             body = photo.to_json()
         else:
-            starred = (
-                "starred" in self.request.rel_url.query
-                and self.request.rel_url.query["starred"] in ["true", "True"]
-            )
-            if "raceclass" in self.request.rel_url.query:
+            filters = get_photos_filters(self.request, event_id)
+            if "limit" in self.request.rel_url.query:
+                return await self.get_starred_first(db, filters)
+            if "pageSize" in self.request.rel_url.query:
+                return await self.get_page(db, filters)
+            if wants_raw(self.request):
+                photos_raw = PhotosService.iter_photos_raw(db, filters)
+                return await documents_response(self.request, photos_raw)
+            if wants_stream(self.request):
+                photos_iter = PhotosService.iter_photos(db, filters)
+                return await stream_documents(
+                    self.request, (PHOTO_CODEC.encode(_e) async for _e in photos_iter)
+                )
+            if filters["bibs"] or filters["clubs"]:
+                photos = [_e async for _e in PhotosService.iter_photos(db, filters)]
+            elif "raceclass" in self.request.rel_url.query:
                 raceclass = self.request.rel_url.query["raceclass"]
-                if starred:
+                if filters["starred"]:
                     photos = await PhotosService.get_photos_starred_by_raceclass(
                         db, event_id, raceclass
                     )
@@ -67,37 +127,58 @@ class PhotosView(View):
             elif "raceId" in self.request.rel_url.query:
                 race_id = self.request.rel_url.query["raceId"]
                 photos = await PhotosService.get_photos_by_race_id(db, race_id)
-            elif starred:
+            elif filters["starred"]:
                 photos = await PhotosService.get_photos_starred(db, event_id)
             else:
                 photos = await PhotosService.get_all_photos(db, event_id)
-            _list = [_e.to_dict() for _e in photos]
-            if "limit" in self.request.rel_url.query:
-                limit = int(self.request.rel_url.query["limit"])
-                limited_list = []
-                i = 0
-                # keep only the select starred photos, newest first
-                for photo in reversed(_list):
-                    if i < limit:
-                        if photo["starred"]:
-                            limited_list.append(photo)
-                            i += 1
-                    else:
-                        break
-                else:
-                    # if needed select latest ustarred photos
-                    for photo in reversed(_list):
-                        if i < limit:
-                            if not photo["starred"]:
-                                limited_list.append(photo)
-                                i += 1
-                        else:
-                            break
-                body = json.dumps(limited_list, default=str, ensure_ascii=False)
-            else:
-                body = json.dumps(_list, default=str, ensure_ascii=False)
+            _list = [PHOTO_CODEC.encode(_e) for _e in photos]
+            body = json.dumps(_list, default=str, ensure_ascii=False)
         return Response(status=200, body=body, content_type="application/json")
 
+    async def get_starred_first(self, db: Any, filters: dict) -> Response:
+        """Get the limit newest photos, starred photos first."""
+        try:
+            limit = int(self.request.rel_url.query["limit"])
+            photos = await PhotosService.get_photos_starred_first(db, filters, limit)
+        except (ValueError, IllegalValueError) as e:
+            raise HTTPBadRequest(
+                reason=f"Illegal limit {self.request.rel_url.query['limit']}."
+            ) from e
+        _list = [PHOTO_CODEC.encode(_e) for _e in photos]
+        body = json.dumps(_list, default=str, ensure_ascii=False)
+        return Response(status=200, body=body, content_type="application/json")
+
+    async def get_page(self, db: Any, filters: dict) -> Response:
+        """Get one page of photos, with a link to the next page."""
+        query = self.request.rel_url.query
+        try:
+            page_size = int(query["pageSize"])
+        except ValueError as e:
+            raise HTTPBadRequest(reason=f"Illegal pageSize {query['pageSize']}.") from e
+        if not 0 < page_size <= MAX_PAGE_SIZE:
+            raise HTTPBadRequest(
+                reason=f"pageSize must be between 1 and {MAX_PAGE_SIZE}."
+            ) from None
+        try:
+            after = decode_cursor(query["after"]) if "after" in query else None
+        except InvalidCursorError as e:
+            raise HTTPBadRequest(reason=str(e)) from e
+
+        photos, next_after = await PhotosService.get_photos_page(
+            db, filters, page_size, after
+        )
+        _list = [PHOTO_CODEC.encode(_e) for _e in photos]
+        body = json.dumps(_list, default=str, ensure_ascii=False)
+        headers = MultiDict()
+        if next_after:
+            next_url = self.request.rel_url.update_query(
+                after=encode_cursor(next_after)
+            )
+            headers.add(hdrs.LINK, f'<{BASE_URL}{next_url}>; rel="next"')
+        return Response(
+            status=200, body=body, headers=headers, content_type="application/json"
+        )
+
     async def post(self) -> Response:
         """Post route function."""
         db = self.request.app["db"]
@@ -127,6 +208,128 @@ class PhotosView(View):
             return Response(status=201, headers=headers)
         raise HTTPBadRequest from None
 
+    async def patch(self) -> Response:
+        """Patch route function, setting fields on many photos."""
+        db = self.request.app["db"]
+        token = extract_token_from_request(self.request)
+        try:
+            await UsersAdapter.authorize(token, roles=["admin", "photo-admin"])
+        except Exception as e:
+            raise e from e
+
+        try:
+            patches = await read_documents(self.request)
+        except ValueError as e:
+            raise HTTPBadRequest(reason=f"Illegal patch body: {e}") from e
+        logging.debug(f"Got patch request for {len(patches)} photos")
+
+        result = await PhotosService.patch_photos(db, patches)
+        body = json.dumps(result)
+        return Response(status=200, body=body, content_type="application/json")
+
+
+class PhotosBatchView(View):
+    """Class representing batch operations on the photos resource."""
+
+    async def post(self) -> Response:
+        """Post route function, creating many photos in one request."""
+        db = self.request.app["db"]
+        token = extract_token_from_request(self.request)
+        try:
+            await UsersAdapter.authorize(token, roles=["admin", "photo-admin"])
+        except Exception as e:
+            raise e from e
+
+        try:
+            photos = await read_documents(self.request)
+        except ValueError as e:
+            raise HTTPBadRequest(reason=f"Illegal batch body: {e}") from e
+        logging.debug(f"Got batch create request for {len(photos)} photos")
+
+        items = await PhotosService.create_photos(db, photos)
+        created = sum(1 for item in items if "id" in item)
+        body = json.dumps(
+            {"created": created, "failed": len(items) - created, "items": items}
+        )
+        return Response(status=200, body=body, content_type="application/json")
+
+
+class PhotosLookupView(View):
+    """Class representing a lookup of photos by google id and base url."""
+
+    async def post(self) -> Response:
+        """Post route function, answering which photos exist and their ids."""
+        db = self.request.app["db"]
+        try:
+            body = await self.request.json()
+        except ValueError as e:
+            raise HTTPBadRequest(reason=f"Illegal lookup body: {e}") from e
+        if not isinstance(body, dict):
+            raise HTTPBadRequest(reason="Expected a json object.")
+        g_ids = body.get("g_ids", [])
+        g_base_urls = body.get("g_base_urls", [])
+        logging.debug("Got lookup request for photos")
+
+        try:
+            result = await PhotosService.lookup_photos(db, g_ids, g_base_urls)
+        except IllegalValueError as e:
+            raise HTTPUnprocessableEntity(reason=str(e)) from e
+        body = json.dumps(result, ensure_ascii=False)
+        return Response(status=200, body=body, content_type="application/json")
+
+
+class PhotosClubsView(View):
+    """Class representing the number of photos per club of an event."""
+
+    async def get(self) -> Response:
+        """Get route function."""
+        db = self.request.app["db"]
+        event_id = self.request.rel_url.query.get("eventId")
+        if not event_id:
+            raise HTTPBadRequest(reason="Query parameter eventId is required.")
+        version = await VersionsService.get_version(db, event_id)
+        if response := not_modified(self.request, version, event_id):
+            return response
+        counts = await PhotosService.get_club_counts(db, event_id)
+        body = json.dumps(counts, ensure_ascii=False)
+        return Response(status=200, body=body, content_type="application/json")
+
+
+class PhotosStreamView(View):
+    """Class representing a server-sent event stream of written photos."""
+
+    async def get(self) -> StreamResponse:
+        """Get route function, pushing photos as they are created or updated."""
+        query = self.request.rel_url.query
+        if not query.get("eventId"):
+            raise HTTPBadRequest(reason="Query parameter eventId is required.")
+        watcher = self.request.app["photos_watcher"]
+        subscription = watcher.subscribe(
+            {"event_id": query["eventId"], "raceclass": query.get("raceclass")}
+        )
+        try:
+            response = StreamResponse(status=200)
+            response.content_type = "text/event-stream"
+            response.headers[hdrs.CACHE_CONTROL] = "no-cache"
+            await response.prepare(self.request)
+            while True:
+                try:
+                    data = await asyncio.wait_for(
+                        subscription.get(), timeout=PHOTOS_STREAM_HEARTBEAT
+                    )
+                except TimeoutError:
+                    # keeps proxies from closing an idle connection
+                    await response.write(b": keepalive\n\n")
+                    continue
+                if data is None:
+                    break
+                await response.write(f"event: photo\ndata: {data}\n\n".encode())
+        except ConnectionResetError:
+            logging.debug("Photos stream client disconnected")
+        finally:
+            watcher.unsubscribe(subscription)
+        return response
+
 
 class PhotoView(View):
     """Class representing a single photo resource."""
@@ -137,11 +340,12 @@ class PhotoView(View):
 
         photo_id = self.request.match_info["photoId"]
         logging.debug(f"Got get request for photo {photo_id}")
-
         try:
-            photo = await PhotosService.get_photo_by_id(db, photo_id)
+            photo, version = await PhotosService.get_photo_with_version(db, photo_id)
         except PhotoNotFoundError as e:
             raise HTTPNotFound(reason=str(e)) from e
+        if response := not_modified(self.request, version):
+            return response
         logging.debug(f"Got photo: {photo}")
         body = photo.to_json()
         return Response(status=200, body=body, content_type="application/json")
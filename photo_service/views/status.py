@@ -1,5 +1,7 @@
 """Resource module for status resources."""
 
+import asyncio
+import contextlib
 import json
 import logging
 import os
@@ -11,29 +13,42 @@ from aiohttp.web import (
     HTTPNotFound,
     HTTPUnprocessableEntity,
     Response,
+    StreamResponse,
     View,
+    WebSocketResponse,
 )
 from dotenv import load_dotenv
 from multidict import MultiDict
 
 from photo_service.adapters import UsersAdapter
-from photo_service.models import Status
+from photo_service.models import STATUS_CODEC, Status
 from photo_service.services import (
     IllegalValueError,
     StatusService,
+    Subscription,
+    VersionsService,
 )
+from photo_service.utils.etag_utils import not_modified
 from photo_service.utils.jwt_utils import extract_token_from_request
+from photo_service.utils.stream_utils import (
+    documents_response,
+    read_documents,
+    stream_documents,
+    wants_raw,
+    wants_stream,
+)
 
 load_dotenv()
 HOST_SERVER = os.getenv("HOST_SERVER", "localhost")
 HOST_PORT = os.getenv("HOST_PORT", "8080")
 BASE_URL = f"http://{HOST_SERVER}:{HOST_PORT}"
+STATUS_WS_HEARTBEAT = float(os.getenv("STATUS_WS_HEARTBEAT", "30"))
 
 
 class StatusView(View):
     """Class representing status resource."""
 
-    async def get(self) -> Response:
+    async def get(self) -> StreamResponse:
         """Get route function."""
         db = self.request.app["db"]
         status = []
@@ -42,6 +57,19 @@ class StatusView(View):
             count = int(self.request.rel_url.query["count"])
         except Exception:
             count = 25  # default value.
+        version = await VersionsService.get_version(db, event_id)
+        if response := not_modified(self.request, version, event_id):
+            return response
+        if wants_raw(self.request):
+            status_type = self.request.rel_url.query.get("type")
+            status_raw = StatusService.iter_status_raw(db, event_id, count, status_type)
+            return await documents_response(self.request, status_raw)
+        if wants_stream(self.request):
+            status_type = self.request.rel_url.query.get("type")
+            status_iter = StatusService.iter_status(db, event_id, count, status_type)
+            return await stream_documents(
+                self.request, (STATUS_CODEC.encode(_e) async for _e in status_iter)
+            )
         try:
             status_type = self.request.rel_url.query["type"]
             status = await StatusService.get_all_status_by_type(
@@ -50,7 +78,7 @@ class StatusView(View):
         except Exception:
             status = await StatusService.get_all_status(db, event_id, count)
 
-        _list = [_e.to_dict() for _e in status]
+        _list = [STATUS_CODEC.encode(_e) for _e in status]
         body = json.dumps(_list, default=str, ensure_ascii=False)
         return Response(status=200, body=body, content_type="application/json")
 
@@ -101,3 +129,95 @@ class StatusView(View):
         except IllegalValueError as e:
             raise HTTPNotFound(reason=str(e)) from e
         return Response(status=204)
+
+
+class StatusBatchView(View):
+    """Class representing batch operations on the status resource."""
+
+    async def post(self) -> Response:
+        """Post route function, creating many status in one request."""
+        db = self.request.app["db"]
+        token = extract_token_from_request(self.request)
+        try:
+            await UsersAdapter.authorize(token, roles=["admin", "status-admin"])
+        except Exception as e:
+            raise HTTPForbidden(reason=str(e)) from e
+
+        try:
+            status = await read_documents(self.request)
+        except ValueError as e:
+            raise HTTPBadRequest(reason=f"Illegal batch body: {e}") from e
+        logging.debug(f"Got batch create request for {len(status)} status")
+
+        items = await StatusService.create_many_status(db, status)
+        created = sum(1 for item in items if "id" in item)
+        body = json.dumps(
+            {"created": created, "failed": len(items) - created, "items": items}
+        )
+        return Response(status=200, body=body, content_type="application/json")
+
+
+class StatusWebSocketView(View):
+    """Class representing a websocket pushing status as they are created."""
+
+    async def get(self) -> WebSocketResponse:
+        """Get route function, sending the latest status and then new ones."""
+        db = self.request.app["db"]
+        query = self.request.rel_url.query
+        if not query.get("eventId"):
+            raise HTTPBadRequest(reason="Query parameter eventId is required.")
+        event_id = query["eventId"]
+        status_type = query.get("type")
+        try:
+            count = int(query["count"])
+        except Exception:
+            count = 25  # default value.
+
+        ws = WebSocketResponse(heartbeat=STATUS_WS_HEARTBEAT)
+        await ws.prepare(self.request)
+        # subscribe before reading the latest, so no status is lost in between
+        watcher = self.request.app["status_watcher"]
+        subscription = watcher.subscribe({"event_id": event_id, "type": status_type})
+        try:
+            latest = [
+                STATUS_CODEC.encode(_e)
+                async for _e in StatusService.iter_status(
+                    db, event_id, count, status_type
+                )
+            ]
+            # oldest first, so that clients can append every message
+            for status in reversed(latest):
+                await ws.send_str(json.dumps(status, default=str, ensure_ascii=False))
+            sent = {status["id"] for status in latest}
+            sender = asyncio.create_task(_send_status(ws, subscription, sent))
+            try:
+                # clients only listen, reading detects when they go away
+                async for _msg in ws:
+                    pass
+            finally:
+                sender.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await sender
+        except ConnectionResetError:
+            logging.debug("Status websocket client disconnected")
+        finally:
+            watcher.unsubscribe(subscription)
+        return ws
+
+
+async def _send_status(
+    ws: WebSocketResponse, subscription: Subscription, sent: set
+) -> None:
+    """Send status from the subscription, skipping those already sent."""
+    try:
+        while True:
+            data = await subscription.get()
+            if data is None:
+                # the client was too slow, and should reconnect
+                await ws.close(message=b"Subscription closed.")
+                return
+            if sent and json.loads(data).get("id") in sent:
+                continue
+            await ws.send_str(data)
+    except ConnectionResetError:
+        logging.debug("Status websocket client disconnected")
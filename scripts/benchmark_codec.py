@@ -0,0 +1,66 @@
+"""Micro-benchmark of the model codecs against dataclasses_json.
+
+Usage, from the root of the repository:
+    % uv run python -m scripts.benchmark_codec
+"""
+
+import json
+import timeit
+
+from photo_service.models import PHOTO_CODEC, Photo
+
+DOCUMENTS = 10_000
+PHOTO = {
+    "_id": "6331c0e2a8f4bd6bd0fce0f2",
+    "name": "IMG_6291.JPG",
+    "is_photo_finish": True,
+    "is_start_registration": False,
+    "starred": False,
+    "confidence": 0,
+    "event_id": "1e95458c-e000-4d8b-beda-f860c77fd758",
+    "creation_time": "2022-03-05T06:41:52",
+    "information": {"description": "Test photo for sprint"},
+    "id": "290e70d5-0933-4af0-bb53-1d705ba7eb95",
+    "race_id": "1e95458c-e000-4d8b-beda-f860c77fd758",
+    "raceclass": "K-Jr",
+    "biblist": [2, 4],
+    "clublist": ["Kjelsås", "Lyn"],
+    "g_id": "APU9jkgGt2_roOwf_2g9UbOwRUg6OSVG4C9GZK",
+    "g_product_url": "https://photos.google.com/G4C9GZK",
+    "g_base_url": "https://storage.googleapis.com/langrenn-sprint/result3.jpg",
+    "ai_information": {"persons": "3", "numbers": [5], "texts": ["LYN"]},
+}
+
+
+def dataclasses_json_listing(documents: list[dict]) -> str:
+    """Decode and serialize a listing the way the views did before."""
+    photos = [Photo.from_dict(e) for e in documents]
+    return json.dumps([e.to_dict() for e in photos], default=str, ensure_ascii=False)
+
+
+def codec_listing(documents: list[dict]) -> str:
+    """Decode and serialize a listing with the photo codec."""
+    photos = [PHOTO_CODEC.decode(e) for e in documents]
+    return json.dumps(
+        [PHOTO_CODEC.encode(e) for e in photos], default=str, ensure_ascii=False
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print documents per second."""
+    documents = [PHOTO] * DOCUMENTS
+    assert dataclasses_json_listing(documents) == codec_listing(documents)  # noqa: S101
+    for name, listing in [
+        ("dataclasses_json", dataclasses_json_listing),
+        ("codec", codec_listing),
+    ]:
+        seconds = min(
+            timeit.repeat(
+                lambda listing=listing: listing(documents), number=1, repeat=5
+            )
+        )
+        print(f"{name:>16}: {DOCUMENTS / seconds:>12,.0f} documents/s")
+
+
+if __name__ == "__main__":
+    main()
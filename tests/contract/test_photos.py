@@ -126,6 +126,25 @@ async def test_get_all_photos(http_service: Any, token: MockFixture) -> None:
     assert len(photos) > 0
 
 
+@pytest.mark.contract
+@pytest.mark.asyncio
+async def test_get_all_photos_raw(http_service: Any, token: MockFixture) -> None:
+    """Should return the same json with and without raw mode."""
+    url = f"{http_service}/photos?eventId=1e95458c-e000-4d8b-beda-f860c77fd758"
+
+    async with ClientSession() as session:
+        async with session.get(url) as response:
+            assert response.status == HTTPStatus.OK
+            body = await response.read()
+        async with session.get(f"{url}&raw=true") as response:
+            assert response.status == HTTPStatus.OK
+            assert "application/json" in response.headers[hdrs.CONTENT_TYPE]
+            raw_body = await response.read()
+
+    assert len(body) > 2
+    assert raw_body == body
+
+
 @pytest.mark.contract
 @pytest.mark.asyncio
 async def test_get_photo_by_id(
@@ -0,0 +1,27 @@
+"""Conftest module for integration tests."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from pytest_mock import MockFixture
+
+from photo_service.services import ConfigService
+
+
+@pytest.fixture(autouse=True)
+def config_cache() -> None:
+    """Start every test with an empty config cache."""
+    ConfigService.config_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def versions(mocker: MockFixture) -> AsyncMock:
+    """Mock the change counters, there is no db in integration tests."""
+    mocker.patch(
+        "photo_service.adapters.versions_adapter.VersionsAdapter.get_version",
+        return_value=0,
+    )
+    return mocker.patch(
+        "photo_service.adapters.versions_adapter.VersionsAdapter.bump_versions",
+        return_value=None,
+    )
@@ -0,0 +1,164 @@
+"""Integration test cases for the album sync, against a fake google photos."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from aiohttp import hdrs, web
+from pytest_mock import MockFixture
+
+from photo_service.services import AlbumSyncService, GooglePhotosService
+
+EVENT_ID = "1e95458c-e000-4d8b-beda-f860c77fd758"
+ACCESS_TOKEN = "access-token"  # noqa: S105
+COVER_PHOTO_URL = "https://lh3.googleusercontent.com/lr/cover"
+
+
+@pytest.fixture
+def media_items() -> list[dict]:
+    """Media items of the album in google photos."""
+    return [
+        {
+            "id": f"g-{i}",
+            "productUrl": f"https://photos.google.com/lr/album/g-{i}",
+            "baseUrl": f"https://lh3.googleusercontent.com/lr/g-{i}",
+            "mimeType": "image/jpeg",
+            "mediaMetadata": {"creationTime": "2022-03-05T06:41:52Z"},
+            "filename": f"IMG_{i}.JPG",
+        }
+        for i in range(5)
+    ]
+
+
+@pytest.fixture
+async def fake_google(
+    aiohttp_server: Any, mocker: MockFixture, tmp_path: Path, media_items: list
+) -> list[dict]:
+    """Start a fake google photos, returning the bodies of the searches."""
+    searches: list[dict] = []
+
+    async def token(request: web.Request) -> web.Response:
+        data = await request.post()
+        if data.get("refresh_token") != "refresh-token":
+            return web.json_response({"error": "invalid_grant"}, status=400)
+        return web.json_response({"access_token": ACCESS_TOKEN, "expires_in": 3600})
+
+    async def search(request: web.Request) -> web.Response:
+        if request.headers.get(hdrs.AUTHORIZATION) != f"Bearer {ACCESS_TOKEN}":
+            return web.json_response({"error": "unauthenticated"}, status=401)
+        body = await request.json()
+        searches.append(body)
+        start = int(body.get("pageToken", "0"))
+        end = start + body.get("pageSize", 100)
+        page: dict = {"mediaItems": media_items[start:end]}
+        if end < len(media_items):
+            page["nextPageToken"] = str(end)
+        return web.json_response(page)
+
+    async def album(request: web.Request) -> web.Response:
+        return web.json_response(
+            {"id": request.match_info["albumId"], "coverPhotoBaseUrl": COVER_PHOTO_URL}
+        )
+
+    app = web.Application()
+    app.router.add_post("/token", token)
+    app.router.add_post("/v1/mediaItems:search", search)
+    app.router.add_get("/v1/albums/{albumId}", album)
+    server = await aiohttp_server(app)
+
+    credentials_file = tmp_path / "credentials.json"
+    credentials_file.write_text(
+        json.dumps(
+            {
+                "client_id": "client-id",
+                "client_secret": "client-secret",
+                "refresh_token": "refresh-token",
+                "token_uri": str(server.make_url("/token")),
+            }
+        )
+    )
+    mocker.patch(
+        "photo_service.services.google_photos_service.GOOGLE_PHOTO_CREDENTIALS_FILE",
+        str(credentials_file),
+    )
+    mocker.patch(
+        "photo_service.services.google_photos_service.GOOGLE_PHOTO_SERVER",
+        str(server.make_url("/v1")),
+    )
+    mocker.patch.object(GooglePhotosService, "_access_token", None)
+    return searches
+
+
+@pytest.mark.integration
+async def test_sync_albums(
+    mocker: MockFixture, fake_google: list, versions: MockFixture
+) -> None:
+    """Should create photos of the new media items of albums with sync_on."""
+    mocker.patch("photo_service.services.album_sync_service.GOOGLE_PHOTO_PAGE_SIZE", 2)
+    albums = [
+        {"id": "album-1", "g_id": "g-album-1", "event_id": EVENT_ID, "sync_on": True},
+        {"id": "album-2", "g_id": "g-album-2", "event_id": EVENT_ID, "sync_on": False},
+    ]
+
+    async def iter_albums(*args: Any) -> Any:
+        for album in albums:
+            yield album
+
+    mocker.patch(
+        "photo_service.adapters.albums_adapter.AlbumsAdapter.iter_albums",
+        side_effect=iter_albums,
+    )
+    get_existing_g_ids = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_existing_g_ids",
+        side_effect=lambda _db, g_ids: {"g-0", "g-3"} & set(g_ids),
+    )
+    create_photos = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.create_photos",
+        return_value={},
+    )
+    set_album_fields = mocker.patch(
+        "photo_service.adapters.albums_adapter.AlbumsAdapter.set_album_fields",
+        return_value=albums[0],
+    )
+
+    token = await GooglePhotosService.get_access_token()
+    results = await AlbumSyncService.sync_albums(None, token)
+
+    assert results == [{"id": "album-1", "created": 3, "failed": 0}]
+    # one lookup of stored google ids per page
+    assert get_existing_g_ids.call_count == 3
+    created = [p for call in create_photos.call_args_list for p in call.args[1]]
+    assert [p["g_id"] for p in created] == ["g-1", "g-2", "g-4"]
+    assert created[0]["name"] == "IMG_1.JPG"
+    assert created[0]["event_id"] == EVENT_ID
+    assert [s.get("pageToken") for s in fake_google] == [None, "2", "4"]
+    fields = set_album_fields.call_args.args[2]
+    assert fields["cover_photo_url"] == COVER_PHOTO_URL
+    assert fields["last_sync_time"]
+    versions.assert_called()
+
+
+@pytest.mark.integration
+async def test_sync_album_already_syncing(
+    mocker: MockFixture, fake_google: list
+) -> None:
+    """Should skip an album being synced by another task."""
+    mocker.patch.object(AlbumSyncService, "albums_syncing", {"g-album-1"})
+    albums = [
+        {"id": "album-1", "g_id": "g-album-1", "event_id": EVENT_ID, "sync_on": True},
+    ]
+
+    async def iter_albums(*args: Any) -> Any:
+        for album in albums:
+            yield album
+
+    mocker.patch(
+        "photo_service.adapters.albums_adapter.AlbumsAdapter.iter_albums",
+        side_effect=iter_albums,
+    )
+
+    results = await AlbumSyncService.sync_albums(None, ACCESS_TOKEN)
+
+    assert results == [{"id": "album-1", "skipped": True}]
+    assert fake_google == []
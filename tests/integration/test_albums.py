@@ -11,6 +11,7 @@ from aiohttp.test_utils import TestClient as _TestClient
 from aioresponses import aioresponses
 from dotenv import load_dotenv
 from multidict import MultiDict
+from pymongo.errors import DuplicateKeyError
 from pytest_mock import MockFixture
 
 load_dotenv()
@@ -61,6 +62,7 @@ async def test_create_album(
     mocker: MockFixture,
     token: MockFixture,
     album: dict,
+    versions: MockFixture,
 ) -> None:
     """Should return Created, location header."""
     test_a_id = "290e70d5-0933-4af0-bb53-1d705ba7eb95"
@@ -85,6 +87,7 @@ async def test_create_album(
         resp = await client.post("/albums", headers=headers, json=request_body)
         assert resp.status == HTTPStatus.CREATED
         assert f"/albums/{test_a_id}" in resp.headers[hdrs.LOCATION]
+    assert versions.call_args.args[1] == sorted(["_albums", "_all", album["event_id"]])
 
 
 @pytest.mark.integration
@@ -200,6 +203,30 @@ async def test_get_all_albums(
         assert albums[0]["id"] == test_a_id
 
 
+@pytest.mark.integration
+async def test_get_all_albums_not_modified(
+    client: _TestClient, mocker: MockFixture
+) -> None:
+    """Should return 304 with an etag from the change counter of albums."""
+    get_version = mocker.patch(
+        "photo_service.adapters.versions_adapter.VersionsAdapter.get_version",
+        return_value=3,
+    )
+    get_all_albums = mocker.patch(
+        "photo_service.adapters.albums_adapter.AlbumsAdapter.get_all_albums",
+        return_value=[],
+    )
+
+    resp = await client.get("/albums")
+    assert resp.status == HTTPStatus.OK
+    etag = resp.headers[hdrs.ETAG]
+    assert get_version.call_args.args[1] == "_albums"
+
+    resp = await client.get("/albums", headers={hdrs.IF_NONE_MATCH: etag})
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+    assert get_all_albums.call_count == 1
+
+
 @pytest.mark.integration
 async def test_delete_album_by_id(
     client: _TestClient, mocker: MockFixture, token: MockFixture
@@ -212,7 +239,7 @@ async def test_delete_album_by_id(
     )
     mocker.patch(
         "photo_service.adapters.albums_adapter.AlbumsAdapter.delete_album",
-        return_value=test_a_id,
+        return_value={"id": test_a_id, "place": "Oslo Skagen Sprint"},
     )
     headers = {
         hdrs.AUTHORIZATION: f"Bearer {token}",
@@ -306,6 +333,50 @@ async def test_create_album_adapter_fails(
         assert resp.status == HTTPStatus.BAD_REQUEST
 
 
+@pytest.mark.integration
+async def test_create_album_g_id_exists(
+    client: _TestClient, mocker: MockFixture, token: MockFixture, album: dict
+) -> None:
+    """Should return 422 when an album with the g_id exists."""
+    mocker.patch(
+        "photo_service.adapters.albums_adapter.AlbumsAdapter.create_album",
+        side_effect=DuplicateKeyError("E11000 duplicate key error"),
+    )
+    headers = {
+        hdrs.CONTENT_TYPE: "application/json",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
+        resp = await client.post("/albums", headers=headers, json=album)
+        assert resp.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.integration
+async def test_update_album_by_id_g_id_exists(
+    client: _TestClient, mocker: MockFixture, token: MockFixture, album: dict
+) -> None:
+    """Should return 422 when another album has the g_id."""
+    test_a_id = "290e70d5-0933-4af0-bb53-1d705ba7eb95"
+    mocker.patch(
+        "photo_service.adapters.albums_adapter.AlbumsAdapter.update_album",
+        side_effect=DuplicateKeyError("E11000 duplicate key error"),
+    )
+    headers = {
+        hdrs.CONTENT_TYPE: "application/json",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+    request_body = {"id": test_a_id} | album
+
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
+        resp = await client.put(
+            f"/albums/{test_a_id}", headers=headers, json=request_body
+        )
+        assert resp.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.integration
 async def test_update_album_by_id_missing_mandatory_property(
     client: _TestClient, mocker: MockFixture, token: MockFixture
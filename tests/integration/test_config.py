@@ -10,6 +10,7 @@ from aiohttp.test_utils import TestClient as _TestClient
 from aioresponses import aioresponses
 from dotenv import load_dotenv
 from multidict import MultiDict
+from pymongo.errors import DuplicateKeyError
 from pytest_mock import MockFixture
 
 load_dotenv()
@@ -191,6 +192,33 @@ async def test_create_config_key_exists(
         assert resp.status == HTTPStatus.UNPROCESSABLE_ENTITY
 
 
+@pytest.mark.integration
+async def test_create_config_key_created_concurrently(
+    client: _TestClient,
+    mocker: MockFixture,
+    token: MockFixture,
+    config: dict,
+) -> None:
+    """Should return 422 when the key is created after the check for it."""
+    mocker.patch(
+        "photo_service.adapters.config_adapter.ConfigAdapter.get_config_by_key",
+        return_value=None,
+    )
+    mocker.patch(
+        "photo_service.adapters.config_adapter.ConfigAdapter.create_config",
+        side_effect=DuplicateKeyError("E11000 duplicate key error"),
+    )
+    headers = {
+        hdrs.CONTENT_TYPE: "application/json",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
+        resp = await client.post("/config", headers=headers, json=config)
+        assert resp.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 # Mandatory properties missing at create and update:
 @pytest.mark.integration
 async def test_create_config_adapter_fails(
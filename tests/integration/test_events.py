@@ -0,0 +1,30 @@
+"""Integration test cases for the events route."""
+
+from http import HTTPStatus
+
+import pytest
+from aiohttp import hdrs
+from aiohttp.test_utils import TestClient as _TestClient
+from pytest_mock import MockFixture
+
+
+@pytest.mark.integration
+async def test_get_event_version(client: _TestClient, mocker: MockFixture) -> None:
+    """Should return OK and the change counter of the event."""
+    event_id = "1e95458c-e000-4d8b-beda-f860c77fd758"
+    get_version = mocker.patch(
+        "photo_service.adapters.versions_adapter.VersionsAdapter.get_version",
+        return_value=42,
+    )
+
+    resp = await client.get(f"/events/{event_id}/version")
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers["X-Event-Version"] == "42"
+    body = await resp.json()
+    assert body == {"event_id": event_id, "version": 42}
+    assert get_version.call_args.args[1] == event_id
+
+    headers = {hdrs.IF_NONE_MATCH: resp.headers[hdrs.ETAG]}
+    resp = await client.get(f"/events/{event_id}/version", headers=headers)
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+    assert resp.headers["X-Event-Version"] == "42"
@@ -0,0 +1,152 @@
+"""Integration test cases for the base url refresh, against a fake google photos."""
+
+from typing import Any
+
+import pytest
+from aiohttp import web
+from pytest_mock import MockFixture
+
+from photo_service.commands.g_base_url_refresh import hash_g_base_urls
+from photo_service.services import PhotosService
+from photo_service.utils.ttl_cache import TTLCache
+
+EVENT_ID = "1e95458c-e000-4d8b-beda-f860c77fd758"
+
+
+@pytest.fixture
+async def batch_gets(aiohttp_server: Any, mocker: MockFixture) -> list[list[str]]:
+    """Start a fake google photos, returning the ids of every batch get."""
+    batch_gets: list[list[str]] = []
+
+    async def batch_get(request: web.Request) -> web.Response:
+        ids = request.query.getall("mediaItemIds")
+        batch_gets.append(ids)
+        return web.json_response(
+            {
+                "mediaItemResults": [
+                    {"status": {"code": 5}}
+                    if media_item_id == "g-gone"
+                    else {
+                        "mediaItem": {
+                            "id": media_item_id,
+                            "baseUrl": f"https://new/{media_item_id}",
+                        }
+                    }
+                    for media_item_id in ids
+                ]
+            }
+        )
+
+    app = web.Application()
+    app.router.add_get("/v1/mediaItems:batchGet", batch_get)
+    server = await aiohttp_server(app)
+    mocker.patch(
+        "photo_service.services.google_photos_service.GOOGLE_PHOTO_SERVER",
+        str(server.make_url("/v1")),
+    )
+    return batch_gets
+
+
+@pytest.mark.integration
+async def test_refresh_g_base_urls(
+    mocker: MockFixture, batch_gets: list, versions: MockFixture
+) -> None:
+    """Should renew the stale base urls in batches, keeping those not found."""
+    mocker.patch("photo_service.services.photos_service.GOOGLE_PHOTO_BATCH_GET_SIZE", 2)
+    stale = [
+        {
+            "id": "id-1",
+            "g_id": "g-1",
+            "g_base_url": "https://old/1",
+            "event_id": EVENT_ID,
+        },
+        {
+            "id": "id-2",
+            "g_id": "g-gone",
+            "g_base_url": None,
+            "event_id": EVENT_ID,
+        },
+        {
+            "id": "id-3",
+            "g_id": "g-3",
+            "g_base_url": "https://old/3",
+            "event_id": EVENT_ID,
+        },
+    ]
+    get_stale = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_with_stale_g_base_url",
+        return_value=stale,
+    )
+    set_g_base_urls = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.set_g_base_urls",
+        return_value=None,
+    )
+
+    refreshed = await PhotosService.refresh_g_base_urls(None, "access-token", 10)
+
+    assert refreshed == 2  # noqa: PLR2004
+    assert get_stale.call_args.args[2] == 10  # noqa: PLR2004
+    assert batch_gets == [["g-1", "g-gone"], ["g-3"]]
+    g_base_urls = [p for call in set_g_base_urls.call_args_list for p in call.args[1]]
+    assert g_base_urls == [
+        ("id-1", "https://new/g-1"),
+        # not found, and written again to move it to the back of the queue
+        ("id-2", None),
+        ("id-3", "https://new/g-3"),
+    ]
+    versions.assert_called_once()
+
+
+@pytest.mark.integration
+async def test_hash_g_base_urls(mocker: MockFixture) -> None:
+    """Should hash the base urls written before they were hashed."""
+    photos = [{"id": "id-1", "g_base_url": "https://old/1"}]
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_without_g_base_url_hash",
+        return_value=photos,
+    )
+    set_hashes = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.set_g_base_url_hashes",
+        return_value=1,
+    )
+
+    assert await PhotosService.hash_g_base_urls(None, 10) == 1
+    set_hashes.assert_called_once_with(None, photos)
+
+
+@pytest.mark.integration
+async def test_hash_g_base_urls_until_done(mocker: MockFixture) -> None:
+    """Should hash batches of base urls until none is left, retrying on errors."""
+    hash_g_base_urls_batch = mocker.patch(
+        "photo_service.services.photos_service.PhotosService.hash_g_base_urls",
+        side_effect=[10, Exception("db down"), 3, 0],
+    )
+
+    await hash_g_base_urls(None, 10, retry_interval=0)
+
+    assert hash_g_base_urls_batch.call_count == 4  # noqa: PLR2004
+
+
+@pytest.mark.integration
+async def test_g_base_urls_hashed(mocker: MockFixture) -> None:
+    """Should stop matching the url itself, and drop its index, once all are hashed."""
+    mocker.patch.object(PhotosService, "g_base_urls_hashed", False)
+    mocker.patch.object(PhotosService, "g_base_url_hash_check", TTLCache(1, 60))
+    get_unhashed = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_without_g_base_url_hash",
+        side_effect=[[{"id": "id-1", "g_base_url": "https://old/1"}], []],
+    )
+    drop_index = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.drop_g_base_url_index",
+        return_value=None,
+    )
+
+    assert await PhotosService.has_unhashed_g_base_urls(None) is True
+    # the result of the check is kept for a while
+    assert await PhotosService.has_unhashed_g_base_urls(None) is True
+    assert get_unhashed.call_count == 1
+
+    assert await PhotosService.hash_g_base_urls(None, 10) == 0
+    drop_index.assert_called_once()
+    assert await PhotosService.has_unhashed_g_base_urls(None) is False
+    assert get_unhashed.call_count == 2  # noqa: PLR2004
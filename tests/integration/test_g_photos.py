@@ -89,3 +89,53 @@ async def test_get_g_photos_by_album(
         body = await resp.json()
         assert type(g_photo) is dict
         assert len(body["mediaItems"]) == 1
+
+
+@pytest.mark.integration
+async def test_get_g_photos_by_album_stream(
+    client: _TestClient, token: MockFixture, g_photo: dict
+) -> None:
+    """Should stream the media items of every page."""
+    album_id = "album-1"
+    url = "https://photoslibrary.googleapis.com/v1/mediaItems:search"
+    media_item = g_photo["mediaItems"][0]
+    headers = {
+        hdrs.ACCEPT: "application/x-ndjson",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(
+            url,
+            payload={
+                "mediaItems": [{**media_item, "id": "1"}, {**media_item, "id": "2"}],
+                "nextPageToken": "page-2",
+            },
+        )
+        m.post(url, payload={"mediaItems": [{**media_item, "id": "3"}]})
+
+        resp = await client.get(f"/g_photos/{album_id}?pageSize=2", headers=headers)
+        assert resp.status == HTTPStatus.OK
+        assert "application/x-ndjson" in resp.headers[hdrs.CONTENT_TYPE]
+        lines = (await resp.text()).splitlines()
+        requests = [r.kwargs["json"] for r in next(iter(m.requests.values()))]
+    assert [json.loads(line)["id"] for line in lines] == ["1", "2", "3"]
+    assert requests == [
+        {"albumId": album_id, "pageSize": 2},
+        {"albumId": album_id, "pageSize": 2, "pageToken": "page-2"},
+    ]
+
+
+@pytest.mark.integration
+async def test_get_g_photos_stream_error(
+    client: _TestClient, token: MockFixture
+) -> None:
+    """Should return 400 Bad request if the first page fails."""
+    url = "https://photoslibrary.googleapis.com/v1/mediaItems:search"
+    headers = {hdrs.AUTHORIZATION: f"Bearer {token}"}
+
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(url, status=401, payload={"error": "unauthenticated"})
+
+        resp = await client.get("/g_photos/album-1?stream=true", headers=headers)
+        assert resp.status == HTTPStatus.BAD_REQUEST
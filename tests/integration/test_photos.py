@@ -1,8 +1,12 @@
 """Integration test cases for the photos route."""
 
+import asyncio
+import json
 import os
 from copy import deepcopy
+from datetime import datetime
 from http import HTTPStatus
+from typing import Any
 
 import jwt
 import pytest
@@ -11,8 +15,11 @@ from aiohttp.test_utils import TestClient as _TestClient
 from aioresponses import aioresponses
 from dotenv import load_dotenv
 from multidict import MultiDict
+from pymongo.errors import DuplicateKeyError
 from pytest_mock import MockFixture
 
+from photo_service.models import Photo
+
 load_dotenv()
 
 USERS_HOST_SERVER = os.getenv("USERS_HOST_SERVER", "localhost")
@@ -122,12 +129,220 @@ async def test_create_photo(
         assert f"/photos/{p_id}" in resp.headers[hdrs.LOCATION]
 
 
+@pytest.mark.integration
+async def test_create_photo_g_id_exists(
+    client: _TestClient, mocker: MockFixture, token: MockFixture, photo: dict
+) -> None:
+    """Should return 422 when a photo with the g_id exists."""
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.create_photo",
+        side_effect=DuplicateKeyError("E11000 duplicate key error"),
+    )
+    headers = {
+        hdrs.CONTENT_TYPE: "application/json",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
+        resp = await client.post("/photos", headers=headers, json=photo)
+        assert resp.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.integration
+async def test_create_photos_batch(
+    client: _TestClient, mocker: MockFixture, token: MockFixture, photo: dict
+) -> None:
+    """Should return OK and per item ids or errors."""
+    mocker.patch(
+        "photo_service.services.photos_service.create_id",
+        side_effect=["id-1", "id-2", "id-3"],
+    )
+    mocker.patch("photo_service.services.photos_service.PHOTO_BATCH_CHUNK_SIZE", 1)
+    create_photos = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.create_photos",
+        side_effect=[{}, {0: "E11000 duplicate key error"}],
+    )
+
+    headers = {
+        hdrs.CONTENT_TYPE: "application/json",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+    photo_without_name = deepcopy(photo)
+    del photo_without_name["name"]
+    photo_with_id = {**photo, "id": "given-id"}
+    request_body = [photo, photo_without_name, photo_with_id, photo]
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
+        resp = await client.post("/photos:batch", headers=headers, json=request_body)
+        assert resp.status == HTTPStatus.OK
+    body = await resp.json()
+    assert body["created"] == 1
+    assert body["failed"] == 3
+    assert body["items"][0] == {"id": "id-1"}
+    assert body["items"][1] == {"error": "Mandatory property name is missing."}
+    assert body["items"][2] == {"error": "Cannot create photo with input id."}
+    assert body["items"][3] == {"error": "E11000 duplicate key error"}
+    assert create_photos.call_count == 2
+
+
+@pytest.mark.integration
+async def test_create_photos_batch_none_inserted(
+    client: _TestClient,
+    mocker: MockFixture,
+    token: MockFixture,
+    photo: dict,
+    versions: MockFixture,
+) -> None:
+    """Should not change the event when no photo is inserted."""
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.create_photos",
+        return_value={0: "E11000 duplicate key error"},
+    )
+
+    headers = {
+        hdrs.CONTENT_TYPE: "application/json",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
+        resp = await client.post("/photos:batch", headers=headers, json=[photo])
+        assert resp.status == HTTPStatus.OK
+    body = await resp.json()
+    assert body["created"] == 0
+    versions.assert_not_called()
+
+
+@pytest.mark.integration
+async def test_create_photos_batch_ndjson(
+    client: _TestClient, mocker: MockFixture, token: MockFixture, photo: dict
+) -> None:
+    """Should return OK when the photos are sent as ndjson."""
+    create_photos = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.create_photos",
+        return_value={},
+    )
+
+    headers = {
+        hdrs.CONTENT_TYPE: "application/x-ndjson",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+    request_body = "".join(f"{json.dumps(photo)}\n" for _ in range(3))
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
+        resp = await client.post("/photos:batch", headers=headers, data=request_body)
+        assert resp.status == HTTPStatus.OK
+    body = await resp.json()
+    assert body["created"] == 3
+    assert len(create_photos.call_args.args[1]) == 3
+
+
+@pytest.mark.integration
+async def test_create_photos_batch_ndjson_too_large(
+    client: _TestClient, mocker: MockFixture, token: MockFixture, photo: dict
+) -> None:
+    """Should return 413 when the ndjson body exceeds the limits."""
+    create_photos = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.create_photos",
+        return_value={},
+    )
+    mocker.patch("photo_service.utils.stream_utils.BATCH_MAX_ITEMS", 2)
+
+    headers = {
+        hdrs.CONTENT_TYPE: "application/x-ndjson",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+    request_body = "".join(f"{json.dumps(photo)}\n" for _ in range(3))
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
+        resp = await client.post("/photos:batch", headers=headers, data=request_body)
+        assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+        mocker.patch("photo_service.utils.stream_utils.BATCH_MAX_BYTES", 100)
+        request_body = f"{json.dumps(photo)}\n"
+        resp = await client.post("/photos:batch", headers=headers, data=request_body)
+        assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    create_photos.assert_not_called()
+
+
+@pytest.mark.integration
+async def test_create_photos_batch_not_a_list(
+    client: _TestClient, mocker: MockFixture, token: MockFixture, photo: dict
+) -> None:
+    """Should return 400 Bad request."""
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.create_photos",
+        return_value={},
+    )
+
+    headers = {
+        hdrs.CONTENT_TYPE: "application/json",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
+        resp = await client.post("/photos:batch", headers=headers, json=photo)
+        assert resp.status == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.integration
+async def test_patch_photos(
+    client: _TestClient, mocker: MockFixture, token: MockFixture, photo: dict
+) -> None:
+    """Should return OK and matched and modified per photo."""
+    stored = [
+        {**photo, "id": "id-1", "starred": False},
+        {**photo, "id": "id-2", "starred": True},
+    ]
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_by_ids",
+        return_value=stored,
+    )
+    update_photos = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.update_photos",
+        return_value={"matched": 1, "modified": 1},
+    )
+
+    headers = {
+        hdrs.CONTENT_TYPE: "application/json",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+    request_body = [
+        {"id": "id-1", "fields": {"starred": True}},
+        {"id": "id-2", "fields": {"starred": True}},
+        {"id": "id-3", "fields": {"starred": True}},
+        {"id": "id-1", "fields": {"raceclass": "G12"}},
+        {"id": "id-4", "fields": {"unknown": 1}},
+        {"fields": {"starred": True}},
+    ]
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
+        resp = await client.patch("/photos", headers=headers, json=request_body)
+        assert resp.status == HTTPStatus.OK
+    body = await resp.json()
+    # the totals are the counts of the write, of the patches changing a photo
+    assert body["matched"] == 1
+    assert body["modified"] == 1
+    assert body["items"][0] == {"id": "id-1", "matched": 1, "modified": 1}
+    assert body["items"][1] == {"id": "id-2", "matched": 1, "modified": 0}
+    assert body["items"][2] == {"id": "id-3", "matched": 0, "modified": 0}
+    assert body["items"][3]["error"] == "Duplicate patch for photo."
+    assert body["items"][4]["error"] == "Cannot patch fields ['unknown']."
+    assert body["items"][5]["error"] == "Patch must have an id."
+    update_photos.assert_called_once()
+    assert update_photos.call_args.args[1] == [("id-1", {"starred": True})]
+
+
 @pytest.mark.integration
 async def test_get_photo_by_g_base_url(
     client: _TestClient, mocker: MockFixture, token: MockFixture, photo: dict
 ) -> None:
     """Should return OK, and a body containing one photo."""
     g_base_url = "https://storage.googleapis.com/langrenn-sprint/result3.jpg"
+    mocker.patch(
+        "photo_service.services.photos_service.PhotosService.has_unhashed_g_base_urls",
+        return_value=False,
+    )
     mocker.patch(
         "photo_service.adapters.photos_adapter.PhotosAdapter.get_photo_by_g_base_url",
         return_value={"g_base_url": g_base_url} | photo,
@@ -196,6 +411,33 @@ async def test_get_photo_by_id(
         assert body["information"] == photo["information"]
 
 
+@pytest.mark.integration
+async def test_get_photo_by_id_not_modified(
+    client: _TestClient, mocker: MockFixture, photo: dict
+) -> None:
+    """Should return 304 with an etag from a hash of the stored photo."""
+    p_id = "290e70d5-0933-4af0-bb53-1d705ba7eb95"
+    stored = {"id": p_id, "modified_at": datetime(2024, 1, 2, 3, 4, 5)} | photo
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photo_by_id",
+        return_value=stored,
+    )
+
+    resp = await client.get(f"/photos/{p_id}")
+    assert resp.status == HTTPStatus.OK
+    etag = resp.headers[hdrs.ETAG]
+
+    headers = {hdrs.IF_NONE_MATCH: etag}
+    resp = await client.get(f"/photos/{p_id}", headers=headers)
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+
+    # a photo written again in the same millisecond has another etag
+    stored["starred"] = not stored.get("starred")
+    resp = await client.get(f"/photos/{p_id}", headers=headers)
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers[hdrs.ETAG] != etag
+
+
 @pytest.mark.integration
 async def test_update_photo_by_id(
     client: _TestClient,
@@ -205,7 +447,7 @@ async def test_update_photo_by_id(
 ) -> None:
     """Should return No Content."""
     p_id = "290e70d5-0933-4af0-bb53-1d705ba7eb95"
-    mocker.patch(
+    get_photo_by_id = mocker.patch(
         "photo_service.adapters.photos_adapter.PhotosAdapter.get_photo_by_id",
         return_value={"id": p_id} | photo,
     )
@@ -228,6 +470,7 @@ async def test_update_photo_by_id(
 
         resp = await client.put(f"/photos/{p_id}", headers=headers, json=request_body)
         assert resp.status == HTTPStatus.NO_CONTENT
+    get_photo_by_id.assert_not_called()
 
 
 @pytest.mark.integration
@@ -252,6 +495,47 @@ async def test_get_all_photos(
         assert p_id == photos[0]["id"]
 
 
+@pytest.mark.integration
+async def test_get_all_photos_not_modified(
+    client: _TestClient, mocker: MockFixture
+) -> None:
+    """Should return 304 Not modified without querying photos."""
+    event_id = "1e95458c-e000-4d8b-beda-f860c77fd758"
+    p_id = "290e70d5-0933-4af0-bb53-1d705ba7eb95"
+    get_version = mocker.patch(
+        "photo_service.adapters.versions_adapter.VersionsAdapter.get_version",
+        return_value=7,
+    )
+    get_all_photos = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_all_photos",
+        return_value=[{"id": p_id, "name": "Oslo Skagen Sprint"}],
+    )
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.iter_photos",
+        side_effect=lambda *args: _aiter([{"id": p_id, "name": "Oslo Skagen Sprint"}]),
+    )
+
+    resp = await client.get(f"/photos?eventId={event_id}")
+    assert resp.status == HTTPStatus.OK
+    etag = resp.headers[hdrs.ETAG]
+    assert etag.startswith('"7-')
+    assert get_version.call_args.args[1] == event_id
+
+    headers = {hdrs.IF_NONE_MATCH: etag}
+    resp = await client.get(f"/photos?eventId={event_id}", headers=headers)
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+    assert resp.headers[hdrs.ETAG] == etag
+    assert get_all_photos.call_count == 1
+
+    # other representations and changed photos have other etags
+    resp = await client.get(f"/photos?eventId={event_id}&raw=true", headers=headers)
+    assert resp.status == HTTPStatus.OK
+    get_version.return_value = 8
+    resp = await client.get(f"/photos?eventId={event_id}", headers=headers)
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers[hdrs.ETAG] != etag
+
+
 @pytest.mark.integration
 async def test_get_starred_photos(
     client: _TestClient, mocker: MockFixture, token: MockFixture
@@ -282,11 +566,11 @@ async def test_get_number_of_photos(
 ) -> None:
     """Should return OK and a valid json body."""
     p_id = "290e70d5-0933-4af0-bb53-1d705ba7eb95"
-    mocker.patch(
-        "photo_service.adapters.photos_adapter.PhotosAdapter.get_all_photos",
+    get_photos_starred_first = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_starred_first",
         return_value=[
-            {"id": p_id, "name": "Oslo Skagen Sprint", "starred": False},
             {"id": "starred", "name": "Oslo Skagen Sprint2", "starred": True},
+            {"id": p_id, "name": "Oslo Skagen Sprint", "starred": False},
         ],
     )
 
@@ -301,6 +585,23 @@ async def test_get_number_of_photos(
         assert type(photos) is list
         assert photos[0]["id"] == "starred"
         assert p_id == photos[1]["id"]
+        filters, limit = get_photos_starred_first.call_args.args[1:]
+        assert filters["event_id"] == "1e95458c-e000-4d8b-beda-f860c77fd758"
+        assert limit == 2
+
+
+@pytest.mark.integration
+async def test_get_number_of_photos_illegal_limit(
+    client: _TestClient, mocker: MockFixture, token: MockFixture
+) -> None:
+    """Should return Bad Request."""
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_starred_first",
+        return_value=[],
+    )
+
+    resp = await client.get("/photos?eventId=1&limit=0")
+    assert resp.status == HTTPStatus.BAD_REQUEST
 
 
 @pytest.mark.integration
@@ -404,13 +705,13 @@ async def test_delete_photo_by_id(
 ) -> None:
     """Should return No Content."""
     p_id = "290e70d5-0933-4af0-bb53-1d705ba7eb95"
-    mocker.patch(
+    get_photo_by_id = mocker.patch(
         "photo_service.adapters.photos_adapter.PhotosAdapter.get_photo_by_id",
         return_value={"id": p_id, "name": "Oslo Skagen Sprint"},
     )
     mocker.patch(
         "photo_service.adapters.photos_adapter.PhotosAdapter.delete_photo",
-        return_value=p_id,
+        return_value={"id": p_id, "name": "Oslo Skagen Sprint"},
     )
     headers = {
         hdrs.AUTHORIZATION: f"Bearer {token}",
@@ -421,6 +722,7 @@ async def test_delete_photo_by_id(
 
         resp = await client.delete(f"/photos/{p_id}", headers=headers)
         assert resp.status == HTTPStatus.NO_CONTENT
+    get_photo_by_id.assert_not_called()
 
 
 # Bad cases
@@ -735,3 +1037,289 @@ async def test_delete_photo_not_found(
         m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
         resp = await client.delete(f"/photos/{p_id}", headers=headers)
         assert resp.status == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.integration
+async def test_get_photos_page(
+    client: _TestClient, mocker: MockFixture, token: MockFixture
+) -> None:
+    """Should return OK, one page of photos and a link to the next page."""
+    event_id = "1e95458c-e000-4d8b-beda-f860c77fd758"
+    get_photos_page = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_page",
+        return_value=[
+            {"id": "a", "name": "IMG_1.JPG", "creation_time": "2022-03-05T06:41:52"},
+            {"id": "b", "name": "IMG_2.JPG", "creation_time": "2022-03-05T06:41:53"},
+            {"id": "c", "name": "IMG_3.JPG", "creation_time": "2022-03-05T06:41:54"},
+        ],
+    )
+
+    resp = await client.get(f"/photos?eventId={event_id}&pageSize=2")
+    assert resp.status == HTTPStatus.OK
+    assert "application/json" in resp.headers[hdrs.CONTENT_TYPE]
+    photos = await resp.json()
+    assert [photo["id"] for photo in photos] == ["a", "b"]
+    assert 'rel="next"' in resp.headers[hdrs.LINK]
+    next_url = resp.headers[hdrs.LINK].split(";")[0].strip("<>")
+    assert "after=" in next_url
+
+    get_photos_page.return_value = [
+        {"id": "c", "name": "IMG_3.JPG", "creation_time": "2022-03-05T06:41:54"},
+    ]
+    after = next_url.split("after=")[1]
+    resp = await client.get(f"/photos?eventId={event_id}&pageSize=2&after={after}")
+    assert resp.status == HTTPStatus.OK
+    photos = await resp.json()
+    assert [photo["id"] for photo in photos] == ["c"]
+    assert hdrs.LINK not in resp.headers
+    filters, page_size, position = get_photos_page.call_args.args[1:]
+    assert filters["event_id"] == event_id
+    assert page_size == 3
+    assert position == ("2022-03-05T06:41:53", "b")
+
+
+@pytest.mark.integration
+async def test_get_photos_page_invalid_cursor(
+    client: _TestClient, mocker: MockFixture, token: MockFixture
+) -> None:
+    """Should return Bad Request."""
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_page",
+        return_value=[],
+    )
+
+    resp = await client.get("/photos?eventId=1&pageSize=2&after=not-a-cursor")
+    assert resp.status == HTTPStatus.BAD_REQUEST
+    resp = await client.get("/photos?eventId=1&pageSize=0")
+    assert resp.status == HTTPStatus.BAD_REQUEST
+
+
+async def _aiter(documents: list) -> Any:
+    """Return an async iterator over documents."""
+    for document in documents:
+        yield document
+
+
+@pytest.mark.integration
+async def test_get_all_photos_ndjson(
+    client: _TestClient, mocker: MockFixture, token: MockFixture
+) -> None:
+    """Should return OK and one photo per line."""
+    photos = [
+        {"id": "a", "name": "IMG_1.JPG", "creation_time": "2022-03-05T06:41:52"},
+        {"id": "b", "name": "IMG_2.JPG", "creation_time": "2022-03-05T06:41:53"},
+    ]
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.iter_photos",
+        side_effect=lambda *args: _aiter(photos),
+    )
+
+    headers = {hdrs.ACCEPT: "application/x-ndjson"}
+    resp = await client.get("/photos?eventId=1", headers=headers)
+    assert resp.status == HTTPStatus.OK
+    assert "application/x-ndjson" in resp.headers[hdrs.CONTENT_TYPE]
+    lines = (await resp.text()).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["a", "b"]
+
+    resp = await client.get("/photos?eventId=1&stream=true")
+    assert resp.status == HTTPStatus.OK
+    assert "application/json" in resp.headers[hdrs.CONTENT_TYPE]
+    body = await resp.json()
+    assert [photo["id"] for photo in body] == ["a", "b"]
+    assert body[0]["starred"] is False
+
+
+@pytest.mark.integration
+async def test_get_all_photos_raw(
+    client: _TestClient, mocker: MockFixture, token: MockFixture, photo: dict
+) -> None:
+    """Should return the same json as without raw mode."""
+    stored_photo = {"id": "290e70d5-0933-4af0-bb53-1d705ba7eb95"} | photo
+    # documents are stored in the field order of the Photo model
+    stored_photo = Photo.from_dict(stored_photo).to_dict()
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_all_photos",
+        return_value=[{"_id": "6331c0e2a8f4bd6bd0fce0f2"} | stored_photo],
+    )
+    iter_photos = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.iter_photos",
+        side_effect=lambda *args: _aiter([stored_photo]),
+    )
+
+    resp = await client.get("/photos?eventId=1e95458c-e000-4d8b-beda-f860c77fd758")
+    assert resp.status == HTTPStatus.OK
+    body = await resp.read()
+    resp = await client.get(
+        "/photos?eventId=1e95458c-e000-4d8b-beda-f860c77fd758&raw=true"
+    )
+    assert resp.status == HTTPStatus.OK
+    assert "application/json" in resp.headers[hdrs.CONTENT_TYPE]
+    assert await resp.read() == body
+    assert iter_photos.call_args.args[1]["event_id"] == stored_photo["event_id"]
+
+
+@pytest.mark.integration
+async def test_get_photos_stream(client: _TestClient, mocker: MockFixture) -> None:
+    """Should push written photos of the event and raceclass as events."""
+    event_id = "1e95458c-e000-4d8b-beda-f860c77fd758"
+
+    async def watch_photos(*args: Any) -> Any:
+        for i, (e_id, raceclass) in enumerate(
+            [("other", "K-Jr"), (event_id, "G12"), (event_id, "K-Jr")]
+        ):
+            yield {
+                "_id": {"_data": str(i)},
+                "fullDocument": {
+                    "id": f"id-{i}",
+                    "name": f"IMG_{i}.JPG",
+                    "event_id": e_id,
+                    "raceclass": raceclass,
+                    "modified_at": "2022-03-05T06:41:52",
+                },
+            }
+        await asyncio.Event().wait()
+
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.watch_photos",
+        side_effect=watch_photos,
+    )
+
+    async with client.get(f"/photos/stream?eventId={event_id}&raceclass=K-Jr") as resp:
+        assert resp.status == HTTPStatus.OK
+        assert resp.headers[hdrs.CONTENT_TYPE].startswith("text/event-stream")
+        assert await resp.content.readline() == b"event: photo\n"
+        data = await resp.content.readline()
+        assert data.startswith(b"data: ")
+        photo = json.loads(data[len(b"data: ") :])
+        assert photo["id"] == "id-2"
+        assert "modified_at" not in photo
+
+
+@pytest.mark.integration
+async def test_get_photos_stream_without_event(client: _TestClient) -> None:
+    """Should return 400 Bad request."""
+    resp = await client.get("/photos/stream")
+    assert resp.status == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.integration
+async def test_lookup_photos(client: _TestClient, mocker: MockFixture) -> None:
+    """Should return the ids of the photos found, with one query per list."""
+    get_photo_ids_by = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photo_ids_by",
+        return_value={"g-1": "id-1"},
+    )
+    get_photo_ids_by_g_base_urls = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photo_ids_by_g_base_urls",
+        return_value={"https://base/2": "id-2"},
+    )
+    mocker.patch(
+        "photo_service.services.photos_service.PhotosService.has_unhashed_g_base_urls",
+        return_value=True,
+    )
+
+    request_body = {
+        "g_ids": ["g-1", "g-3"],
+        "g_base_urls": ["https://base/2"],
+    }
+    resp = await client.post("/photos:lookup", json=request_body)
+    assert resp.status == HTTPStatus.OK
+    body = await resp.json()
+    assert body == {
+        "g_ids": {"g-1": "id-1", "g-3": None},
+        "g_base_urls": {"https://base/2": "id-2"},
+    }
+    get_photo_ids_by.assert_called_once()
+    assert get_photo_ids_by.call_args.args[1] == "g_id"
+    assert sorted(get_photo_ids_by.call_args.args[2]) == ["g-1", "g-3"]
+    get_photo_ids_by_g_base_urls.assert_called_once()
+    assert get_photo_ids_by_g_base_urls.call_args.args[1] == ["https://base/2"]
+    assert get_photo_ids_by_g_base_urls.call_args.kwargs == {"unhashed": True}
+
+
+@pytest.mark.integration
+async def test_lookup_photos_illegal_list(client: _TestClient) -> None:
+    """Should return 422 Unprocessable entity."""
+    resp = await client.post("/photos:lookup", json={"g_ids": "g-1"})
+    assert resp.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.integration
+async def test_get_photos_by_bib(client: _TestClient, mocker: MockFixture) -> None:
+    """Should return OK and the photos of any of the bibs."""
+    event_id = "1e95458c-e000-4d8b-beda-f860c77fd758"
+    photos = [{"id": "a", "name": "IMG_1.JPG", "event_id": event_id, "biblist": [12]}]
+    iter_photos = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.iter_photos",
+        side_effect=lambda *_args: _aiter(photos),
+    )
+
+    resp = await client.get(f"/photos?eventId={event_id}&bib=12&bib=34,56")
+    assert resp.status == HTTPStatus.OK
+    assert [photo["id"] for photo in await resp.json()] == ["a"]
+    filters = iter_photos.call_args.args[1]
+    assert filters["event_id"] == event_id
+    assert filters["bibs"] == [12, 34, 56]
+
+
+@pytest.mark.integration
+async def test_get_photos_page_by_bib(client: _TestClient, mocker: MockFixture) -> None:
+    """Should page through the photos of a bib, starred first with limit."""
+    get_photos_page = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_page",
+        return_value=[],
+    )
+    get_photos_starred_first = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_starred_first",
+        return_value=[],
+    )
+
+    resp = await client.get("/photos?eventId=1&bib=12&pageSize=2")
+    assert resp.status == HTTPStatus.OK
+    assert get_photos_page.call_args.args[1]["bibs"] == [12]
+    resp = await client.get("/photos?eventId=1&bib=12&limit=2")
+    assert resp.status == HTTPStatus.OK
+    assert get_photos_starred_first.call_args.args[1]["bibs"] == [12]
+
+
+@pytest.mark.integration
+async def test_get_photos_by_illegal_bib(client: _TestClient) -> None:
+    """Should return 400 Bad request."""
+    resp = await client.get("/photos?eventId=1&bib=twelve")
+    assert resp.status == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.integration
+async def test_get_photos_by_club(client: _TestClient, mocker: MockFixture) -> None:
+    """Should return OK and the photos of any of the clubs."""
+    event_id = "1e95458c-e000-4d8b-beda-f860c77fd758"
+    photos = [{"id": "a", "name": "IMG_1.JPG", "clublist": ["Lyn Ski"]}]
+    iter_photos = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.iter_photos",
+        side_effect=lambda *_args: _aiter(photos),
+    )
+
+    resp = await client.get(f"/photos?eventId={event_id}&club=Lyn Ski&club=Kjelsås IL")
+    assert resp.status == HTTPStatus.OK
+    assert [photo["id"] for photo in await resp.json()] == ["a"]
+    assert iter_photos.call_args.args[1]["clubs"] == ["Lyn Ski", "Kjelsås IL"]
+
+
+@pytest.mark.integration
+async def test_get_club_counts(client: _TestClient, mocker: MockFixture) -> None:
+    """Should return OK and the number of photos per club."""
+    event_id = "1e95458c-e000-4d8b-beda-f860c77fd758"
+    counts = [{"club": "Lyn Ski", "count": 12}, {"club": "Kjelsås IL", "count": 3}]
+    get_club_counts = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_club_counts",
+        return_value=counts,
+    )
+
+    resp = await client.get(f"/photos/clubs?eventId={event_id}")
+    assert resp.status == HTTPStatus.OK
+    assert await resp.json() == counts
+    assert hdrs.ETAG in resp.headers
+    get_club_counts.assert_called_once_with(mocker.ANY, event_id)
+
+    resp = await client.get("/photos/clubs")
+    assert resp.status == HTTPStatus.BAD_REQUEST
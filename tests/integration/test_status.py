@@ -1,7 +1,10 @@
 """Integration test cases for the status route."""
 
+import asyncio
+import json
 import os
 from http import HTTPStatus
+from typing import Any
 
 import jwt
 import pytest
@@ -54,6 +57,7 @@ async def test_create_status(
     mocker: MockFixture,
     token: MockFixture,
     status: dict,
+    versions: MockFixture,
 ) -> None:
     """Test create status."""
     test_a_id = "290e70d5-0933-4af0-bb53-1d705ba7eb95"
@@ -78,6 +82,7 @@ async def test_create_status(
         resp = await client.post("/status", headers=headers, json=request_body)
         assert resp.status == HTTPStatus.CREATED
         assert f"/status/{test_a_id}" in resp.headers[hdrs.LOCATION]
+    assert versions.call_args.args[1] == sorted(["_all", status["event_id"]])
 
 
 @pytest.mark.integration
@@ -222,3 +227,165 @@ async def test_create_status_insufficient_role(
         m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=403)
         resp = await client.post("/status", headers=headers, json=request_body)
         assert resp.status == HTTPStatus.FORBIDDEN
+
+
+@pytest.mark.integration
+async def test_get_all_status_ndjson(
+    client: _TestClient, mocker: MockFixture, token: MockFixture, status: dict
+) -> None:
+    """Should return OK, and one status per line."""
+    event_id = status["event_id"]
+
+    async def iter_status(*args: Any) -> Any:
+        yield status
+
+    iter_status_mock = mocker.patch(
+        "photo_service.adapters.status_adapter.StatusAdapter.iter_status",
+        side_effect=iter_status,
+    )
+
+    headers = {hdrs.ACCEPT: "application/x-ndjson"}
+    resp = await client.get(
+        f"/status?count=5&eventId={event_id}&type=video_status", headers=headers
+    )
+    assert resp.status == HTTPStatus.OK
+    assert "application/x-ndjson" in resp.headers[hdrs.CONTENT_TYPE]
+    lines = (await resp.text()).splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["time"] == status["time"]
+    assert iter_status_mock.call_args.args[1:] == (event_id, 5, "video_status")
+
+
+@pytest.mark.integration
+async def test_status_websocket(
+    client: _TestClient, mocker: MockFixture, status: dict
+) -> None:
+    """Should send the latest status oldest first, then new status of the type."""
+    latest = [{**status, "id": "id-2"}, {**status, "id": "id-1"}]
+
+    async def iter_status(*args: Any) -> Any:
+        for s in latest:
+            yield s
+
+    async def watch_status(*args: Any) -> Any:
+        created = [
+            {**status, "id": "id-2"},  # read as one of the latest already
+            {**status, "id": "id-3", "type": "other_status"},
+            {**status, "id": "id-4"},
+        ]
+        for i, s in enumerate(created):
+            yield {"_id": {"_data": str(i)}, "fullDocument": s}
+        await asyncio.Event().wait()
+
+    mocker.patch(
+        "photo_service.adapters.status_adapter.StatusAdapter.iter_status",
+        side_effect=iter_status,
+    )
+    mocker.patch(
+        "photo_service.adapters.status_adapter.StatusAdapter.watch_status",
+        side_effect=watch_status,
+    )
+
+    async with client.ws_connect(
+        f"/status/ws?eventId={status['event_id']}&type={status['type']}&count=2"
+    ) as ws:
+        received = [
+            json.loads(await asyncio.wait_for(ws.receive_str(), timeout=1))
+            for _ in range(3)
+        ]
+    assert [s["id"] for s in received] == ["id-1", "id-2", "id-4"]
+    assert received[0]["message"] == status["message"]
+
+
+@pytest.mark.integration
+async def test_status_websocket_without_event(client: _TestClient) -> None:
+    """Should return 400 Bad request."""
+    resp = await client.get("/status/ws")
+    assert resp.status == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.integration
+async def test_create_status_batch(
+    client: _TestClient,
+    mocker: MockFixture,
+    token: MockFixture,
+    status: dict,
+    versions: MockFixture,
+) -> None:
+    """Should return OK and per item ids or errors, with one insert."""
+    mocker.patch(
+        "photo_service.services.status_service.create_id",
+        side_effect=["id-1", "id-2"],
+    )
+    create_many_status = mocker.patch(
+        "photo_service.adapters.status_adapter.StatusAdapter.create_many_status",
+        return_value={1: "E11000 duplicate key error"},
+    )
+
+    headers = {
+        hdrs.CONTENT_TYPE: "application/json",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+    status_without_type = {k: v for k, v in status.items() if k != "type"}
+    request_body = [status, status_without_type, {**status, "id": "given-id"}, status]
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
+        resp = await client.post("/status:batch", headers=headers, json=request_body)
+        assert resp.status == HTTPStatus.OK
+    body = await resp.json()
+    assert body["created"] == 1
+    assert body["failed"] == 3
+    assert body["items"] == [
+        {"id": "id-1"},
+        {"error": "Mandatory property type is missing."},
+        {"error": "Cannot create status with input id."},
+        {"error": "E11000 duplicate key error"},
+    ]
+    create_many_status.assert_called_once()
+    assert [s["id"] for s in create_many_status.call_args.args[1]] == ["id-1", "id-2"]
+    versions.assert_called_once()
+
+
+@pytest.mark.integration
+async def test_create_status_batch_ndjson(
+    client: _TestClient, mocker: MockFixture, token: MockFixture, status: dict
+) -> None:
+    """Should return OK when the status are sent as ndjson."""
+    create_many_status = mocker.patch(
+        "photo_service.adapters.status_adapter.StatusAdapter.create_many_status",
+        return_value={},
+    )
+
+    headers = {
+        hdrs.CONTENT_TYPE: "application/x-ndjson",
+        hdrs.AUTHORIZATION: f"Bearer {token}",
+    }
+    request_body = "".join(f"{json.dumps(status)}\n" for _ in range(3))
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=204)
+        resp = await client.post("/status:batch", headers=headers, data=request_body)
+        assert resp.status == HTTPStatus.OK
+    body = await resp.json()
+    assert body["created"] == 3
+    assert len(create_many_status.call_args.args[1]) == 3
+
+
+@pytest.mark.integration
+async def test_create_status_batch_unauthorized(
+    client: _TestClient, mocker: MockFixture, status: dict
+) -> None:
+    """Should return 403 Forbidden, without creating any status."""
+    create_many_status = mocker.patch(
+        "photo_service.adapters.status_adapter.StatusAdapter.create_many_status",
+        return_value={},
+    )
+
+    headers = {
+        hdrs.CONTENT_TYPE: "application/json",
+        hdrs.AUTHORIZATION: "Bearer invalid-token",
+    }
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}/authorize", status=401)
+        resp = await client.post("/status:batch", headers=headers, json=[status])
+        assert resp.status == HTTPStatus.FORBIDDEN
+    create_many_status.assert_not_called()
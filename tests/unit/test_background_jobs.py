@@ -0,0 +1,118 @@
+"""Unit test cases for the background jobs command."""
+
+import asyncio
+import contextlib
+
+import pytest
+from pytest_mock import MockFixture
+
+from photo_service.commands.background_jobs import JOBS_LEASE, run_background_jobs
+
+
+@pytest.mark.unit
+async def test_jobs_run_by_lease_holder(mocker: MockFixture) -> None:
+    """Should run the jobs while holding the lease, and stop when it is lost."""
+    acquire_lease = mocker.patch(
+        "photo_service.adapters.leases_adapter.LeasesAdapter.acquire_lease",
+        side_effect=[True, True, False, False, False],
+    )
+    release_lease = mocker.patch(
+        "photo_service.adapters.leases_adapter.LeasesAdapter.release_lease",
+        return_value=None,
+    )
+    started = asyncio.Event()
+    stopped = asyncio.Event()
+
+    async def job() -> None:
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            stopped.set()
+
+    task = asyncio.create_task(run_background_jobs(None, [job], 0.03))
+    await asyncio.wait_for(started.wait(), timeout=1)
+    await asyncio.wait_for(stopped.wait(), timeout=1)
+    # trying again to take the lease
+    await asyncio.sleep(0.05)
+    assert acquire_lease.call_count > 3
+    assert acquire_lease.call_args.args[1] == JOBS_LEASE
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    # a lost lease is not released
+    release_lease.assert_not_called()
+
+
+@pytest.mark.unit
+async def test_jobs_not_run_by_other_workers(mocker: MockFixture) -> None:
+    """Should not run the jobs while another worker holds the lease."""
+    mocker.patch(
+        "photo_service.adapters.leases_adapter.LeasesAdapter.acquire_lease",
+        return_value=False,
+    )
+    job = mocker.AsyncMock()
+
+    task = asyncio.create_task(run_background_jobs(None, [job], 0.03))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    job.assert_not_called()
+
+
+@pytest.mark.unit
+async def test_lease_released_on_shutdown(mocker: MockFixture) -> None:
+    """Should stop the jobs and release the lease when cancelled."""
+    mocker.patch(
+        "photo_service.adapters.leases_adapter.LeasesAdapter.acquire_lease",
+        return_value=True,
+    )
+    release_lease = mocker.patch(
+        "photo_service.adapters.leases_adapter.LeasesAdapter.release_lease",
+        return_value=None,
+    )
+    started = asyncio.Event()
+
+    async def job() -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    task = asyncio.create_task(run_background_jobs(None, [job], 30))
+    await asyncio.wait_for(started.wait(), timeout=1)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    release_lease.assert_called_once()
+    assert release_lease.call_args.args[1] == JOBS_LEASE
+
+
+@pytest.mark.unit
+async def test_setup_run_before_jobs(mocker: MockFixture) -> None:
+    """Should run setup to completion before starting the jobs."""
+    mocker.patch(
+        "photo_service.adapters.leases_adapter.LeasesAdapter.acquire_lease",
+        return_value=True,
+    )
+    mocker.patch(
+        "photo_service.adapters.leases_adapter.LeasesAdapter.release_lease",
+        return_value=None,
+    )
+    calls: list[str] = []
+    started = asyncio.Event()
+
+    async def setup() -> None:
+        await asyncio.sleep(0.01)
+        calls.append("setup")
+
+    async def job() -> None:
+        calls.append("job")
+        started.set()
+        await asyncio.Event().wait()
+
+    task = asyncio.create_task(run_background_jobs(None, [job], 30, setup))
+    await asyncio.wait_for(started.wait(), timeout=1)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    assert calls == ["setup", "job"]
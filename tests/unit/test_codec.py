@@ -0,0 +1,108 @@
+"""Unit test cases for the model codecs."""
+
+import json
+
+import pytest
+
+from photo_service.models import (
+    ALBUM_CODEC,
+    CONFIG_CODEC,
+    PHOTO_CODEC,
+    STATUS_CODEC,
+    Album,
+    Config,
+    Photo,
+    Status,
+)
+
+
+@pytest.fixture
+def photo() -> dict:
+    """Photo document for testing."""
+    return {
+        "_id": "6331c0e2a8f4bd6bd0fce0f2",
+        "name": "IMG_6291.JPG",
+        "is_photo_finish": True,
+        "starred": False,
+        "confidence": 0,
+        "event_id": "1e95458c-e000-4d8b-beda-f860c77fd758",
+        "creation_time": "2022-03-05T06:41:52",
+        "information": {"description": "Test photo for sprint"},
+        "id": "290e70d5-0933-4af0-bb53-1d705ba7eb95",
+        "raceclass": "K-Jr",
+        "biblist": [2, 4],
+        "clublist": ["Kjelsås", "Lyn"],
+        "g_id": "APU9jkgGt2_roOwf_2g9UbOwRUg6OSVG4C9GZK",
+        "ai_information": {"persons": "3", "numbers": [5], "texts": ["LYN"]},
+    }
+
+
+@pytest.mark.unit
+async def test_photo_codec(photo: dict) -> None:
+    """Should decode and encode like dataclasses_json."""
+    assert PHOTO_CODEC.decode(photo) == Photo.from_dict(photo)
+    assert (
+        PHOTO_CODEC.encode(PHOTO_CODEC.decode(photo))
+        == Photo.from_dict(photo).to_dict()
+    )
+    assert json.dumps(PHOTO_CODEC.encode(Photo.from_dict(photo))) == json.dumps(
+        Photo.from_dict(photo).to_dict()
+    )
+
+
+@pytest.mark.unit
+async def test_photo_codec_converts_values(photo: dict) -> None:
+    """Should convert values to the field types like dataclasses_json."""
+    photo["confidence"] = "3"
+    photo["biblist"] = ["2", 4]
+    photo["raceclass"] = None
+    assert PHOTO_CODEC.decode(photo) == Photo.from_dict(photo)
+    assert PHOTO_CODEC.decode(photo).biblist == [2, 4]
+
+
+@pytest.mark.unit
+async def test_photo_codec_missing_mandatory_property(photo: dict) -> None:
+    """Should raise KeyError."""
+    del photo["name"]
+    with pytest.raises(KeyError, match="name"):
+        PHOTO_CODEC.decode(photo)
+
+
+@pytest.mark.unit
+async def test_album_codec() -> None:
+    """Should decode and encode nested changelogs like dataclasses_json."""
+    album = {
+        "g_id": "APU9jkgGt20Pq1SHqEjC1TiOuOliKbH5P64k",
+        "is_photo_finish": True,
+        "event_id": "1e95458c-e000-4d8b-beda-f860c77fd758",
+        "changelog": [
+            {"timestamp": "2022-09-25T16:41:52", "user_id": "admin", "comment": "new"}
+        ],
+        "last_sync_time": "2022-09-25T16:41:52",
+    }
+    assert ALBUM_CODEC.decode(album) == Album.from_dict(album)
+    assert (
+        ALBUM_CODEC.encode(ALBUM_CODEC.decode(album))
+        == Album.from_dict(album).to_dict()
+    )
+
+
+@pytest.mark.unit
+async def test_config_and_status_codec() -> None:
+    """Should decode and encode like dataclasses_json."""
+    config = {"event_id": "1", "key": "photo_location", "value": "Ragde"}
+    status = {
+        "event_id": "1",
+        "time": "2022-09-25T16:41:52",
+        "type": "video_status",
+        "message": "2022 Ragde-sprinten",
+        "details": {"items": 2},
+    }
+    assert (
+        CONFIG_CODEC.encode(CONFIG_CODEC.decode(config))
+        == Config.from_dict(config).to_dict()
+    )
+    assert (
+        STATUS_CODEC.encode(STATUS_CODEC.decode(status))
+        == Status.from_dict(status).to_dict()
+    )
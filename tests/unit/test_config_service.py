@@ -0,0 +1,99 @@
+"""Unit test cases for the config service cache."""
+
+from collections.abc import Generator
+
+import pytest
+from pytest_mock import MockFixture
+
+from photo_service.models import Config
+from photo_service.services import CONFIGS_SCOPE, ConfigService
+
+EVENT_ID = "1e95458c-e000-4d8b-beda-f860c77fd758"
+STORED_CONFIG = {
+    "id": "290e70d5-0933-4af0-bb53-1d705ba7eb95",
+    "event_id": EVENT_ID,
+    "key": "photo_location",
+    "value": "/photos",
+}
+
+
+@pytest.fixture(autouse=True)
+def config_cache() -> Generator[None]:
+    """Start every test with an empty config cache."""
+    ConfigService.config_cache.clear()
+    yield
+    ConfigService.config_cache.clear()
+
+
+@pytest.fixture
+def versions(mocker: MockFixture) -> dict:
+    """Mock the change counters of the events and scopes."""
+    versions = {EVENT_ID: 1, CONFIGS_SCOPE: 1}
+    mocker.patch(
+        "photo_service.adapters.versions_adapter.VersionsAdapter.get_version",
+        side_effect=lambda _db, scope: versions.get(scope, 0),
+    )
+    mocker.patch(
+        "photo_service.adapters.versions_adapter.VersionsAdapter.get_versions",
+        side_effect=lambda _db, scopes: {
+            s: versions[s] for s in scopes if s in versions
+        },
+    )
+    mocker.patch(
+        "photo_service.adapters.versions_adapter.VersionsAdapter.bump_versions",
+        return_value=None,
+    )
+    return versions
+
+
+@pytest.mark.unit
+@pytest.mark.usefixtures("versions")
+async def test_get_config_by_key_cached(mocker: MockFixture) -> None:
+    """Should read a config from the db once."""
+    get_config_by_key = mocker.patch(
+        "photo_service.adapters.config_adapter.ConfigAdapter.get_config_by_key",
+        return_value=STORED_CONFIG,
+    )
+    for _ in range(3):
+        config = await ConfigService.get_config_by_key(None, EVENT_ID, "photo_location")
+        assert config.value == "/photos"
+    assert get_config_by_key.call_count == 1
+
+
+@pytest.mark.unit
+@pytest.mark.usefixtures("versions")
+async def test_update_config_invalidates(mocker: MockFixture) -> None:
+    """Should read a config from the db again after updating it."""
+    get_config_by_key = mocker.patch(
+        "photo_service.adapters.config_adapter.ConfigAdapter.get_config_by_key",
+        return_value=STORED_CONFIG,
+    )
+    mocker.patch(
+        "photo_service.adapters.config_adapter.ConfigAdapter.update_config_by_key",
+        return_value=STORED_CONFIG,
+    )
+    await ConfigService.get_config_by_key(None, EVENT_ID, "photo_location")
+    config = Config.from_dict({**STORED_CONFIG, "value": "/new"})
+    await ConfigService.update_config(None, config)
+    await ConfigService.get_config_by_key(None, EVENT_ID, "photo_location")
+    assert get_config_by_key.call_count == 2
+
+
+@pytest.mark.unit
+async def test_sync_config_cache(mocker: MockFixture, versions: dict) -> None:
+    """Should drop configs when configs are changed by other workers."""
+    get_config_by_key = mocker.patch(
+        "photo_service.adapters.config_adapter.ConfigAdapter.get_config_by_key",
+        return_value=STORED_CONFIG,
+    )
+    await ConfigService.get_config_by_key(None, EVENT_ID, "photo_location")
+    assert await ConfigService.sync_config_cache(None) == 0
+
+    # photos and status written to the event keep its configs
+    versions[EVENT_ID] = 2
+    assert await ConfigService.sync_config_cache(None) == 0
+
+    versions[CONFIGS_SCOPE] = 2
+    assert await ConfigService.sync_config_cache(None) == 1
+    await ConfigService.get_config_by_key(None, EVENT_ID, "photo_location")
+    assert get_config_by_key.call_count == 2
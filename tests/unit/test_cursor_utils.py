@@ -0,0 +1,34 @@
+"""Unit test cases for the cursor utils module."""
+
+import pytest
+
+from photo_service.utils.cursor_utils import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+@pytest.mark.unit
+async def test_encode_decode_cursor() -> None:
+    """Should return the encoded position."""
+    position = ("2022-03-05T06:41:52", "290e70d5-0933-4af0-bb53-1d705ba7eb95")
+    cursor = encode_cursor(position)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == position
+
+
+@pytest.mark.unit
+async def test_encode_decode_cursor_without_creation_time() -> None:
+    """Should return the encoded position."""
+    position = (None, "290e70d5-0933-4af0-bb53-1d705ba7eb95")
+    assert decode_cursor(encode_cursor(position)) == position
+
+
+@pytest.mark.unit
+async def test_decode_invalid_cursor() -> None:
+    """Should raise InvalidCursorError."""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(("only-one",)))
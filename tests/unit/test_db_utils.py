@@ -0,0 +1,59 @@
+"""Unit test cases for the db utils module."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pymongo.errors import OperationFailure
+from pytest_mock import MockFixture
+
+from photo_service.utils.db_utils import configure_status_retention
+
+
+def _db(collections: list[str], options: dict | None = None) -> MagicMock:
+    """Create a mock of a db with the given collections."""
+    db = MagicMock()
+    db.list_collection_names = AsyncMock(return_value=collections)
+    db.create_collection = AsyncMock()
+    db.command = AsyncMock()
+    db.status_collection.options = AsyncMock(return_value=options or {})
+    db.status_collection.create_index = AsyncMock()
+    return db
+
+
+@pytest.mark.unit
+async def test_capped_status_created(mocker: MockFixture) -> None:
+    """Should create a capped status collection, without a ttl index."""
+    mocker.patch("photo_service.utils.db_utils.STATUS_CAPPED_SIZE", 1024)
+    mocker.patch("photo_service.utils.db_utils.STATUS_TTL", 60)
+    db = _db([])
+    await configure_status_retention(db)
+    db.create_collection.assert_called_once_with(
+        "status_collection", capped=True, size=1024
+    )
+    db.status_collection.create_index.assert_not_called()
+
+
+@pytest.mark.unit
+async def test_status_converted_to_capped(mocker: MockFixture) -> None:
+    """Should convert an existing status collection, once."""
+    mocker.patch("photo_service.utils.db_utils.STATUS_CAPPED_SIZE", 1024)
+    db = _db(["status_collection"])
+    await configure_status_retention(db)
+    db.command.assert_called_once_with(
+        "convertToCapped", "status_collection", size=1024
+    )
+
+    db = _db(["status_collection"], {"capped": True})
+    await configure_status_retention(db)
+    db.command.assert_not_called()
+
+
+@pytest.mark.unit
+async def test_status_ttl_changed(mocker: MockFixture) -> None:
+    """Should change the expiry of an existing ttl index."""
+    mocker.patch("photo_service.utils.db_utils.STATUS_CAPPED_SIZE", 0)
+    mocker.patch("photo_service.utils.db_utils.STATUS_TTL", 60)
+    db = _db(["status_collection"])
+    db.status_collection.create_index.side_effect = OperationFailure("conflict")
+    await configure_status_retention(db)
+    assert db.command.call_args.kwargs["index"]["expireAfterSeconds"] == 60
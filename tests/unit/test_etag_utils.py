@@ -0,0 +1,39 @@
+"""Unit test cases for the etag utils module."""
+
+import pytest
+from aiohttp import hdrs
+from aiohttp.test_utils import make_mocked_request
+
+from photo_service.utils.etag_utils import etag_matches, make_etag
+
+
+@pytest.mark.unit
+async def test_make_etag() -> None:
+    """Should make strong etags by version, url and accepted representation."""
+    request = make_mocked_request("GET", "/photos?eventId=1")
+    etag = make_etag(request, 3)
+    assert etag.startswith('"3-')
+    assert etag.endswith('"')
+    assert etag == make_etag(make_mocked_request("GET", "/photos?eventId=1"), 3)
+    assert etag != make_etag(request, 4)
+    assert etag != make_etag(make_mocked_request("GET", "/photos?eventId=2"), 3)
+    ndjson = make_mocked_request(
+        "GET", "/photos?eventId=1", headers={hdrs.ACCEPT: "application/x-ndjson"}
+    )
+    assert etag != make_etag(ndjson, 3)
+
+
+@pytest.mark.unit
+async def test_etag_matches() -> None:
+    """Should match the etag in a list of etags, weak etags and *."""
+    etag = '"3-abc"'
+    for if_none_match, expected in [
+        (None, False),
+        ('"2-abc"', False),
+        ('"2-abc", "3-abc"', True),
+        ('W/"3-abc"', True),
+        ("*", True),
+    ]:
+        headers = {hdrs.IF_NONE_MATCH: if_none_match} if if_none_match else {}
+        request = make_mocked_request("GET", "/photos", headers=headers)
+        assert etag_matches(request, etag) is expected
@@ -0,0 +1,31 @@
+"""Unit test cases for the http utils module."""
+
+import pytest
+
+from photo_service.utils.http_utils import (
+    client_session,
+    create_client_session,
+    set_client_session,
+)
+
+
+@pytest.mark.unit
+async def test_client_session_shared() -> None:
+    """Should return the shared session."""
+    shared_session = create_client_session()
+    set_client_session(shared_session)
+    try:
+        async with client_session() as session:
+            assert session is shared_session
+        assert not shared_session.closed
+    finally:
+        set_client_session(None)
+        await shared_session.close()
+
+
+@pytest.mark.unit
+async def test_client_session_without_shared_session() -> None:
+    """Should return a short-lived session."""
+    async with client_session() as session:
+        assert not session.closed
+    assert session.closed
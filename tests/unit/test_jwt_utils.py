@@ -0,0 +1,59 @@
+"""Unit test cases for the jwt utils module."""
+
+import time
+
+import jwt
+import pytest
+from aiohttp.web import HTTPForbidden, HTTPUnauthorized
+from pytest_mock import MockFixture
+
+from photo_service.utils.jwt_utils import authorize_token_locally
+
+
+@pytest.fixture(autouse=True)
+def jwt_secret(mocker: MockFixture) -> None:
+    """Verify tokens with a known secret."""
+    mocker.patch("photo_service.utils.jwt_utils.JWT_SECRET", "secret")
+    mocker.patch("photo_service.utils.jwt_utils.JWT_PUBLIC_KEY", None)
+    mocker.patch("photo_service.utils.jwt_utils.JWT_ALGORITHM", "HS256")
+
+
+def _token(payload: dict, secret: str = "secret") -> str:
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+@pytest.mark.unit
+async def test_authorized() -> None:
+    """Should authorize a token with one of the roles."""
+    token = _token({"identity": "admin", "roles": ["admin"]})
+    assert authorize_token_locally(token, ["admin", "photo-admin"])
+
+
+@pytest.mark.unit
+async def test_forbidden() -> None:
+    """Should raise HTTPForbidden for a token without any of the roles."""
+    token = _token({"identity": "user", "roles": ["user"]})
+    with pytest.raises(HTTPForbidden):
+        authorize_token_locally(token, ["admin"])
+
+
+@pytest.mark.unit
+async def test_missing_token() -> None:
+    """Should raise HTTPUnauthorized without a token."""
+    with pytest.raises(HTTPUnauthorized):
+        authorize_token_locally(None, ["admin"])
+
+
+@pytest.mark.unit
+async def test_expired_token() -> None:
+    """Should raise HTTPUnauthorized for an expired token."""
+    token = _token({"roles": ["admin"], "exp": int(time.time()) - 10})
+    with pytest.raises(HTTPUnauthorized):
+        authorize_token_locally(token, ["admin"])
+
+
+@pytest.mark.unit
+async def test_undecided() -> None:
+    """Should leave tokens it cannot verify or without roles undecided."""
+    assert not authorize_token_locally(_token({"roles": ["admin"]}, "other"), ["admin"])
+    assert not authorize_token_locally(_token({"identity": "admin"}), ["admin"])
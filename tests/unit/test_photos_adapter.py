@@ -0,0 +1,107 @@
+"""Unit test cases for the query filters of the photos adapter."""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from photo_service.adapters.photos_adapter import (
+    _g_base_url_filter,
+    _photo_ids_by_g_base_url,
+    _photos_filter,
+    _stamp,
+)
+from photo_service.utils.url_utils import url_hash
+
+EVENT_ID = "1e95458c-e000-4d8b-beda-f860c77fd758"
+
+
+@pytest.mark.unit
+def test_photos_filter_bibs() -> None:
+    """Should match photos with any of the bibs in biblist."""
+    assert _photos_filter({"event_id": EVENT_ID, "bibs": [12]}) == {
+        "event_id": EVENT_ID,
+        "biblist": 12,
+    }
+    assert _photos_filter(
+        {"event_id": EVENT_ID, "bibs": [12, 34], "starred": True}
+    ) == {
+        "event_id": EVENT_ID,
+        "biblist": {"$in": [12, 34]},
+        "starred": True,
+    }
+    assert _photos_filter({"event_id": EVENT_ID, "bibs": []}) == {"event_id": EVENT_ID}
+
+
+@pytest.mark.unit
+def test_photos_filter_clubs() -> None:
+    """Should match photos with any of the clubs in clublist."""
+    assert _photos_filter({"event_id": EVENT_ID, "clubs": ["Lyn Ski"]}) == {
+        "event_id": EVENT_ID,
+        "clublist": "Lyn Ski",
+    }
+    assert _photos_filter(
+        {"event_id": EVENT_ID, "clubs": ["Lyn Ski", "Kjelsås IL"]}
+    ) == {
+        "event_id": EVENT_ID,
+        "clublist": {"$in": ["Lyn Ski", "Kjelsås IL"]},
+    }
+
+
+@pytest.mark.unit
+def test_g_base_url_filter() -> None:
+    """Should match photos by the hash of the base url, or also by the url itself."""
+    hashed = {"g_base_url_hash": {"$in": [url_hash("https://base/1")]}}
+    assert _g_base_url_filter(["https://base/1"]) == hashed
+    assert _g_base_url_filter(["https://base/1"], unhashed=True) == {
+        "$or": [hashed, {"g_base_url": {"$in": ["https://base/1"]}}]
+    }
+
+
+@pytest.mark.unit
+def test_photo_ids_by_g_base_url_not_hashed() -> None:
+    """Should find photos with a base url not hashed yet, by the url."""
+    g_base_urls = ["https://base/1", "https://base/2", "https://base/3"]
+    photos = [
+        # hashed, written with an uppercase host
+        {
+            "id": "id-1",
+            "g_base_url": "https://BASE/1",
+            "g_base_url_hash": url_hash("https://BASE/1"),
+        },
+        # written before base urls were hashed
+        {"id": "id-2", "g_base_url": "https://base/2"},
+    ]
+    assert _photo_ids_by_g_base_url(g_base_urls, photos) == {
+        "https://base/1": "id-1",
+        "https://base/2": "id-2",
+    }
+
+
+@pytest.mark.unit
+def test_photo_ids_by_g_base_url_same_hash() -> None:
+    """Should give the id to every base url normalized to the same hash."""
+    g_base_urls = ["https://base/1", "https://BASE/1", "https://base/1#x"]
+    photos = [
+        {
+            "id": "id-1",
+            "g_base_url": "https://base/1",
+            "g_base_url_hash": url_hash("https://base/1"),
+        },
+    ]
+    assert _photo_ids_by_g_base_url(g_base_urls, photos) == dict.fromkeys(
+        g_base_urls, "id-1"
+    )
+
+
+@pytest.mark.unit
+def test_stamp_g_base_url_none() -> None:
+    """Should set the time of a base url written as None, not to refresh it again."""
+    now = datetime.now(UTC)
+    assert _stamp({"g_base_url": None}, now) == {
+        "g_base_url": None,
+        "modified_at": now,
+        "g_base_url_hash": None,
+        "g_base_url_at": now,
+    }
+    assert _stamp({"g_base_url": "https://base/1"}, now)["g_base_url_at"] == now
+    assert "g_base_url_at" not in _stamp({"starred": True}, now)
@@ -0,0 +1,158 @@
+"""Unit test cases for the photos watcher module."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+
+import pytest
+from pymongo.errors import OperationFailure
+from pytest_mock import MockFixture
+
+from photo_service.services import PhotosWatcher
+
+EVENT_ID = "1e95458c-e000-4d8b-beda-f860c77fd758"
+
+
+@pytest.mark.unit
+async def test_polling_fallback(mocker: MockFixture) -> None:
+    """Should poll for written photos without change streams."""
+    mocker.patch("photo_service.services.watcher.WATCH_POLL_INTERVAL", 0)
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.watch_photos",
+        side_effect=OperationFailure("not a replica set", code=40573),
+    )
+    # naive datetimes, as returned by the db
+    modified_at = datetime.now(UTC).replace(tzinfo=None)
+    photo = {"id": "id-1", "name": "IMG_1.JPG", "event_id": EVENT_ID}
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_modified_since",
+        return_value=[{**photo, "modified_at": modified_at}],
+    )
+
+    watcher = PhotosWatcher(None)
+    subscription = watcher.subscribe({"event_id": EVENT_ID})
+    data = await asyncio.wait_for(subscription.get(), timeout=1)
+    assert data is not None
+    assert json.loads(data)["id"] == "id-1"
+    # the same write is published once
+    await asyncio.sleep(0.05)
+    assert subscription.queue.empty()
+    assert watcher.polling
+    await watcher.stop()
+    assert await subscription.get() is None
+
+
+@pytest.mark.unit
+async def test_slow_subscriber_disconnected(mocker: MockFixture) -> None:
+    """Should close a subscription without room on its queue in time."""
+    mocker.patch("photo_service.services.watcher.WATCH_QUEUE_SIZE", 1)
+    mocker.patch("photo_service.services.watcher.WATCH_SEND_TIMEOUT", 0.01)
+    watcher = PhotosWatcher(None)
+    mocker.patch.object(watcher, "_run", side_effect=lambda: asyncio.sleep(0))
+    subscription = watcher.subscribe({"event_id": EVENT_ID})
+    other = watcher.subscribe({"event_id": "other"})
+    photo = {"id": "id-1", "name": "IMG_1.JPG", "event_id": EVENT_ID}
+    await watcher.publish(photo)
+    await watcher.publish(photo)
+    assert subscription not in watcher.subscriptions
+    assert await subscription.get() is None
+    assert other.queue.empty()
+    await watcher.stop()
+
+
+@pytest.mark.unit
+async def test_burst_delivered(mocker: MockFixture) -> None:
+    """Should deliver more photos than fit on the queue to a reading client."""
+    mocker.patch("photo_service.services.watcher.WATCH_POLL_INTERVAL", 0)
+    mocker.patch("photo_service.services.watcher.WATCH_QUEUE_SIZE", 2)
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.watch_photos",
+        side_effect=OperationFailure("not a replica set", code=40573),
+    )
+    modified_at = datetime.now(UTC).replace(tzinfo=None)
+    photos = [
+        {
+            "id": f"id-{i}",
+            "name": f"IMG_{i}.JPG",
+            "event_id": EVENT_ID,
+            "modified_at": modified_at,
+        }
+        for i in range(10)
+    ]
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_modified_since",
+        return_value=photos,
+    )
+
+    watcher = PhotosWatcher(None)
+    subscription = watcher.subscribe({"event_id": EVENT_ID})
+    received = []
+    for _ in photos:
+        data = await asyncio.wait_for(subscription.get(), timeout=1)
+        assert data is not None
+        received.append(json.loads(data)["id"])
+    assert received == [photo["id"] for photo in photos]
+    assert subscription in watcher.subscriptions
+    await watcher.stop()
+
+
+@pytest.mark.unit
+async def test_stopped_after_last_unsubscribe(mocker: MockFixture) -> None:
+    """Should stop polling when the last subscription is removed."""
+    mocker.patch("photo_service.services.watcher.WATCH_POLL_INTERVAL", 0)
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.watch_photos",
+        side_effect=OperationFailure("not a replica set", code=40573),
+    )
+    get_photos = mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.get_photos_modified_since",
+        return_value=[],
+    )
+
+    watcher = PhotosWatcher(None)
+    subscription = watcher.subscribe({"event_id": EVENT_ID})
+    other = watcher.subscribe({})
+    await asyncio.sleep(0.01)
+    watcher.unsubscribe(subscription)
+    await asyncio.sleep(0.01)
+    assert get_photos.call_count > 0
+
+    watcher.unsubscribe(other)
+    await asyncio.sleep(0.01)
+    polls = get_photos.call_count
+    await asyncio.sleep(0.01)
+    assert get_photos.call_count == polls
+    await watcher.stop()
+
+
+@pytest.mark.unit
+async def test_other_errors_keep_change_streams(mocker: MockFixture) -> None:
+    """Should keep watching the change stream after other errors."""
+    mocker.patch("photo_service.services.watcher.WATCH_POLL_INTERVAL", 0)
+    photo = {"id": "id-1", "name": "IMG_1.JPG", "event_id": EVENT_ID}
+    calls: list = []
+
+    async def watch_photos(_db: None, resume_after: dict | None) -> AsyncIterator:
+        calls.append(resume_after)
+        if len(calls) == 1:
+            yield {"_id": {"token": 1}, "fullDocument": photo}
+            raise OperationFailure("resume point lost", code=286)
+        if len(calls) == 2:
+            raise OperationFailure("interrupted", code=11601)
+        yield {"_id": {"token": 2}, "fullDocument": photo}
+        await asyncio.Event().wait()
+
+    mocker.patch(
+        "photo_service.adapters.photos_adapter.PhotosAdapter.watch_photos",
+        side_effect=watch_photos,
+    )
+
+    watcher = PhotosWatcher(None)
+    subscription = watcher.subscribe({"event_id": EVENT_ID})
+    assert await asyncio.wait_for(subscription.get(), timeout=1)
+    assert await asyncio.wait_for(subscription.get(), timeout=1)
+    assert not watcher.polling
+    # the stream is restarted without the lost resume token
+    assert calls == [None, None, None]
+    await watcher.stop()
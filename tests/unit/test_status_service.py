@@ -0,0 +1,49 @@
+"""Unit test cases for the status service compaction."""
+
+import pytest
+from pytest_mock import MockFixture
+
+from photo_service.services import StatusService
+
+EVENT_ID = "1e95458c-e000-4d8b-beda-f860c77fd758"
+
+
+@pytest.mark.unit
+async def test_compact_status(mocker: MockFixture) -> None:
+    """Should delete old status of every group larger than keep_last."""
+    mocker.patch(
+        "photo_service.adapters.status_adapter.StatusAdapter.get_status_groups_larger_than",
+        return_value=[
+            {"event_id": EVENT_ID, "type": "video_status"},
+            {"event_id": "other", "type": "video_status"},
+        ],
+    )
+    delete = mocker.patch(
+        "photo_service.adapters.status_adapter.StatusAdapter.delete_status_older_than_latest",
+        side_effect=[3, 0],
+    )
+    bump = mocker.patch(
+        "photo_service.adapters.versions_adapter.VersionsAdapter.bump_versions",
+        return_value=None,
+    )
+
+    assert await StatusService.compact_status(None, 10) == 3
+    delete.assert_any_call(None, EVENT_ID, "video_status", 10)
+    # only events with deleted status are changed
+    bump.assert_called_once_with(None, [EVENT_ID, "_all"])
+
+
+@pytest.mark.unit
+async def test_compact_status_nothing_to_delete(mocker: MockFixture) -> None:
+    """Should not bump the change counters."""
+    mocker.patch(
+        "photo_service.adapters.status_adapter.StatusAdapter.get_status_groups_larger_than",
+        return_value=[],
+    )
+    bump = mocker.patch(
+        "photo_service.adapters.versions_adapter.VersionsAdapter.bump_versions",
+        return_value=None,
+    )
+
+    assert await StatusService.compact_status(None, 10) == 0
+    bump.assert_not_called()
@@ -0,0 +1,47 @@
+"""Unit test cases for the status watcher module."""
+
+import asyncio
+import json
+from datetime import UTC, datetime
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+from pytest_mock import MockFixture
+
+from photo_service.services import StatusWatcher
+
+EVENT_ID = "1e95458c-e000-4d8b-beda-f860c77fd758"
+
+
+@pytest.mark.unit
+async def test_polling_fallback(mocker: MockFixture) -> None:
+    """Should poll for created status by the time in their _id."""
+    mocker.patch("photo_service.services.watcher.WATCH_POLL_INTERVAL", 0)
+    mocker.patch(
+        "photo_service.adapters.status_adapter.StatusAdapter.watch_status",
+        side_effect=OperationFailure("not a replica set", code=40573),
+    )
+    status = {
+        "_id": ObjectId.from_datetime(datetime.now(UTC)),
+        "id": "id-1",
+        "event_id": EVENT_ID,
+        "time": "2022-09-25T16:41:52",
+        "type": "video_status",
+        "message": "2022 Ragde-sprinten",
+    }
+    mocker.patch(
+        "photo_service.adapters.status_adapter.StatusAdapter.get_status_created_since",
+        return_value=[status, {**status, "id": "id-2", "type": "other_status"}],
+    )
+
+    watcher = StatusWatcher(None)
+    subscription = watcher.subscribe({"event_id": EVENT_ID, "type": "video_status"})
+    data = await asyncio.wait_for(subscription.get(), timeout=1)
+    assert data is not None
+    assert json.loads(data)["id"] == "id-1"
+    assert "_id" not in json.loads(data)
+    # the same status is published once, and other types not at all
+    await asyncio.sleep(0.05)
+    assert subscription.queue.empty()
+    await watcher.stop()
@@ -0,0 +1,77 @@
+"""Unit test cases for the ttl cache module."""
+
+import pytest
+from pytest_mock import MockFixture
+
+from photo_service.utils.ttl_cache import TTLCache
+
+
+@pytest.mark.unit
+async def test_get_and_set() -> None:
+    """Should return cached values and count hits and misses."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    assert cache.get("key") is None
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+@pytest.mark.unit
+async def test_expiry(mocker: MockFixture) -> None:
+    """Should not return expired values."""
+    monotonic = mocker.patch(
+        "photo_service.utils.ttl_cache.time.monotonic", return_value=100.0
+    )
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+    cache.set("short", "value", ttl=5)
+    monotonic.return_value = 106.0
+    assert cache.get("key") == "value"
+    assert cache.get("short") is None
+    monotonic.return_value = 161.0
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.unit
+async def test_not_cached_with_non_positive_ttl() -> None:
+    """Should not cache a value with a ttl of zero or less."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value", ttl=-1)
+    assert len(cache) == 0
+
+
+@pytest.mark.unit
+async def test_evicts_least_recently_used() -> None:
+    """Should evict the least recently used entry when full."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+@pytest.mark.unit
+async def test_delete_and_clear() -> None:
+    """Should delete entries."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.delete("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert len(cache) == 0
+
+
+@pytest.mark.unit
+async def test_peek_and_keys() -> None:
+    """Should peek at values without counting them."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    assert cache.peek("a") == 1
+    assert cache.peek("b") is None
+    assert cache.keys() == ["a"]
+    assert cache.stats() == {"hits": 0, "misses": 0, "size": 1}
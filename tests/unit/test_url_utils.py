@@ -0,0 +1,24 @@
+"""Unit test cases for the url utils module."""
+
+import pytest
+
+from photo_service.utils.url_utils import normalize_url, url_hash
+
+BASE_URL = "https://lh3.googleusercontent.com/lr/AFz2e37IZC1V"
+
+
+@pytest.mark.unit
+def test_normalize_url() -> None:
+    """Should ignore whitespace, the fragment and case of the host."""
+    assert normalize_url(" https://LH3.googleusercontent.com/lr/AFz2e37IZC1V#x\n") == (
+        BASE_URL
+    )
+
+
+@pytest.mark.unit
+def test_url_hash() -> None:
+    """Should return the same fixed-size hash for the same normalized url."""
+    assert len(url_hash(BASE_URL)) == 32  # noqa: PLR2004
+    assert url_hash(BASE_URL) == url_hash(f"{BASE_URL}#x")
+    # the path is case sensitive
+    assert url_hash(BASE_URL) != url_hash(BASE_URL.lower())
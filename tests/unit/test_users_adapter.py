@@ -0,0 +1,88 @@
+"""Unit test cases for the users adapter module."""
+
+import time
+from collections.abc import AsyncGenerator
+
+import jwt
+import pytest
+from aiohttp.web import HTTPForbidden
+from aioresponses import aioresponses
+from pytest_mock import MockFixture
+
+from photo_service.adapters import UsersAdapter
+
+AUTHORIZE_URL = "http://localhost:8086/authorize"
+
+
+@pytest.fixture(autouse=True)
+async def clear_cache() -> AsyncGenerator[None]:
+    """Start every test with an empty authorization cache."""
+    UsersAdapter.authorization_cache.clear()
+    yield
+    UsersAdapter.authorization_cache.clear()
+
+
+@pytest.mark.unit
+async def test_authorize_cached() -> None:
+    """Should serve a repeated positive decision from the cache."""
+    token = jwt.encode({"username": "user"}, "secret", algorithm="HS256")
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(AUTHORIZE_URL, status=204)
+        await UsersAdapter.authorize(token, ["admin"])
+        await UsersAdapter.authorize(token, ["admin"])
+        assert len(next(iter(m.requests.values()))) == 1
+    stats = UsersAdapter.authorization_cache_stats()
+    assert stats["hits"] >= 1
+
+
+@pytest.mark.unit
+async def test_authorize_cache_keyed_by_roles() -> None:
+    """Should not reuse a decision for another role set."""
+    token = jwt.encode({"username": "user"}, "secret", algorithm="HS256")
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(AUTHORIZE_URL, status=204)
+        m.post(AUTHORIZE_URL, status=403)
+        await UsersAdapter.authorize(token, ["admin"])
+        with pytest.raises(HTTPForbidden):
+            await UsersAdapter.authorize(token, ["admin", "photo-admin"])
+
+
+@pytest.mark.unit
+async def test_authorize_negative_not_cached() -> None:
+    """Should never cache a forbidden decision."""
+    token = jwt.encode({"username": "user"}, "secret", algorithm="HS256")
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(AUTHORIZE_URL, status=403)
+        m.post(AUTHORIZE_URL, status=204)
+        with pytest.raises(HTTPForbidden):
+            await UsersAdapter.authorize(token, ["admin"])
+        await UsersAdapter.authorize(token, ["admin"])
+    assert len(UsersAdapter.authorization_cache) == 1
+
+
+@pytest.mark.unit
+async def test_authorize_expired_token_not_cached() -> None:
+    """Should not cache a decision beyond the token exp claim."""
+    exp = int(time.time()) - 1
+    token = jwt.encode({"username": "user", "exp": exp}, "secret", algorithm="HS256")
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(AUTHORIZE_URL, status=204)
+        await UsersAdapter.authorize(token, ["admin"])
+    assert len(UsersAdapter.authorization_cache) == 0
+
+
+@pytest.mark.unit
+async def test_authorize_locally(mocker: MockFixture) -> None:
+    """Should not call the users service for a token decided locally."""
+    mocker.patch("photo_service.adapters.users_adapter.AUTH_LOCAL_VERIFY", new=True)
+    mocker.patch("photo_service.utils.jwt_utils.JWT_SECRET", "secret")
+    mocker.patch("photo_service.utils.jwt_utils.JWT_PUBLIC_KEY", None)
+    mocker.patch("photo_service.utils.jwt_utils.JWT_ALGORITHM", "HS256")
+    token = jwt.encode({"roles": ["admin"]}, "secret", algorithm="HS256")
+    other_token = jwt.encode({"roles": ["admin"]}, "other", algorithm="HS256")
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        m.post(AUTHORIZE_URL, status=204)
+        await UsersAdapter.authorize(token, ["admin"])
+        assert not m.requests
+        await UsersAdapter.authorize(other_token, ["admin"])
+        assert len(m.requests) == 1